@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import MD5, Upper
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CACHE_KEY = 'authn:user:{}:{}'
+USER_VERSION_KEY = 'authn:user-version:{}'
+
+
+def get_user_version(user_id):
+    """The cache version of ``user_id``, part of its cache key; ``None`` if the cache keeps nothing."""
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock, like the content version, so a lost counter never reuses an older version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_user_version(user_id):
+    key = USER_VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_cached_user(user_id):
+    # Move the version now and once more after commit, so a copy cached by a
+    # concurrent request from the pre-commit state does not outlive the transaction.
+    _bump_user_version(user_id)
+    transaction.on_commit(lambda: _bump_user_version(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that loads the user together with their profile in
+    one query and keeps both in the cache for ``AUTH_USER_CACHE_TIMEOUT``
+    seconds, keyed by the user's version, which saving either (a password
+    change or a deactivation included) moves. The active and revocation
+    checks still run on every request. ``AUTH_USER_CACHE_TIMEOUT = 0`` loads
+    the user every time.
+
+    The password hash is deferred so it never reaches the cache; the
+    revocation check compares the token with its MD5, which the query computes.
+    """
+
+    def get_queryset(self):
+        queryset = self.user_model.objects.select_related('profile').defer('password')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Upper case, like rest_framework_simplejwt.utils.get_md5_hash_password().
+            queryset = queryset.annotate(password_md5=Upper(MD5('password')))
+        return queryset
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = get_user_version(user_id) if settings.AUTH_USER_CACHE_TIMEOUT else None
+        key = USER_CACHE_KEY.format(user_id, version)
+        user = cache.get(key) if version is not None else None
+        if user is None:
+            try:
+                user = self.get_queryset().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if version is not None:
+                cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user.password_md5:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
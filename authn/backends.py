@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from authn import hashing
+
+UserModel = get_user_model()
+
+
+class HashingPoolModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that hashes and verifies passwords through
+    ``authn.hashing`` rather than in the request thread.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway, so the response time does not tell whether the user exists.
+            hashing.make_password(password)
+            return None
+
+        if hashing.check_password(password, user.password) and self.user_can_authenticate(user):
+            if hashing.must_update(user.password):
+                user.password = hashing.make_password(password)
+                user.save(update_fields=['password'])
+            return user
+        return None
@@ -0,0 +1,153 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+BLACKLIST_VERSION_KEY = 'authn:blacklist-version'
+
+
+class BloomFilter:
+    """
+    Set membership in ``capacity``-sized memory with no false negatives and
+    about ``error_rate`` false positives once ``capacity`` keys were added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions out of one 128-bit digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, key):
+        # Only count keys that set a new bit, so adding a key twice counts once.
+        added = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        self.count += added
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def get_blacklist_version():
+    version = cache.get(BLACKLIST_VERSION_KEY)
+    if version is None:
+        cache.add(BLACKLIST_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(BLACKLIST_VERSION_KEY)
+    return version
+
+
+def _bump_blacklist_version():
+    try:
+        cache.incr(BLACKLIST_VERSION_KEY)
+    except ValueError:
+        cache.set(BLACKLIST_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_blacklist_version():
+    # Once now and once after commit, so a process syncing in between reads the
+    # blacklist again.
+    _bump_blacklist_version()
+    transaction.on_commit(_bump_blacklist_version)
+
+
+class BlacklistFilter:
+    """
+    Process-wide Bloom filter of blacklisted refresh token JTIs.
+
+    Built from the unexpired blacklisted tokens on first use and brought up to
+    date whenever the blacklist version in the cache moves, which every
+    blacklist write does. A JTI it does not contain was not blacklisted when
+    that version was read, so the common case skips the database; a hit may be
+    a false positive and is confirmed there. Processes only learn of each
+    other's writes through the cache, so ``JWT_BLACKLIST_FILTER`` is off unless
+    the cache is shared by all workers.
+    """
+
+    # Ids skipped below the highest one seen are looked for again on later
+    # syncs, in case their transactions commit late, until they fall this far
+    # behind.
+    gap_window = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._watermark = 0
+        self._gaps = set()
+        self._version = None
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def sync(self):
+        version = get_blacklist_version()
+        if self._filter is not None and version is not None and version == self._version:
+            return
+        with self._lock:
+            if self._filter is not None and version is not None and version == self._version:
+                return
+            if self._filter is None:
+                self._rebuild()
+            else:
+                self._load(BlacklistedToken.objects.filter(Q(pk__gt=self._watermark) | Q(pk__in=self._gaps)))
+            self._version = version
+
+    def reset(self):
+        with self._lock:
+            self._filter, self._watermark, self._gaps, self._version = None, 0, set(), None
+
+    def _rebuild(self):
+        # Expired tokens fail verification before the blacklist is consulted.
+        tokens = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        self._filter = BloomFilter(max(settings.JWT_BLACKLIST_FILTER_CAPACITY, tokens.count() * 2),
+                                   settings.JWT_BLACKLIST_FILTER_ERROR_RATE)
+        self._watermark, self._gaps = 0, set()
+        self._load(tokens)
+        # Ids skipped for being expired are no gaps.
+        self._gaps.difference_update(BlacklistedToken.objects.filter(pk__in=self._gaps).values_list('pk', flat=True))
+
+    def _load(self, tokens):
+        watermark = self._watermark
+        for pk, jti in tokens.order_by('pk').values_list('pk', 'token__jti').iterator():
+            self._filter.add(jti)
+            if pk > watermark:
+                self._gaps.update(range(max(watermark + 1, pk - self.gap_window), pk))
+                watermark = pk
+            else:
+                self._gaps.discard(pk)
+        self._watermark = watermark
+        self._gaps = {pk for pk in self._gaps if pk > watermark - self.gap_window}
+        if self._filter.count > self._filter.capacity:
+            self._rebuild()
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def is_blacklisted(jti):
+    if settings.JWT_BLACKLIST_FILTER and jti not in blacklist_filter:
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password checks in progress, try again shortly.")
+    default_code = 'password_hashing_unavailable'
+
+    def __init__(self, detail=None, code=None, wait=1):
+        super().__init__(detail, code)
+        # Sent as Retry-After by DRF's exception handler.
+        self.wait = wait
+
+
+def _setup_worker():
+    # Spawned and forkserver children start without Django.
+    django.setup()
+
+
+class HashingPool:
+    """
+    Runs password hashing functions in a pool of ``processes`` worker processes,
+    or in the calling thread with ``processes=0``. At most ``max_pending`` calls
+    run or queue at once (any number with ``max_pending=0``); a call that finds
+    no slot within ``wait`` seconds raises ``PasswordHashingUnavailable`` (503)
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, processes, max_pending, wait, start_method='forkserver'):
+        self.processes = processes
+        self.wait = wait
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def run(self, function, *args):
+        if self._slots is None:
+            return self._run(function, *args)
+        if not self._slots.acquire(timeout=self.wait):
+            raise PasswordHashingUnavailable()
+        try:
+            return self._run(function, *args)
+        finally:
+            self._slots.release()
+
+    def _run(self, function, *args):
+        if not self.processes:
+            return function(*args)
+        return self.executor().submit(function, *args).result()
+
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_setup_worker)
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """The pool of this process for the current ``PASSWORD_HASHING_*`` settings."""
+    options = (settings.PASSWORD_HASHING_PROCESSES, settings.PASSWORD_HASHING_MAX_PENDING,
+               settings.PASSWORD_HASHING_WAIT)
+    key = (os.getpid(), *options)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = HashingPool(*options)
+        return _pools[key]
+
+
+def make_password(password):
+    return get_hashing_pool().run(hashers.make_password, password)
+
+
+def check_password(password, encoded):
+    return get_hashing_pool().run(hashers.check_password, password, encoded)
+
+
+def must_update(encoded):
+    """Whether ``encoded`` was made by another hasher or with other parameters than the preferred one."""
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = hashers.get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,84 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = ("Delete expired outstanding tokens and their blacklist entries in small primary key batches, "
+            "once or continuously")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.5, help="Seconds to pause between batches")
+        parser.add_argument('--grace', type=float, default=0,
+                            help="Keep tokens until they have been expired for this many hours")
+        parser.add_argument('--full', action='store_true',
+                            help="Scan the whole table instead of stopping at the first batch without expired "
+                                 "tokens")
+        parser.add_argument('--loop', action='store_true', help="Keep pruning until interrupted")
+        parser.add_argument('--interval', type=float, default=3600, help="Seconds between passes with --loop")
+
+    def handle(self, *args, batch_size, sleep, grace, full, loop, interval, **options):
+        self.stopping = False
+        if not loop:
+            self.prune(batch_size, sleep, timedelta(hours=grace), full)
+            return
+
+        # Finish the batch at hand on SIGTERM/SIGINT, then exit.
+        handlers = {signum: signal.signal(signum, self.stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            while not self.stopping:
+                self.prune(batch_size, sleep, timedelta(hours=grace), full)
+                self.pause(interval)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def pause(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1, deadline - time.monotonic()))
+
+    def prune(self, batch_size, sleep, grace, full):
+        cutoff = timezone.now() - grace
+        started = time.monotonic()
+        last_pk = 0
+        batches = outstanding = blacklisted = 0
+        while not self.stopping:
+            # Walk the primary key index: ``expires_at`` has none, and tokens are
+            # issued (and so expire) roughly in id order.
+            rows = list(OutstandingToken.objects.filter(pk__gt=last_pk).order_by('pk')
+                        .values_list('pk', 'expires_at')[:batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            expired = [pk for pk, expires_at in rows if expires_at < cutoff]
+            if not expired:
+                if full:
+                    continue
+                break
+
+            batch_started = time.monotonic()
+            with transaction.atomic():
+                removed_blacklisted = BlacklistedToken.objects.filter(token_id__in=expired).delete()[0]
+                removed_outstanding = OutstandingToken.objects.filter(pk__in=expired).delete()[1].get(
+                    OutstandingToken._meta.label, 0)
+            batches += 1
+            outstanding += removed_outstanding
+            blacklisted += removed_blacklisted
+            self.stdout.write(f"Batch {batches}: removed {removed_outstanding} outstanding and "
+                              f"{removed_blacklisted} blacklisted tokens in "
+                              f"{(time.monotonic() - batch_started) * 1000:.1f}ms")
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(f"Removed {outstanding} outstanding and {blacklisted} blacklisted tokens expired before "
+                          f"{cutoff:%Y-%m-%d %H:%M:%S} in {batches} batches, {time.monotonic() - started:.1f}s")
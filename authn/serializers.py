@@ -1,6 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from authn import hashing
+from authn.blacklist import is_blacklisted
+from authn.tokens import RefreshToken
 
 UserModel = get_user_model()
 
@@ -37,12 +44,30 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         profile_picture = validated_data.pop('profile__profile_picture')
         bio = validated_data.pop('profile__bio')
 
-        user = UserModel.objects.create(**validated_data)
-        user.set_password(password1)
+        user = UserModel(**validated_data)
+        user.password = hashing.make_password(password1)
         user.save()
 
         user.profile.profile_picture = profile_picture
         user.profile.bio = bio
-        user.profile.save()
+        user.profile.save(update_fields=['profile_picture', 'bio'])
 
         return user
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class TokenBlacklistSerializer(jwt_serializers.TokenBlacklistSerializer):
+    token_class = RefreshToken
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+
+        if api_settings.BLACKLIST_AFTER_ROTATION and is_blacklisted(token.get(api_settings.JTI_CLAIM)):
+            raise serializers.ValidationError("Token is blacklisted")
+
+        return {}
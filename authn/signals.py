@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from profiles.models import Profile
+from .authentication import invalidate_cached_user
+from .blacklist import blacklist_filter, bump_blacklist_version
+
+UserModel = get_user_model()
+
+
+@receiver(post_save, sender=UserModel, dispatch_uid='authn_user_saved')
+@receiver(post_delete, sender=UserModel, dispatch_uid='authn_user_deleted')
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile, dispatch_uid='authn_profile_saved')
+@receiver(post_delete, sender=Profile, dispatch_uid='authn_profile_deleted')
+def invalidate_profile_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken, dispatch_uid='authn_token_blacklisted')
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    if created:
+        blacklist_filter.add(instance.token.jti)
+        bump_blacklist_version()
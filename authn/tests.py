@@ -1,3 +1,383 @@
-from django.test import TestCase
+import io
+import itertools
+import pickle
+import threading
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from authn import hashing
+from authn.authentication import USER_CACHE_KEY, CachedJWTAuthentication, get_user_version, invalidate_cached_user
+from authn.blacklist import BloomFilter, blacklist_filter, bump_blacklist_version
+from blog.testing import ScalingQueriesTestCase
+from posts.tests.factories import PostFactory
+from profiles.models import Profile
+from profiles.tests.factories import UserFactory
+
+UserModel = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RegisterQueriesTestCase(ScalingQueriesTestCase):
+    plans_dir = Path(__file__).parent / 'query_plans'
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.usernames = (f"new-user-{index}" for index in itertools.count())
+
+    def seed(self, n):
+        start = UserModel.objects.count()
+        users = UserModel.objects.bulk_create(
+            UserModel(username=f"user-{index}", email=f"user-{index}@example.com")
+            for index in range(start, start + n))
+        Profile.objects.bulk_create(Profile(user=user) for user in users)
+
+    def test_register(self):
+        def request():
+            username = next(self.usernames)
+            data = {"first_name": "First", "last_name": "Last", "username": username,
+                    "email": f"{username}@example.com", "password1": "secret", "password2": "secret", "bio": "Bio",
+                    "profile_picture": SimpleUploadedFile("picture.png", b"picture", content_type="image/png")}
+            return self.client.post(reverse("api:auth:register"), data=data, format='multipart')
+
+        self.assertScalableQueries('register', request, status=status.HTTP_201_CREATED)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   AUTH_USER_CACHE_TIMEOUT=60)
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.token = AccessToken.for_user(self.user)
+        self.authentication = CachedJWTAuthentication()
+
+    def test_user_and_profile_are_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = self.authentication.get_user(self.token)
+            self.assertEqual(user.profile.pk, self.user.profile.pk)
+
+    def test_user_is_served_from_cache(self):
+        self.authentication.get_user(self.token)
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.token)
+            self.assertEqual(user.profile.user_id, self.user.pk)
+        self.assertEqual(user, self.user)
+
+    def test_saving_the_user_invalidates(self):
+        self.authentication.get_user(self.token)
+        self.user.first_name = "Renamed"
+        self.user.save()
+        self.assertEqual(self.authentication.get_user(self.token).first_name, "Renamed")
+
+    def test_saving_the_profile_invalidates(self):
+        self.authentication.get_user(self.token)
+        self.user.profile.bio = "Updated"
+        self.user.profile.save()
+        self.assertEqual(self.authentication.get_user(self.token).profile.bio, "Updated")
+
+    def test_new_post_invalidates_the_author_post_count(self):
+        self.authentication.get_user(self.token)
+        PostFactory(author=self.user.profile)
+        self.assertEqual(self.authentication.get_user(self.token).profile.post_count, 1)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authentication.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_password_hash_is_not_cached(self):
+        self.authentication.get_user(self.token)
+        cached = cache.get(USER_CACHE_KEY.format(self.user.pk, get_user_version(self.user.pk)))
+        self.assertEqual(cached, self.user)
+        self.assertIn('password', cached.get_deferred_fields())
+        self.assertNotIn(self.user.password.encode(), pickle.dumps(cached))
+
+    @mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True)
+    def test_password_change_revokes_the_token(self):
+        token = AccessToken.for_user(self.user)
+        self.authentication.get_user(token)
+        with self.assertNumQueries(0):
+            self.authentication.get_user(token)
+        self.user.set_password('changed')
+        self.user.save()
+        with self.assertRaisesMessage(AuthenticationFailed, "The user's password has been changed."):
+            self.authentication.get_user(token)
+        self.authentication.get_user(AccessToken.for_user(self.user))
+
+    def test_invalidation_moves_the_cache_key(self):
+        # A copy another worker wrote under the old version is never read again.
+        self.authentication.get_user(self.token)
+        version = get_user_version(self.user.pk)
+        UserModel.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_cached_user(self.user.pk)
+        self.assertGreater(get_user_version(self.user.pk), version)
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_turned_off(self):
+        self.authentication.get_user(self.token)
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+
+    def test_deleted_user_is_rejected(self):
+        self.authentication.get_user(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_authenticated_write_skips_identity_lookups(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        url = reverse("api:comments:comments-list")
+        post = PostFactory()
+        client.post(url, {"post": post.pk, "content": "First"})
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, {"post": post.pk, "content": "Second"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tables = {UserModel._meta.db_table, Profile._meta.db_table}
+        self.assertFalse([query['sql'] for query in queries.captured_queries
+                          if query['sql'].startswith('SELECT') and any(f'FROM "{table}"' in query['sql']
+                                                                       for table in tables)])
+
+
+class BloomFilterTestCase(TestCase):
+    def test_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        keys = [f"jti-{index}" for index in range(5000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate_is_near_the_target(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for index in range(5000):
+            bloom.add(f"jti-{index}")
+        false_positives = sum(f"other-{index}" in bloom for index in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+
+    def test_adding_a_key_again_does_not_count(self):
+        bloom = BloomFilter(capacity=10, error_rate=0.01)
+        bloom.add("jti")
+        bloom.add("jti")
+        self.assertEqual(bloom.count, 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   JWT_BLACKLIST_FILTER=True)
+class BlacklistFilterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.client = APIClient()
+        self.user = UserFactory()
+        self.refresh_url = reverse("api:auth:token_refresh")
+
+    def refresh(self, token):
+        return self.client.post(self.refresh_url, {"refresh": str(token)})
+
+    def blacklist_queries(self, queries):
+        return [query['sql'] for query in queries.captured_queries
+                if BlacklistedToken._meta.db_table in query['sql']]
+
+    def blacklist_behind_the_signals(self, token):
+        # As written by another process: nothing in this one hears of it.
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+
+    def test_valid_refresh_skips_the_blacklist_table(self):
+        self.refresh(RefreshToken.for_user(self.user))
+        token = RefreshToken.for_user(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.blacklist_queries(queries), [])
+
+    def test_token_blacklisted_through_the_api_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.refresh(token)
+        self.client.post(reverse("api:auth:token_blacklist"), {"refresh": str(token)})
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_blacklisted_before_startup_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.blacklist_behind_the_signals(token)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_blacklisted_by_another_process_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.refresh(RefreshToken.for_user(self.user))
+        self.blacklist_behind_the_signals(token)
+        bump_blacklist_version()
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_committed_late_with_a_lower_id_is_rejected(self):
+        early, late = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(pk=10, token=OutstandingToken.objects.get(jti=early['jti']))])
+        self.refresh(RefreshToken.for_user(self.user))
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(pk=5, token=OutstandingToken.objects.get(jti=late['jti']))])
+        bump_blacklist_version()
+        self.assertEqual(self.refresh(late).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        # simplejwt modules hold on to the settings object, so it is patched instead of overriding SIMPLE_JWT.
+        with mock.patch.multiple(api_settings, ROTATE_REFRESH_TOKENS=True, BLACKLIST_AFTER_ROTATION=True):
+            rotated = self.refresh(token)
+            self.assertEqual(rotated.status_code, status.HTTP_200_OK)
+            self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+            verify = self.client.post(reverse("api:auth:token_verify"), {"token": str(token)})
+            self.assertEqual(verify.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.refresh(rotated.data['refresh']).status_code, status.HTTP_200_OK)
+
+
+class PruneTokensTestCase(TestCase):
+    def create_tokens(self, hours, count, blacklisted=0):
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(jti=f"{hours}-{index}", token='', expires_at=timezone.now() + timedelta(hours=hours))
+            for index in range(count))
+        BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens[:blacklisted])
+        return tokens
+
+    def prune(self, *args):
+        stdout = io.StringIO()
+        call_command('prune_tokens', '--batch-size', '2', '--sleep', '0', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_deletes_expired_tokens_in_batches(self):
+        self.create_tokens(-48, 5, blacklisted=3)
+        live = self.create_tokens(1, 2, blacklisted=1)
+        output = self.prune()
+        self.assertQuerySetEqual(OutstandingToken.objects.order_by('pk'), live)
+        self.assertEqual(BlacklistedToken.objects.get().token, live[0])
+        self.assertIn("Batch 3: removed 1 outstanding and 0 blacklisted tokens in", output)
+        self.assertIn("Removed 5 outstanding and 3 blacklisted tokens", output)
+
+    def test_keeps_tokens_within_the_grace_period(self):
+        self.create_tokens(-48, 2)
+        recent = self.create_tokens(-1, 2)
+        self.prune('--grace', '24')
+        self.assertQuerySetEqual(OutstandingToken.objects.order_by('pk'), recent)
+
+    def test_stops_at_the_first_batch_without_expired_tokens(self):
+        self.create_tokens(1, 2)
+        self.create_tokens(-48, 2)
+        self.prune()
+        self.assertEqual(OutstandingToken.objects.count(), 4)
+        self.prune('--full')
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+
+    def test_loop_prunes_until_interrupted(self):
+        self.create_tokens(-48, 2)
+        with mock.patch('authn.management.commands.prune_tokens.Command.pause',
+                        autospec=True, side_effect=lambda command, seconds: command.stop(None, None)) as pause:
+            output = self.prune('--loop', '--interval', '60')
+        pause.assert_called_once_with(mock.ANY, 60)
+        self.assertEqual(OutstandingToken.objects.count(), 0)
+        self.assertEqual(output.count("Removed"), 1)
+
+
+class HashingPoolTestCase(TestCase):
+    def test_runs_inline_without_processes(self):
+        pool = hashing.HashingPool(processes=0, max_pending=1, wait=0)
+        self.assertEqual(pool.run(len, "secret"), 6)
+
+    def test_hashes_in_worker_processes(self):
+        pool = hashing.HashingPool(processes=1, max_pending=2, wait=0)
+        self.addCleanup(pool.shutdown)
+        encoded = pool.run(hashers.make_password, "secret")
+        self.assertTrue(pool.run(hashers.check_password, "secret", encoded))
+        self.assertFalse(pool.run(hashers.check_password, "wrong", encoded))
+
+    def test_zero_max_pending_is_unbounded(self):
+        pool = hashing.HashingPool(processes=0, max_pending=0, wait=0)
+        self.assertEqual(pool.run(len, "secret"), 6)
+
+    def test_rejects_calls_beyond_max_pending(self):
+        pool = hashing.HashingPool(processes=0, max_pending=1, wait=0.01)
+        started, release = threading.Event(), threading.Event()
+        busy = threading.Thread(target=pool.run, args=(lambda: (started.set(), release.wait()),))
+        busy.start()
+        started.wait()
+        try:
+            with self.assertRaises(hashing.PasswordHashingUnavailable):
+                pool.run(len, "secret")
+        finally:
+            release.set()
+            busy.join()
+        self.assertEqual(pool.run(len, "secret"), 6)
+
+
+class HashingPoolModelBackendTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserFactory()
+        self.url = reverse("api:auth:token_obtain_pair")
+
+    def login(self, password='secret'):
+        return self.client.post(self.url, {"username": self.user.username, "password": password})
+
+    def test_login(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login('wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_user_is_hashed_too(self):
+        with mock.patch.object(hashing, 'make_password', wraps=hashing.make_password) as make_password:
+            response = self.client.post(self.url, {"username": "nobody", "password": "secret"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        make_password.assert_called_once_with("secret")
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        with self.settings(PASSWORD_HASHER_ITERATIONS=1000):
+            self.user.set_password('secret')
+            self.user.save()
+        self.login()
+        self.user.refresh_from_db()
+        self.assertEqual(hashers.identify_hasher(self.user.password).decode(self.user.password)['iterations'],
+                         hashers.get_hasher().iterations)
+
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=0)
+    def test_zero_max_pending_is_unbounded(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=1, PASSWORD_HASHING_WAIT=0.01)
+    def test_saturated_pool_answers_503(self):
+        pool = hashing.get_hashing_pool()
+        pool._slots.acquire()
+        try:
+            response = self.login()
+        finally:
+            pool._slots.release()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.headers['Retry-After'], '1')
@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from authn.serializers import RegisterUserSerializer
+from blog.db.routers import stick_to_primary
 
 
 class RegisterAPIView(APIView):
@@ -29,6 +30,8 @@ class RegisterAPIView(APIView):
         serializer = RegisterUserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
+            # The new user's first reads must find their account on the replicas too.
+            stick_to_primary(user.pk)
 
             refresh = RefreshToken.for_user(user)
             return Response({"access": str(refresh.access_token), "refresh": str(refresh)
@@ -0,0 +1,122 @@
+"""
+Login and registration throughput of a running server alongside read traffic.
+
+    python -m benchmarks.auth BASE_URL [--logins 4] [--registrations 2] [--readers 8] [--duration 10]
+
+Runs ``--logins`` clients posting to ``/api/auth/token/`` as ``--username``
+(``user1`` of a ``seed_blog`` dataset by default), ``--registrations`` clients
+registering new users, and ``--readers`` clients reading ``--read-path``, all
+at once over keep-alive connections, and reports each kind separately. A 503
+is the hashing pool's backpressure, counted apart from other errors.
+
+    PASSWORD_HASHING_PROCESSES=0 gunicorn --config gunicorn.conf.py
+    python -m benchmarks.auth http://127.0.0.1:8000
+"""
+import argparse
+import http.client
+import itertools
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def login_request(args, sequence):
+    body = urlencode({'username': args.username, 'password': args.password})
+    return 'POST', '/api/auth/token/', body, {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def register_request(args, sequence):
+    username = f'bench-{uuid.uuid4().hex[:12]}'
+    body, content_type = multipart(
+        {'first_name': 'Bench', 'last_name': str(next(sequence)), 'username': username,
+         'email': f'{username}@example.com', 'password1': args.password, 'password2': args.password, 'bio': 'Benchmark'},
+        {'profile_picture': ('picture.png', b'\x89PNG\r\n', 'image/png')})
+    return 'POST', '/api/auth/register/', body, {'Content-Type': content_type}
+
+
+def read_request(args, sequence):
+    return 'GET', args.read_path, None, {'Accept': 'application/json'}
+
+
+def client(base_url, build, args, deadline, results, lock):
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.netloc, timeout=60)
+    sequence = itertools.count()
+    timings, rejected, errors = [], 0, 0
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body, headers = build(args, sequence)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                continue
+            if response.status == 503:
+                rejected += 1
+            elif response.status >= 400:
+                errors += 1
+            else:
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+        with lock:
+            results['timings'].extend(timings)
+            results['rejected'] += rejected
+            results['errors'] += errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('base_url', metavar='BASE_URL')
+    parser.add_argument('--logins', type=int, default=4, help="Concurrent login clients")
+    parser.add_argument('--registrations', type=int, default=2, help="Concurrent registration clients")
+    parser.add_argument('--readers', type=int, default=8, help="Concurrent read clients")
+    parser.add_argument('--read-path', default='/api/tags/')
+    parser.add_argument('--username', default='user1')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    kinds = {'login': (login_request, args.logins), 'register': (register_request, args.registrations),
+             'read': (read_request, args.readers)}
+    results = {kind: defaultdict(int, timings=[]) for kind in kinds}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(args.base_url, build, args, deadline, results[kind], lock))
+               for kind, (build, count) in kinds.items() for _ in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{'kind':<10}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'503':>8}{'errors':>8}")
+    for kind, (build, count) in kinds.items():
+        timings = results[kind]['timings']
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else [0] * 99
+        print(f"{kind:<10}{count:>8}{len(timings) / elapsed:>10.1f}{percentiles[49]:>10.1f}{percentiles[98]:>10.1f}"
+              f"{results[kind]['rejected']:>8}{results[kind]['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Latency, queries and memory per request of the API endpoints.
+
+    python -m benchmarks.endpoints [--sizes 100,1000,10000] [--iterations 50]
+                                   [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+
+Each endpoint is called in-process through the full middleware stack with a
+test client against a throwaway database seeded by ``seed_blog`` (``--sizes``
+are post counts, with 10 posts per user and 5 comments per post). Response
+caching is disabled unless ``--cache`` is given, so the views themselves are
+measured. ``--save`` writes the results as JSON; ``--compare`` reports every
+metric more than ``--threshold`` (relative) worse than that baseline and exits
+with status 1 if there is any.
+"""
+import argparse
+import io
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.harness import setup, test_database
+
+PASSWORD = 'password'
+# Creates per posts_batch request.
+BATCH_SIZE = 50
+
+# Relative slack is not enough for metrics that are small integers.
+EXACT_METRICS = ('queries',)
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries', 'peak_kib')
+
+
+def build_cases(client):
+    from django.contrib.auth import get_user_model
+    from rest_framework.reverse import reverse
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from posts.models import Category, Post, Tag
+
+    user = get_user_model().objects.order_by('pk').first()
+    post = Post.objects.order_by('-comment_count').first()
+    refresh = str(RefreshToken.for_user(user))
+    posts_url = reverse("api:posts:posts-list")
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    own_post = Post.objects.filter(author__user=user).order_by('pk').first()
+    categories = list(Category.objects.order_by('pk').values_list('pk', flat=True)[:4])
+    tags = list(Tag.objects.order_by('pk').values_list('pk', flat=True)[:4])
+    # Updates alternate between two sets of categories and tags, so each one changes both relations.
+    taxonomies = itertools.cycle([(categories[:2], tags[:2]), (categories[2:], tags[2:])])
+    titles = itertools.count()
+
+    def post_data():
+        post_categories, post_tags = next(taxonomies)
+        return {'title': 'Benchmark', 'content': 'Benchmark content', 'categories': post_categories,
+                'tags': post_tags}
+
+    return {
+        'posts_list': lambda: client.get(posts_url),
+        'posts_list_deep_offset': lambda: client.get(f'{posts_url}?offset={Post.objects.count() // 2}'),
+        'posts_list_cursor': lambda: client.get(f'{posts_url}?pagination=cursor'),
+        'posts_list_search': lambda: client.get(f'{posts_url}?q=garden'),
+        'posts_list_ordered': lambda: client.get(f'{posts_url}?ordering=-comment_count'),
+        'posts_list_sparse': lambda: client.get(f'{posts_url}?fields=id,title,author,tags&expand='),
+        'posts_retrieve': lambda: client.get(reverse("api:posts:posts-detail", args=[post.pk])),
+        'posts_comments': lambda: client.get(reverse("api:posts:posts-comments", args=[post.pk])),
+        'comments_list': lambda: client.get(reverse("api:comments:comments-list")),
+        'comments_list_sparse': lambda: client.get(f'{reverse("api:comments:comments-list")}?omit=content&expand='),
+        'categories_list': lambda: client.get(reverse("api:categories:listing")),
+        'tags_list': lambda: client.get(reverse("api:tags:listing")),
+        'token_obtain': lambda: client.post(reverse("api:auth:token_obtain_pair"),
+                                            {'username': user.username, 'password': PASSWORD}),
+        'token_refresh': lambda: client.post(reverse("api:auth:token_refresh"), {'refresh': refresh}),
+        'token_verify': lambda: client.post(reverse("api:auth:token_verify"), {'token': refresh}),
+        'posts_create': lambda: client.post(posts_url, post_data(), **auth),
+        'posts_update': lambda: client.put(reverse("api:posts:posts-detail", args=[own_post.pk]), post_data(),
+                                           **auth),
+        'posts_partial_update': lambda: client.patch(reverse("api:posts:posts-detail", args=[own_post.pk]),
+                                                     {'title': f'Benchmark {next(titles)}'}, format='json', **auth),
+        'posts_batch': lambda: client.post(
+            reverse("api:posts:posts-batch"),
+            {'operations': [{'op': 'create', 'data': post_data()} for _ in range(BATCH_SIZE)]}, format='json', **auth),
+    }
+
+
+def measure(request, iterations):
+    from django.db import connection
+
+    from blog.testing import QueryRecorder
+
+    for _ in range(3):
+        response = request()
+        assert response.status_code < 400, (response.status_code, getattr(response, 'data', None))
+
+    timings = []
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        for _ in range(iterations):
+            start = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(iterations // 10, 3)):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            request()
+            peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'queries': round(len(recorder) / iterations, 2),
+        'peak_kib': round(statistics.median(peaks), 1),
+    }
+
+
+def run(sizes, iterations, only):
+    from django.core.management import call_command
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from posts.models import Post
+
+    results = {}
+    for index, size in enumerate(sorted(sizes)):
+        # Top the dataset up to this size instead of reseeding from scratch.
+        missing = size - Post.objects.count()
+        call_command('seed_blog', users=max(missing // 10, 1), posts=missing, comments=missing * 5, seed=index,
+                     password=PASSWORD, stdout=io.StringIO())
+
+        cases = build_cases(APIClient())
+        for name, request in cases.items():
+            if only and name not in only:
+                continue
+            key = f'{name}@{size}'
+            results[key] = measure(request, iterations)
+            print(f"{key:<32}" + ''.join(f"{results[key][metric]:>12}" for metric in METRICS), flush=True)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'django': __import__('django').get_version(),
+            'database': f'{connection.vendor} {connection.Database.sqlite_version}'
+            if connection.vendor == 'sqlite' else connection.vendor,
+            'iterations': iterations,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for key, metrics in current['results'].items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            before, after = previous.get(metric), metrics[metric]
+            if before is None:
+                continue
+            limit = before if metric in EXACT_METRICS else before * (1 + threshold)
+            if after > limit:
+                change = f'+{(after - before) / before:.0%}' if before else 'new'
+                regressions.append(f"{key:<32}{metric:<10}{before:>12}{after:>12}{change:>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help="Comma-separated post counts to seed")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--only', default='', help="Comma-separated endpoint names to run")
+    parser.add_argument('--cache', action='store_true', help="Keep the configured response cache enabled")
+    parser.add_argument('--save', metavar='PATH', help="Write the results to this JSON file")
+    parser.add_argument('--compare', metavar='PATH', help="Baseline JSON file to check the results against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed relative slowdown, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    print(f"{'endpoint@posts':<32}" + ''.join(f"{metric:>12}" for metric in METRICS))
+    caches = {} if args.cache else {'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}}
+    with test_database(), override_settings(**caches):
+        sizes = [int(size) for size in args.sizes.split(',')]
+        current = run(sizes, args.iterations, set(filter(None, args.only.split(','))))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.compare} (threshold {args.threshold:.0%}):")
+            print(f"{'endpoint@posts':<32}{'metric':<10}{'baseline':>12}{'current':>12}{'change':>8}")
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import os
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Run the block against a freshly migrated throwaway database, the same way
+    ``manage.py test`` does, so benchmarks never touch real data.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
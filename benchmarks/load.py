@@ -0,0 +1,113 @@
+"""
+Throughput and latency of running servers under concurrent clients.
+
+    python -m benchmarks.load URL [URL ...] [--concurrency 1,8,32,128] [--duration 10]
+
+Each URL is hammered for ``--duration`` seconds per concurrency level by that
+many clients, each holding one keep-alive connection and sending its next
+request as soon as the previous answer arrives. To compare the WSGI and ASGI
+deployments, start both against the same database (seeded with ``seed_blog``)
+and pass the sync and async URL of the same endpoint:
+
+    gunicorn --bind 127.0.0.1:8000 --workers 2 blog.wsgi:application
+    gunicorn --bind 127.0.0.1:8001 --workers 2 -k uvicorn.workers.UvicornWorker blog.asgi:application
+    python -m benchmarks.load http://127.0.0.1:8000/api/posts/ http://127.0.0.1:8001/api/async/posts/
+
+``--think`` adds a pause after every response. ``--slow-clients`` opens that
+many extra connections which trickle their request headers one byte every
+``--slow-interval`` seconds for the whole run, like clients on a bad network
+without a buffering proxy in front; the table shows what the others get.
+"""
+import argparse
+import http.client
+import socket
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def client(url, deadline, think, results, errors):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    timings = []
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Accept': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors.append(1)
+                connection.close()
+                continue
+            if response.status != 200:
+                errors.append(response.status)
+            timings.append((time.perf_counter() - start) * 1000)
+            if think:
+                time.sleep(think)
+    finally:
+        connection.close()
+        results.extend(timings)
+
+
+def slow_client(url, deadline, interval):
+    parts = urlsplit(url)
+    request = f"GET {parts.path} HTTP/1.1\r\nHost: {parts.netloc}\r\n".encode()
+    try:
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=30) as sock:
+            for byte in request + b"X-Padding: " + b"x" * 100_000:
+                if time.perf_counter() >= deadline:
+                    break
+                sock.send(bytes([byte]))
+                time.sleep(interval)
+    except OSError:
+        pass
+
+
+def run(url, concurrency, duration, think, slow_clients=0, slow_interval=1.0):
+    results, errors = [], []
+    deadline = time.perf_counter() + duration
+    for _ in range(slow_clients):
+        threading.Thread(target=slow_client, args=(url, deadline, slow_interval), daemon=True).start()
+    threads = [threading.Thread(target=client, args=(url, deadline, think, results, errors))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(results, n=100, method='inclusive') if len(results) > 1 else [0] * 99
+    return {
+        'rps': len(results) / elapsed,
+        'p50_ms': percentiles[49],
+        'p99_ms': percentiles[98],
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', nargs='+', metavar='URL')
+    parser.add_argument('--concurrency', default='1,8,32,128', help="Comma-separated numbers of clients")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per URL and concurrency level")
+    parser.add_argument('--think', type=float, default=0, help="Seconds each client waits between requests")
+    parser.add_argument('--slow-clients', type=int, default=0, help="Connections trickling their request headers")
+    parser.add_argument('--slow-interval', type=float, default=1.0, help="Seconds between bytes of a slow client")
+    args = parser.parse_args()
+
+    print(f"{'url':<48}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for concurrency in (int(value) for value in args.concurrency.split(',')):
+        for url in args.urls:
+            result = run(url, concurrency, args.duration, args.think, args.slow_clients, args.slow_interval)
+            print(f"{url:<48}{concurrency:>8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['errors']:>8}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-item CPU time of post and comment serialization.
+
+    python -m benchmarks.serializers [--posts 20] [--iterations 200]
+
+``nested`` rebuilds a ModelSerializer for every category, tag and author (the
+original ``CategoryField``/``TagField``/``AuthorField``), ``drf`` is
+``PostSerializer(many=True).data`` and ``flat`` is ``PostSerializer.represent``.
+"""
+import argparse
+import time
+
+from benchmarks.harness import setup, test_database
+
+
+def build_legacy_serializers():
+    from rest_framework import serializers
+
+    from posts.models import Category, Tag
+    from posts.serializers import CategorySerializer, CommentSerializer, PostSerializer, TagSerializer
+    from profiles.serializers import ProfileSerializer
+
+    class NestedCategoryField(serializers.RelatedField):
+        def to_representation(self, value):
+            return CategorySerializer(value).data
+
+    class NestedTagField(serializers.RelatedField):
+        def to_representation(self, value):
+            return TagSerializer(value).data
+
+    class NestedAuthorField(serializers.RelatedField):
+        def to_representation(self, value):
+            return ProfileSerializer(value).data
+
+    class NestedPostSerializer(PostSerializer):
+        categories = NestedCategoryField(queryset=Category.objects.all(), many=True)
+        tags = NestedTagField(queryset=Tag.objects.all(), many=True)
+        author = NestedAuthorField(read_only=True)
+
+    class NestedCommentSerializer(CommentSerializer):
+        author = NestedAuthorField(read_only=True)
+
+    return NestedPostSerializer, NestedCommentSerializer
+
+
+def seed(posts):
+    from posts.models import Comment
+    from posts.tests.factories import CategoryFactory, PostFactory, TagFactory
+    from profiles.tests.factories import UserFactory
+
+    author = UserFactory().profile
+    categories = CategoryFactory.create_batch(3)
+    tags = TagFactory.create_batch(5)
+    for post in PostFactory.create_batch(posts, author=author, categories=categories, tags=tags):
+        Comment.objects.create(post=post, author=author, content=post.content)
+
+
+def measure(render, items, iterations):
+    render(items)
+    start = time.process_time()
+    for _ in range(iterations):
+        render(items)
+    return (time.process_time() - start) / (iterations * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        from posts.serializers import CommentSerializer, PostSerializer
+        from posts.views.view_api import CommentViewSet, PostViewSet
+
+        seed(args.posts)
+        NestedPostSerializer, NestedCommentSerializer = build_legacy_serializers()
+        posts = list(PostViewSet.queryset)
+        comments = list(CommentViewSet.queryset)
+
+        assert PostSerializer.represent(posts, many=True) == NestedPostSerializer(posts, many=True).data
+        assert CommentSerializer.represent(comments, many=True) == NestedCommentSerializer(comments, many=True).data
+
+        cases = [
+            ('post', 'nested', lambda items: NestedPostSerializer(items, many=True).data, posts),
+            ('post', 'drf', lambda items: PostSerializer(items, many=True).data, posts),
+            ('post', 'flat', lambda items: PostSerializer.represent(items, many=True), posts),
+            ('comment', 'nested', lambda items: NestedCommentSerializer(items, many=True).data, comments),
+            ('comment', 'drf', lambda items: CommentSerializer(items, many=True).data, comments),
+            ('comment', 'flat', lambda items: CommentSerializer.represent(items, many=True), comments),
+        ]
+        print(f"{'serializer':<12}{'path':<8}{'us/item':>10}")
+        for name, path, render, items in cases:
+            print(f"{name:<12}{path:<8}{measure(render, items, args.iterations):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput of ``TokenRefreshView`` with and without the blacklist filter.
+
+    python -m benchmarks.token_refresh [--blacklisted 0,10000,100000] [--requests 500] [--rotate]
+
+Each ``--blacklisted`` size fills the outstanding and blacklisted token tables
+of a throwaway database with that many rows, then refreshes ``--requests``
+distinct valid tokens in-process through the full middleware stack, once
+checking the blacklist table for every token and once through the Bloom
+filter of ``authn.blacklist`` (with a local memory cache standing in for the
+shared one). ``--rotate`` turns on refresh token rotation, so every request
+also blacklists the token it refreshed.
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from benchmarks.harness import setup, test_database
+
+
+def fill_blacklist(size, batch_size=5000):
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    expires_at = timezone.now() + timedelta(days=1)
+    missing = size - BlacklistedToken.objects.count()
+    for start in range(0, missing, batch_size):
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(jti=uuid.uuid4().hex, token='', expires_at=expires_at)
+            for _ in range(min(batch_size, missing - start)))
+        BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens)
+
+
+def measure(client, url, tokens):
+    timings = []
+    started = time.perf_counter()
+    for token in tokens:
+        start = time.perf_counter()
+        response = client.post(url, {'refresh': token})
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.data
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {'rps': len(tokens) / elapsed, 'p50_ms': percentiles[49], 'p99_ms': percentiles[98]}
+
+
+def run(sizes, requests, rotate):
+    from django.core.cache import cache
+    from django.test.utils import override_settings
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from authn.blacklist import blacklist_filter
+    from profiles.tests.factories import UserFactory
+
+    user = UserFactory()
+    client, url = APIClient(), reverse("api:auth:token_refresh")
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    print(f"{'blacklisted':>12}{'filter':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    with mock.patch.multiple(api_settings, ROTATE_REFRESH_TOKENS=rotate, BLACKLIST_AFTER_ROTATION=rotate):
+        for size in sorted(sizes):
+            fill_blacklist(size)
+            for enabled in (False, True):
+                with override_settings(CACHES=locmem, JWT_BLACKLIST_FILTER=enabled):
+                    cache.clear()
+                    blacklist_filter.reset()
+                    tokens = [str(RefreshToken.for_user(user)) for _ in range(requests)]
+                    # Warm up: the first check builds the filter.
+                    measure(client, url, [str(RefreshToken.for_user(user)) for _ in range(5)])
+                    result = measure(client, url, tokens)
+                print(f"{size:>12}{'on' if enabled else 'off':>8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                      f"{result['p99_ms']:>10.2f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blacklisted', default='0,10000,100000', help="Comma-separated blacklist sizes")
+    parser.add_argument('--requests', type=int, default=500, help="Refresh requests per measurement")
+    parser.add_argument('--rotate', action='store_true', help="Rotate and blacklist refresh tokens")
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        run([int(size) for size in args.blacklisted.split(',')], args.requests, args.rotate)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+from blog.db.pool import PoolTimeout, get_pool
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Makes a Django ``DatabaseWrapper`` check its connection out of the process
+    wide ``ConnectionPool`` of its alias instead of connecting, and return it
+    there instead of closing it. Configured by the ``POOL`` dict of the
+    database settings (``max_size``, ``timeout``, ``max_lifetime``,
+    ``check_after``).
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, check=self.check_pooled_connection, reset=self.reset_pooled_connection,
+                        **self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.pool.getconn(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            # Surfaces as django.db.OperationalError, like any failure to connect.
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+
+    def check_pooled_connection(self, connection):
+        """Raise if ``connection`` cannot serve queries any more."""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def reset_pooled_connection(self, connection):
+        """
+        Bring ``connection`` back to a clean state before it is reused; raise to
+        discard it. Rolls back the transaction left open, if any; ``connect()``
+        sets the autocommit mode again when the connection is checked out.
+        """
+        connection.rollback()
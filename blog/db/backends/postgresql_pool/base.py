@@ -0,0 +1,22 @@
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper, IsolationLevel
+
+from blog.db.backends.pooling import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, PostgresDatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        # A reused connection skips the parent's get_new_connection(), which
+        # is also where the isolation level gets recorded.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED))
+        return super().get_new_connection(conn_params)
+
+    def check_pooled_connection(self, connection):
+        if connection.closed:
+            raise self.Database.InterfaceError("connection already closed")
+        super().check_pooled_connection(connection)
+
+    def reset_pooled_connection(self, connection):
+        if connection.closed:
+            raise self.Database.InterfaceError("connection already closed")
+        super().reset_pooled_connection(connection)
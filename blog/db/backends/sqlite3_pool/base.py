@@ -0,0 +1,11 @@
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from blog.db.backends.pooling import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+    """
+    Pooled SQLite backend; a stand-in for exercising the pool without a Postgres
+    server. Each connection to an in-memory database is a database of its own,
+    so use a file.
+    """
@@ -0,0 +1,87 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from blog.db.routers import (
+    RoutingState, _state, ais_stuck_to_primary, apin_to_primary, is_stuck_to_primary, pin_to_primary,
+)
+
+
+def token_user_id(request):
+    """
+    User id from the JWT of ``request``, if it carries a valid one. Checks the
+    signature only; the user is not loaded.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError):
+        return None
+
+
+def pinned_user(state, user_id):
+    """The user to keep on the primary after a request: one pinned explicitly, or the one who wrote."""
+    if state.pinned_user_id is not None:
+        return state.pinned_user_id
+    return user_id if state.wrote else None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Tracks database routing per request for ``ReplicaRouter``. Unsafe requests
+    read from the primary throughout; a user whose request wrote anything
+    keeps reading from the primary for ``DATABASE_REPLICA_STICKY_SECONDS``,
+    through a pin the response carries back to whichever worker serves them
+    next (see ``pin_to_primary``). Not loaded without ``DATABASE_REPLICAS``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = token_user_id(request)
+        primary = request.method not in SAFE_METHODS or (
+            user_id is not None and is_stuck_to_primary(request, user_id))
+        state = RoutingState(primary=primary)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        pinned_user_id = pinned_user(state, user_id)
+        if pinned_user_id is not None:
+            pin_to_primary(response, pinned_user_id)
+        return response
+
+    async def __acall__(self, request):
+        user_id = token_user_id(request)
+        primary = request.method not in SAFE_METHODS or (
+            user_id is not None and await ais_stuck_to_primary(request, user_id))
+        # Sync views run in a copy of this context; they still share the state object.
+        state = RoutingState(primary=primary)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        pinned_user_id = pinned_user(state, user_id)
+        if pinned_user_id is not None:
+            await apin_to_primary(response, pinned_user_id)
+        return response
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    At most ``max_size`` connections are open at once; a checkout beyond that
+    waits up to ``timeout`` seconds for one to be returned and then raises
+    ``PoolTimeout``. Idle connections are reused most recently returned first,
+    run through ``check`` when they sat idle for over ``check_after`` seconds,
+    and replaced once older than ``max_lifetime``. ``reset`` runs on every
+    return (rolling back an open transaction, say); a connection failing either
+    is closed and counted as discarded.
+    """
+
+    def __init__(self, max_size=10, timeout=30.0, max_lifetime=None, check=None, check_after=5.0, reset=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.check_after = check_after
+        self.reset = reset
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, opened_at, returned_at)
+        self._opened_at = {}
+        self._size = 0
+        self._counters = dict.fromkeys(
+            ('checkouts', 'waits', 'timeouts', 'connections_created', 'connections_discarded'), 0)
+        self._wait_time = 0.0
+
+    def getconn(self, connect):
+        """
+        Check out a connection, opening one with ``connect()`` while the pool
+        is below ``max_size``.
+        """
+        deadline = time.monotonic() + self.timeout
+        waited_from = None
+        with self._lock:
+            self._counters['checkouts'] += 1
+            while True:
+                if self._idle:
+                    connection, opened_at, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+
+                now = time.monotonic()
+                if waited_from is None:
+                    waited_from = now
+                    self._counters['waits'] += 1
+                if now >= deadline:
+                    self._wait_time += now - waited_from
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f"No connection available within {self.timeout}s "
+                                      f"({self.max_size} in use)")
+                self._lock.wait(deadline - now)
+            if waited_from is not None:
+                self._wait_time += time.monotonic() - waited_from
+
+        if connection is not None:
+            now = time.monotonic()
+            if self.max_lifetime is not None and now - opened_at > self.max_lifetime:
+                self._close(connection, release=False)
+                connection = None
+            elif self.check is not None and now - returned_at > self.check_after:
+                try:
+                    self.check(connection)
+                except Exception:
+                    self._close(connection, release=False)
+                    connection = None
+        if connection is None:
+            connection = self._open(connect)
+        return connection
+
+    def putconn(self, connection, discard=False):
+        """Return a checked out connection, or close it for good with ``discard``."""
+        if not discard and self.reset is not None:
+            try:
+                self.reset(connection)
+            except Exception:
+                discard = True
+        if discard:
+            self._close(connection)
+            return
+
+        with self._lock:
+            self._idle.append((connection, self._opened_at[id(connection)], time.monotonic()))
+            self._lock.notify()
+
+    def close(self):
+        """Close every idle connection; checked out ones are closed when returned."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, opened_at, returned_at in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'wait_time': round(self._wait_time, 6),
+                **self._counters,
+            }
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opened_at[id(connection)] = time.monotonic()
+            self._counters['connections_created'] += 1
+        return connection
+
+    def _close(self, connection, release=True):
+        """
+        Close ``connection``. Without ``release`` the caller keeps its slot to
+        open a replacement in.
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._opened_at.pop(id(connection), None)
+            self._counters['connections_discarded'] += 1
+            if release:
+                self._size -= 1
+                self._lock.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, **options):
+    """
+    The pool for database ``alias`` in this process. Pools are never shared
+    across a fork: a forked worker gets its own on first use.
+    """
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**options)
+        return pool
+
+
+def pool_stats():
+    """Statistics of every pool opened by this process, by database alias."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [(alias, pool) for (owner, alias), pool in _pools.items() if owner == pid]
+    return {alias: pool.stats() for alias, pool in pools}
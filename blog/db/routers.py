@@ -0,0 +1,113 @@
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_PIN_KEY = 'db:primary-pin:{}'
+PRIMARY_PIN_COOKIE = 'primary_pin'
+PRIMARY_PIN_SALT = 'blog.db.routers.primary-pin'
+
+
+@dataclass
+class RoutingState:
+    # Reads go to the primary: the request writes, or its user wrote recently.
+    primary: bool = False
+    wrote: bool = False
+    # User to keep on the primary after this request, besides a writing one.
+    pinned_user_id: int = None
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def use_primary():
+    """Send the remaining reads of the current request to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.primary = True
+
+
+def stick_to_primary(user_id):
+    """
+    Send reads of ``user_id`` to the primary for ``DATABASE_REPLICA_STICKY_SECONDS``
+    once the current request is answered.
+    """
+    state = _state.get()
+    if state is not None:
+        state.pinned_user_id = user_id
+
+
+def pin_to_primary(response, user_id):
+    """
+    Pin ``user_id`` to the primary with a signed cookie on ``response``, which
+    any worker can check, and in the cache when it is shared, for clients
+    that do not keep cookies.
+    """
+    _set_pin_cookie(response, user_id)
+    if settings.CACHE_IS_SHARED:
+        cache.set(PRIMARY_PIN_KEY.format(user_id), True, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+async def apin_to_primary(response, user_id):
+    _set_pin_cookie(response, user_id)
+    if settings.CACHE_IS_SHARED:
+        await cache.aset(PRIMARY_PIN_KEY.format(user_id), True, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def _set_pin_cookie(response, user_id):
+    response.set_signed_cookie(PRIMARY_PIN_COOKIE, str(user_id), salt=PRIMARY_PIN_SALT,
+                               max_age=settings.DATABASE_REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax')
+
+
+def _has_pin_cookie(request, user_id):
+    pinned = request.get_signed_cookie(PRIMARY_PIN_COOKIE, default=None, salt=PRIMARY_PIN_SALT,
+                                       max_age=settings.DATABASE_REPLICA_STICKY_SECONDS)
+    return pinned == str(user_id)
+
+
+def is_stuck_to_primary(request, user_id):
+    if _has_pin_cookie(request, user_id):
+        return True
+    return settings.CACHE_IS_SHARED and cache.get(PRIMARY_PIN_KEY.format(user_id)) is not None
+
+
+async def ais_stuck_to_primary(request, user_id):
+    if _has_pin_cookie(request, user_id):
+        return True
+    return settings.CACHE_IS_SHARED and await cache.aget(PRIMARY_PIN_KEY.format(user_id)) is not None
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of requests to a random alias of ``DATABASE_REPLICAS`` and
+    all writes to the primary (``default``). Reads stay on the primary for the
+    rest of a request that wrote or was stuck to it by
+    ``ReplicaStickinessMiddleware``, so nobody misses their own writes because
+    of replication lag. Outside requests (management commands, the shell) and
+    without replicas every query goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        state = _state.get()
+        if state is None or state.primary:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.primary = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,151 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.translation import gettext as _
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+from blog.serializers import FlatSerializer
+
+FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        name='fields',
+        in_=openapi.IN_QUERY,
+        description="Only return these fields (comma-separated)",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        name='omit',
+        in_=openapi.IN_QUERY,
+        description="Leave out these fields (comma-separated)",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        name='expand',
+        in_=openapi.IN_QUERY,
+        description="Relations to return as nested objects (comma-separated); the other relations are returned "
+                    "as IDs. All of them are expanded when left out.",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+
+_sources = {}
+
+
+def readable_sources(serializer_class):
+    """The source of every readable field of ``serializer_class``, by field name, in order."""
+    sources = _sources.get(serializer_class)
+    if sources is None:
+        sources = _sources[serializer_class] = {
+            field.field_name: field.source for field in serializer_class()._readable_fields}
+    return sources
+
+
+def parse_names(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+class Fieldset:
+    """
+    The fields of ``serializer_class`` a request asks for.
+
+    ``?fields=`` lists the fields to return and ``?omit=`` the ones to leave
+    out; ``?expand=`` lists which of the serializer's ``expandable_fields`` are
+    returned as nested objects, the others being returned as primary keys.
+    Without ``expand`` every relation is expanded, so a request with none of
+    the parameters gets the full representation. ``apply`` narrows a queryset
+    to what those fields read, and ``flat_serializer`` renders just them.
+    """
+
+    def __init__(self, serializer_class, fields=None, omit=(), expand=None):
+        self.serializer_class = serializer_class
+        readable = readable_sources(serializer_class)
+        expandable = getattr(serializer_class, 'expandable_fields', ())
+
+        errors = {}
+        for param, names, allowed in (('fields', fields or (), readable), ('omit', omit, readable),
+                                      ('expand', expand or (), expandable)):
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                errors[param] = [_("Unknown field %(name)r.") % {'name': name} for name in unknown]
+        if errors:
+            raise ValidationError(errors)
+
+        self.fields = tuple(name for name in readable if (fields is None or name in fields) and name not in omit)
+        # Only relations among the fields, so equal fieldsets share one flat serializer.
+        collapsed = frozenset() if expand is None else frozenset(expandable).difference(expand)
+        self.collapsed = collapsed.intersection(self.fields)
+        self.complete = len(self.fields) == len(readable) and not self.collapsed
+
+    @classmethod
+    def from_request(cls, serializer_class, request):
+        params = request.GET
+        fields = parse_names(params['fields']) if params.get('fields') else None
+        omit = parse_names(params.get('omit', ''))
+        expand = parse_names(params['expand']) if 'expand' in params else None
+        return cls(serializer_class, fields=fields, omit=omit, expand=expand)
+
+    def flat_serializer(self):
+        if self.complete:
+            return FlatSerializer.for_class(self.serializer_class)
+        return FlatSerializer.for_class(self.serializer_class, self.fields, self.collapsed)
+
+    def apply(self, queryset, keep=()):
+        """
+        ``queryset`` loading only the columns of the requested fields, plus
+        its primary key and the ``keep`` ones (what a paginator reads), and
+        only the ``select_related`` and ``prefetch_related`` lookups of the
+        requested, expanded relations. Collapsed many-to-many relations
+        prefetch the related primary keys alone. The full fieldset leaves
+        ``queryset`` as it is.
+        """
+        if self.complete:
+            return queryset
+        opts = queryset.model._meta
+        sources = readable_sources(self.serializer_class)
+        columns, select_related, prefetch_related = {opts.pk.name, *keep}, [], []
+        for name in self.fields:
+            source = sources[name]
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                # Anything else (a property, a nested source, '*') could read any column.
+                return queryset
+            if model_field.many_to_many or model_field.one_to_many:
+                if name in self.collapsed:
+                    related_model = model_field.related_model
+                    prefetch_related.append(Prefetch(source, queryset=related_model._base_manager.only('pk')))
+                else:
+                    prefetch_related.extend(lookups_of(queryset, source) or [source])
+            else:
+                columns.add(source)
+                if model_field.is_relation and name not in self.collapsed:
+                    select_related.extend(select_related_paths_of(queryset, source))
+
+        queryset = queryset.select_related(None).prefetch_related(None).only(*columns)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+def lookups_of(queryset, name):
+    """The ``prefetch_related`` lookups of ``queryset`` through relation ``name``."""
+    return [lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0] == name]
+
+
+def select_related_paths_of(queryset, name):
+    """The ``select_related`` paths of ``queryset`` through relation ``name``."""
+    def paths(tree, prefix):
+        for key, subtree in tree.items():
+            if subtree:
+                yield from paths(subtree, f'{prefix}{key}__')
+            else:
+                yield f'{prefix}{key}'
+
+    tree = queryset.query.select_related
+    if not isinstance(tree, dict) or name not in tree:
+        return []
+    return list(paths({name: tree[name]}, ''))
@@ -0,0 +1,164 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve_media_path(path):
+    """
+    Absolute path of the media file at ``path``, raising ``Http404`` for
+    anything outside ``MEDIA_ROOT``, hidden, or not a regular file.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404("Not found")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except ValueError:
+        raise Http404("Not found")
+    if not os.path.isfile(full_path):
+        raise Http404("Not found")
+    return full_path
+
+
+def is_immutable(path):
+    return path.startswith(settings.MEDIA_IMMUTABLE_PREFIXES)
+
+
+def is_public(path):
+    return import_string(settings.MEDIA_PUBLIC_CHECK)(path)
+
+
+def protect(response, path, content_type):
+    """
+    Keep an uploaded file from running as a page of this origin: only the
+    ``MEDIA_INLINE_TYPES`` images are shown inline, without sniffing, and
+    anything else is a sandboxed download.
+    """
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if content_type not in settings.MEDIA_INLINE_TYPES:
+        response.headers['Content-Disposition'] = content_disposition_header(True, posixpath.basename(path))
+        response.headers['Content-Security-Policy'] = 'sandbox'
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) of a single ``bytes`` range within ``size``,
+    ``None`` to send the whole file, which is also the answer to multiple
+    ranges and malformed headers, or ``ValueError`` when nothing of the file
+    is asked for.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+        if start > end:
+            raise ValueError(header)
+    else:
+        if not int(last):
+            raise ValueError(header)
+        start, end = max(size - int(last), 0), size - 1
+    return start, end
+
+
+def read_range(file, start, length, block_size=64 * 1024):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, full_path, stat, content_type):
+    """The file, or the part asked for with ``Range``, from this process."""
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range') not in (None, *etag_and_date(stat)):
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, stat.st_size) if range_header else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response.headers['Content-Length'] = stat.st_size
+    elif byte_range is None:
+        # Handed to the server's wsgi.file_wrapper, which gunicorn sends with sendfile().
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(open(full_path, 'rb'), start, end - start + 1),
+                                         status=206, content_type=content_type)
+        response.headers['Content-Length'] = end - start + 1
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def accel_response(path, full_path, content_type):
+    """An empty response telling the front proxy which file to send."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE_BACKEND == 'nginx':
+        response.headers['X-Accel-Redirect'] = quote(settings.MEDIA_ACCEL_REDIRECT_PREFIX + path)
+    else:
+        response.headers['X-Sendfile'] = full_path
+    return response
+
+
+def etag_and_date(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', http_date(stat.st_mtime)
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an uploaded file, through the front proxy with
+    ``MEDIA_SENDFILE_BACKEND`` set to ``nginx`` (``X-Accel-Redirect``) or
+    ``apache`` (``X-Sendfile``), or streamed from here otherwise. Files that
+    ``MEDIA_PUBLIC_CHECK`` doesn't pass are for staff only. Files under
+    ``MEDIA_IMMUTABLE_PREFIXES`` never change under their name and may be
+    cached forever; anything else for ``MEDIA_CACHE_MAX_AGE`` seconds.
+    """
+    full_path = resolve_media_path(path)
+    path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    public = is_public(path)
+    if not public and not request.user.is_staff:
+        raise Http404("Not found")
+    stat = os.stat(full_path)
+    etag, last_modified = etag_and_date(stat)
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=parse_http_date_safe(last_modified))
+    if response is None:
+        if settings.MEDIA_SENDFILE_BACKEND in ('nginx', 'apache'):
+            response = accel_response(path, full_path, content_type)
+        else:
+            response = file_response(request, full_path, stat, content_type)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = last_modified
+    protect(response, path, content_type)
+    if not public:
+        patch_cache_control(response, private=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    elif is_immutable(path):
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
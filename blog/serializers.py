@@ -0,0 +1,139 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField, PKOnlyObject
+
+
+class FlatSerializer:
+    """
+    Read-only representation of a serializer class.
+
+    The serializer is instantiated once per class and its readable fields are
+    reduced to ``(name, get_attribute, to_representation)`` tuples, so rendering
+    an instance costs a loop over bound methods instead of building a new
+    serializer and field map for it. The output matches ``serializer.data``.
+    """
+    _compiled = {}
+
+    def __init__(self, serializer_class, fields=None, collapsed=frozenset()):
+        self.fields = []
+        for field in serializer_class()._readable_fields:
+            if fields is not None and field.field_name not in fields:
+                continue
+            if field.field_name in collapsed:
+                self.fields.append((field.field_name, primary_key_getter(field), _identity))
+                continue
+            to_representation = field.to_representation
+            if isinstance(field, serializers.Serializer):
+                to_representation = FlatSerializer.for_class(type(field)).to_representation
+            self.fields.append((field.field_name, field.get_attribute, to_representation))
+
+    @classmethod
+    def for_class(cls, serializer_class, fields=None, collapsed=frozenset()):
+        """
+        The compiled representation of ``serializer_class``, limited to
+        ``fields`` if given, with the relations in ``collapsed`` rendered as
+        primary keys instead of nested objects.
+        """
+        key = (serializer_class, fields, collapsed)
+        compiled = cls._compiled.get(key)
+        if compiled is None:
+            compiled = cls._compiled[key] = cls(serializer_class, fields, collapsed)
+        return compiled
+
+    def to_representation(self, instance):
+        ret = {}
+        for name, get_attribute, to_representation in self.fields:
+            try:
+                attribute = get_attribute(instance)
+            except SkipField:
+                continue
+
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            ret[name] = None if check_for_none is None else to_representation(attribute)
+        return ret
+
+
+def _identity(value):
+    return value
+
+
+def primary_key_getter(field):
+    """
+    Read the primary key(s) of relation ``field`` without loading the related
+    rows: the ``<name>_id`` column of a foreign key, or the (prefetched)
+    related objects of a many-to-many field.
+    """
+    if isinstance(field, ManyRelatedField):
+        return lambda instance: [obj.pk for obj in getattr(instance, field.source).all()]
+    attname = f'{field.source}_id'
+    return lambda instance: getattr(instance, attname)
+
+
+class FlatRepresentationMixin:
+    @classmethod
+    def represent(cls, instance, many=False, fieldset=None):
+        flat = FlatSerializer.for_class(cls) if fieldset is None else fieldset.flat_serializer()
+        if many:
+            return [flat.to_representation(item) for item in instance]
+        return flat.to_representation(instance)
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    """
+    List of primary keys looked up with one ``IN`` query instead of one query
+    per item. Validates to the model instances in the queryset's order, each
+    once. A ``related_objects`` context entry mapping the model to
+    ``{pk: instance}`` in queryset order is used instead of the query, so a
+    caller validating many serializers can look them all up at once.
+    """
+    default_error_messages = {
+        'does_not_exist': _('Invalid pk "{pk_value}" - object does not exist.'),
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        pks = list(dict.fromkeys(self.child_relation.to_internal_value(item) for item in data))
+        queryset = self.child_relation.get_queryset()
+        known = self.context.get('related_objects', {}).get(queryset.model)
+        if known is None:
+            objects = list(queryset.filter(pk__in=pks))
+        else:
+            wanted = set(pks)
+            objects = [obj for pk, obj in known.items() if pk in wanted]
+        missing = set(pks).difference(obj.pk for obj in objects)
+        if missing:
+            self.fail('does_not_exist', pk_value=next(pk for pk in pks if pk in missing))
+        return objects
+
+
+class BulkPrimaryKeyRelatedField(serializers.RelatedField):
+    """
+    Related field written as primary keys. Only the type of each key is
+    checked here; with ``many=True`` their existence is checked all at once by
+    ``BulkManyRelatedField``.
+    """
+    default_error_messages = {
+        'incorrect_type': _('Incorrect type. Expected pk value, received {data_type}.'),
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
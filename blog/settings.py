@@ -61,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.db.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -97,9 +98,58 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "password"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", "5432"),
+        # Keep a worker's connection open across requests (seconds; 0 closes it
+        # after every request) and ping it before reuse.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": bool(distutils.util.strtobool(os.environ.get("DB_CONN_HEALTH_CHECKS", "true"))),
     }
 }
 
+# In-process connection pool shared by the threads of a worker (see blog/db/pool.py).
+# Connections go back to the pool after every request, so persistent
+# connections are switched off in favour of it.
+if distutils.util.strtobool(os.environ.get("DB_POOL", "false")):
+    DATABASES['default'].update({
+        "ENGINE": ("blog.db.backends.postgresql_pool" if "postgresql" in DATABASES['default']['ENGINE']
+                   else "blog.db.backends.sqlite3_pool"),
+        "CONN_MAX_AGE": 0,
+        "POOL": {
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+            "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+            "check_after": float(os.environ.get("DB_POOL_CHECK_AFTER", 5)),
+        },
+    })
+
+# Read replicas: one alias per host in DB_REPLICA_HOSTS, otherwise configured
+# like the primary. Safe-method reads go to a random replica; see blog/db/routers.py.
+for index, host in enumerate(filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(',')), start=1):
+    DATABASES[f'replica_{index}'] = {**DATABASES['default'], "HOST": host}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['blog.db.routers.ReplicaRouter']
+# How long a user reads from the primary after writing, to outlast the replication lag.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 10))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Any django-environ cache URL: locmemcache://, redis://host:6379/1, pymemcache://host:11211, ...
+# The default is per process; use a shared backend when running more than one worker.
+
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+# Whether every worker sees the same cache. Invalidations written to a per-process
+# cache never reach the other workers, so what relies on them is off by default
+# without a shared one.
+CACHE_IS_SHARED = CACHES['default']['BACKEND'].rsplit('.', 1)[-1] not in ('LocMemCache', 'DummyCache')
+
+# Response cache of the anonymous post reads (posts/cache.py). Entries are keyed on the content
+# version kept in the database, so a per-process cache never serves another worker's stale data.
+POSTS_RESPONSE_CACHE = bool(distutils.util.strtobool(os.environ.get('POSTS_RESPONSE_CACHE', 'True')))
+POSTS_CACHE_TIMEOUT = int(os.environ.get('POSTS_CACHE_TIMEOUT', 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -118,6 +168,33 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new passwords: pbkdf2 (PASSWORD_HASHER_ITERATIONS rounds),
+# scrypt, or argon2 (needs argon2-cffi). Hashes made by the others still verify and are
+# upgraded on the next login.
+
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'authn.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _PASSWORD_HASHERS.items() if name not in (PASSWORD_HASHER, 'argon2')),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASHER_ITERATIONS = int(os.environ.get('PASSWORD_HASHER_ITERATIONS', 720_000))
+
+AUTHENTICATION_BACKENDS = ['authn.backends.HashingPoolModelBackend']
+
+# Hashing runs in PASSWORD_HASHING_PROCESSES worker processes per server worker (0: in the
+# request thread). Logins and registrations beyond PASSWORD_HASHING_MAX_PENDING running or
+# queued (0: no limit) get a 503 after waiting PASSWORD_HASHING_WAIT seconds for a slot.
+PASSWORD_HASHING_PROCESSES = int(os.environ.get('PASSWORD_HASHING_PROCESSES', 1))
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', 4))
+PASSWORD_HASHING_WAIT = float(os.environ.get('PASSWORD_HASHING_WAIT', 1))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -137,12 +214,32 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Media is served by blog.media.serve_media, which hands the transfer to the front proxy with
+# MEDIA_SENDFILE_BACKEND 'nginx' (X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX, an internal
+# location aliased to MEDIA_ROOT) or 'apache' (X-Sendfile), and streams it itself with 'python'.
+# Files under MEDIA_IMMUTABLE_PREFIXES are named after their content and cached for a year.
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND', 'python')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 60 * 60))
+MEDIA_IMMUTABLE_PREFIXES = ('profiles/',)
+# Files MEDIA_PUBLIC_CHECK(path) passes are served to anyone, others to staff only. Only the
+# MEDIA_INLINE_TYPES are shown inline; anything else is sent as a sandboxed attachment.
+MEDIA_PUBLIC_CHECK = 'profiles.images.is_public_media'
+MEDIA_INLINE_TYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# Uploaded profile pictures are cropped to these square sizes (pixels) and re-encoded as
+# PROFILE_PICTURE_FORMAT (WEBP, JPEG or PNG) under content-hash names in media/profiles/, on
+# PROFILE_PICTURE_WORKERS background threads per server worker (0: right after the upload commits).
+PROFILE_PICTURE_VARIANTS = {'small': 64, 'medium': 256, 'large': 512}
+PROFILE_PICTURE_FORMAT = os.environ.get('PROFILE_PICTURE_FORMAT', 'WEBP').upper()
+PROFILE_PICTURE_QUALITY = int(os.environ.get('PROFILE_PICTURE_QUALITY', 80))
+PROFILE_PICTURE_WORKERS = int(os.environ.get('PROFILE_PICTURE_WORKERS', 1))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -150,10 +247,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authn.authentication.CachedJWTAuthentication',
     )
 }
 
+# Most create/update operations one POST /api/posts/batch/ request may carry.
+POST_BATCH_MAX_OPERATIONS = int(os.environ.get('POST_BATCH_MAX_OPERATIONS', 500))
+
+# Seconds an authenticated user and their profile are served from the cache, 0 for
+# never. Off by default without a shared cache, where saving a user (deactivating
+# them, changing their password) would only invalidate the copy of one worker.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60 if CACHE_IS_SHARED else 0))
+
+SIMPLE_JWT = {
+    'ROTATE_REFRESH_TOKENS': bool(distutils.util.strtobool(os.environ.get('JWT_ROTATE_REFRESH_TOKENS', "false"))),
+    'BLACKLIST_AFTER_ROTATION': bool(distutils.util.strtobool(os.environ.get('JWT_BLACKLIST_AFTER_ROTATION',
+                                                                            "false"))),
+    'TOKEN_REFRESH_SERIALIZER': 'authn.serializers.TokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'authn.serializers.TokenVerifySerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'authn.serializers.TokenBlacklistSerializer',
+}
+
+# In-process Bloom filter in front of the refresh token blacklist (authn/blacklist.py).
+# Workers learn of each other's blacklist writes through the cache, so it is only
+# on by default with a cache shared between processes.
+JWT_BLACKLIST_FILTER = bool(distutils.util.strtobool(os.environ.get('JWT_BLACKLIST_FILTER', str(CACHE_IS_SHARED))))
+JWT_BLACKLIST_FILTER_CAPACITY = int(os.environ.get('JWT_BLACKLIST_FILTER_CAPACITY', 100_000))
+JWT_BLACKLIST_FILTER_ERROR_RATE = float(os.environ.get('JWT_BLACKLIST_FILTER_ERROR_RATE', 0.001))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Bearer': {
@@ -165,7 +286,21 @@ SWAGGER_SETTINGS = {
 }
 
 if 'test' in sys.argv:
-    DATABASES['default'] = {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        },
+        # A separate database standing in for a replica that never caught up;
+        # routing to it is enabled per test with DATABASE_REPLICAS.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_replica.sqlite3',
+        },
+    }
+    DATABASE_REPLICAS = []
+    PASSWORD_HASHING_PROCESSES = 0
+    PROFILE_PICTURE_WORKERS = 0
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
     }
@@ -0,0 +1,126 @@
+import abc
+import os
+import re
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+
+
+class QueryRecorder:
+    """
+    ``connection.execute_wrapper`` hook keeping every ``(sql, params, many)``
+    round trip, including savepoints, in the order it was issued.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params, many))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def selects(self):
+        return [(sql, params) for sql, params, many in self.queries if not many and sql.lstrip().upper().startswith('SELECT')]
+
+
+# A table access step: "SCAN t", "SEARCH TABLE t AS u USING INDEX i (a=?)", ...
+TABLE_STEP = re.compile(r'(SCAN|SEARCH)(?: TABLE)? (\S+)(?: AS \S+)?(.*)')
+ACCESS_PATH = re.compile(
+    r'VIRTUAL TABLE|USING (?:INTEGER PRIMARY KEY|AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX|(?:COVERING )?INDEX \S+)')
+
+
+def plan_step(detail):
+    """
+    Reduce an ``EXPLAIN QUERY PLAN`` detail to the choices it records: which
+    table is scanned or searched through which index, and which sorts need a
+    temporary B-tree. The wording around them (constraints, subquery labels and
+    numbers, bloom filters, co-routines, ...) changes between SQLite versions,
+    so every other step is dropped and ``None`` is returned.
+    """
+    if detail.startswith('USE TEMP B-TREE'):
+        return detail
+    match = TABLE_STEP.fullmatch(detail)
+    if match is None:
+        return None
+    operation, table, rest = match.groups()
+    if table == 'CONSTANT':
+        return None
+    if table.lower().lstrip('(').startswith('subquery'):
+        table = 'subquery'
+    access = ACCESS_PATH.search(rest)
+    return f'{operation} {table} {access[0]}' if access else f'{operation} {table}'
+
+
+def explain_query_plan(sql, params):
+    """
+    Return the steps of SQLite's ``EXPLAIN QUERY PLAN`` for a query, as
+    reduced by ``plan_step``, so the output depends neither on the bound
+    values, the number of rows nor the SQLite version.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    return [step for step in (plan_step(detail) for *_, detail in rows) if step is not None]
+
+
+class ScalingQueriesTestCase(TestCase, metaclass=abc.ABCMeta):
+    """
+    Asserts that a request runs the same number of queries against ``N`` and
+    ``10 * N`` seeded rows and, on SQLite, that the plans of its SELECTs match
+    the snapshot in ``plans_dir``.
+
+    Subclasses implement ``seed(n)`` to add ``n`` more rows of whatever the
+    endpoint lists. A missing snapshot fails the test; run the tests with
+    ``UPDATE_QUERY_PLANS=1`` to (re)write the snapshots after an intended
+    change to a query or an index.
+    """
+    plans_dir = None
+    scale = 2
+
+    @abc.abstractmethod
+    def seed(self, n):
+        """Add ``n`` more rows of what the tested endpoints read."""
+
+    def record(self, request, status):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = request()
+        self.assertEqual(response.status_code, status, getattr(response, 'data', None))
+        return recorder
+
+    def assertScalableQueries(self, name, request, status=200):
+        self.seed(self.scale)
+        # Warm up per-process caches (content types, introspection) first.
+        self.record(request, status)
+        small = self.record(request, status)
+
+        self.seed(self.scale * 9)
+        large = self.record(request, status)
+
+        self.assertEqual(
+            len(small), len(large),
+            f'{name}: {len(small)} queries for {self.scale} rows but {len(large)} for {self.scale * 10}:\n'
+            + '\n'.join(sql for sql, params, many in large.queries))
+        if connection.vendor == 'sqlite':
+            self.assertQueryPlans(name, large)
+
+    def assertQueryPlans(self, name, recorder):
+        plans = []
+        for index, (sql, params) in enumerate(recorder.selects(), start=1):
+            plans.append(f'-- query {index}')
+            plans.extend(explain_query_plan(sql, params))
+        actual = '\n'.join(plans) + '\n'
+
+        path = Path(self.plans_dir) / f'{name}.txt'
+        if os.environ.get('UPDATE_QUERY_PLANS'):
+            path.write_text(actual)
+            return
+        if not path.exists():
+            self.fail(f'No query plan snapshot for {name}; rerun with UPDATE_QUERY_PLANS=1 to write it:\n{actual}')
+        self.assertEqual(
+            path.read_text(), actual,
+            f'Query plan of {name} changed; rerun with UPDATE_QUERY_PLANS=1 if the change is intended.')
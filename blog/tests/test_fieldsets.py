@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import ValidationError
+
+from blog.fieldsets import Fieldset
+from blog.serializers import FlatSerializer
+from posts.models import Post
+from posts.serializers import CommentSerializer, PostSerializer
+from posts.tests.factories import PostFactory, TagFactory
+from posts.views.view_api import PostViewSet
+
+
+class FieldsetTestCase(SimpleTestCase):
+    def test_it_keeps_the_serializer_order(self):
+        fieldset = Fieldset(PostSerializer, fields=['title', 'id'])
+        self.assertEqual(fieldset.fields, ('id', 'title'))
+
+    def test_fields_and_omit_combine(self):
+        fieldset = Fieldset(PostSerializer, fields=['id', 'title', 'content'], omit=['content'])
+        self.assertEqual(fieldset.fields, ('id', 'title'))
+
+    def test_expand_collapses_the_other_relations(self):
+        self.assertEqual(Fieldset(PostSerializer, expand=['tags']).collapsed, {'author', 'categories'})
+        self.assertEqual(Fieldset(PostSerializer, expand=[]).collapsed, {'author', 'categories', 'tags'})
+        self.assertEqual(Fieldset(PostSerializer).collapsed, set())
+
+    def test_it_rejects_unknown_names(self):
+        with self.assertRaises(ValidationError) as raised:
+            Fieldset(CommentSerializer, fields=['id', 'title'], omit=['slug'], expand=['post'])
+        self.assertEqual(set(raised.exception.detail), {'fields', 'omit', 'expand'})
+
+    def test_the_full_fieldset_leaves_the_queryset_alone(self):
+        fieldset = Fieldset(PostSerializer)
+        self.assertTrue(fieldset.complete)
+        self.assertIs(fieldset.apply(PostViewSet.queryset), PostViewSet.queryset)
+        self.assertIs(fieldset.flat_serializer(), FlatSerializer.for_class(PostSerializer))
+
+    def test_flat_serializers_are_compiled_once(self):
+        first = Fieldset(PostSerializer, fields=['id', 'tags'], expand=[]).flat_serializer()
+        self.assertIs(Fieldset(PostSerializer, fields=['tags', 'id'], expand=['author']).flat_serializer(), first)
+
+
+class FieldsetApplyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = TagFactory.create_batch(2)
+        cls.post = PostFactory(tags=cls.tags)
+
+    def test_it_defers_unrequested_columns(self):
+        post = Fieldset(PostSerializer, fields=['title']).apply(PostViewSet.queryset, keep=['created_at']).get()
+        self.assertEqual(post.get_deferred_fields(), {'content', 'author_id', 'comment_count', 'updated_at'})
+
+    def test_it_keeps_lookups_of_expanded_relations_only(self):
+        queryset = Fieldset(PostSerializer, fields=['author', 'tags'], expand=['author']).apply(PostViewSet.queryset)
+        self.assertEqual(queryset.query.select_related, {'author': {'user': {}}})
+        self.assertEqual([lookup.prefetch_to for lookup in queryset._prefetch_related_lookups], ['tags'])
+
+    def test_collapsed_relations_load_primary_keys_only(self):
+        fieldset = Fieldset(PostSerializer, fields=['author', 'tags'], expand=[])
+        post = fieldset.apply(Post.objects.all()).get()
+        with self.assertNumQueries(0):
+            data = PostSerializer.represent(post, fieldset=fieldset)
+        self.assertEqual(data, {'author': self.post.author_id, 'tags': [tag.pk for tag in self.tags]})
+        self.assertEqual(post.tags.all()[0].get_deferred_fields(), {'name', 'slug', 'post_count'})
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from profiles.tests.factories import UserFactory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_BACKEND='python', MEDIA_CACHE_MAX_AGE=600)
+class ServeMediaTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('profiles/ab/abcdef.webp', 'users/1/picture.png', 'users/1/.secret', 'users/1/old.png',
+                     'users/1/page.html'):
+            Path(MEDIA_ROOT, name).parent.mkdir(parents=True, exist_ok=True)
+            Path(MEDIA_ROOT, name).write_bytes(CONTENT)
+        Path(MEDIA_ROOT).parent.joinpath('outside.png').write_bytes(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        Path(MEDIA_ROOT).parent.joinpath('outside.png').unlink(missing_ok=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.user.profile.profile_picture = 'users/1/picture.png'
+        cls.user.profile.save()
+        cls.uploader = UserFactory()
+        cls.uploader.profile.profile_picture = 'users/1/page.html'
+        cls.uploader.profile.save()
+
+    def get(self, path, **headers):
+        return self.client.get(f'/media/{path}', headers=headers)
+
+    def test_streams_the_whole_file(self):
+        response = self.get('users/1/picture.png')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response.headers['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=600')
+
+    def test_content_addressed_files_are_cached_forever(self):
+        response = self.get('profiles/ab/abcdef.webp')
+
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_serves_a_byte_range(self):
+        response = self.get('users/1/picture.png', Range='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(response.headers['Content-Length'], '10')
+
+    def test_serves_open_and_suffix_ranges(self):
+        response = self.get('users/1/picture.png', Range='bytes=1000-')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[1000:])
+
+        response = self.get('users/1/picture.png', Range='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-5:])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 1019-1023/{len(CONTENT)}')
+
+    def test_rejects_ranges_past_the_end(self):
+        response = self.get('users/1/picture.png', Range='bytes=5000-6000')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_sends_the_whole_file_for_multiple_ranges(self):
+        response = self.get('users/1/picture.png', Range='bytes=0-1,5-6')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_range_for_another_version_sends_the_whole_file(self):
+        response = self.get('users/1/picture.png', Range='bytes=0-1', **{'If-Range': '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+        etag = self.get('users/1/picture.png').headers['ETag']
+        response = self.get('users/1/picture.png', Range='bytes=0-1', **{'If-Range': etag})
+        self.assertEqual(response.status_code, 206)
+
+    def test_answers_conditional_requests_with_not_modified(self):
+        first = self.get('users/1/picture.png')
+
+        self.assertEqual(self.get('users/1/picture.png', **{'If-None-Match': first.headers['ETag']}).status_code,
+                         304)
+        self.assertEqual(
+            self.get('users/1/picture.png', **{'If-Modified-Since': first.headers['Last-Modified']}).status_code, 304)
+
+    def test_head_sends_headers_only(self):
+        response = self.client.head('/media/users/1/picture.png')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response.content, b'')
+
+    def test_refuses_anything_but_reads(self):
+        self.assertEqual(self.client.post('/media/users/1/picture.png').status_code, 405)
+
+    def test_hides_files_outside_media_root_hidden_or_missing(self):
+        for path in ('../outside.png', 'users/../../outside.png', 'users/1/.secret', 'users/1/missing.png',
+                     'users/1/', '%2e%2e/outside.png'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='nginx', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_hands_the_transfer_to_nginx(self):
+        response = self.get('users/1/picture.png', Range='bytes=0-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Accel-Redirect'], '/protected-media/users/1/picture.png')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+        self.assertIn('ETag', response.headers)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='apache')
+    def test_hands_the_transfer_to_apache(self):
+        response = self.get('profiles/ab/abcdef.webp')
+
+        self.assertEqual(response.headers['X-Sendfile'], os.path.join(MEDIA_ROOT, 'profiles', 'ab', 'abcdef.webp'))
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_images_are_shown_inline_without_sniffing(self):
+        response = self.get('users/1/picture.png')
+
+        self.assertEqual(response.headers['X-Content-Type-Options'], 'nosniff')
+        self.assertFalse(response.headers.get('Content-Disposition', '').startswith('attachment'))
+        self.assertNotIn('Content-Security-Policy', response.headers)
+
+    def test_other_uploads_are_sandboxed_downloads(self):
+        response = self.get('users/1/page.html')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Disposition'], 'attachment; filename="page.html"')
+        self.assertEqual(response.headers['Content-Security-Policy'], 'sandbox')
+        self.assertEqual(response.headers['X-Content-Type-Options'], 'nosniff')
+
+    def test_files_no_profile_shows_are_for_staff_only(self):
+        self.assertEqual(self.get('users/1/old.png').status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.get('users/1/old.png').status_code, 404)
+
+        self.client.force_login(UserFactory(is_staff=True))
+        response = self.get('users/1/old.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'private, max-age=600')
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.db.utils import ConnectionHandler, OperationalError
+from django.test import SimpleTestCase, TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from blog.db.pool import ConnectionPool, PoolTimeout, get_pool, pool_stats
+from posts.tests.test_views import create_token
+from profiles.tests.factories import UserFactory
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+def ping(connection):
+    connection.execute('SELECT 1')
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def test_returned_connection_is_reused(self):
+        pool = ConnectionPool(max_size=2)
+        first = pool.getconn(connect)
+        pool.putconn(first)
+        self.assertIs(pool.getconn(connect), first)
+        self.assertEqual(pool.stats()['connections_created'], 1)
+        self.assertEqual(pool.stats()['checkouts'], 2)
+
+    def test_size_is_bounded(self):
+        pool = ConnectionPool(max_size=2, timeout=0.05)
+        pool.getconn(connect), pool.getconn(connect)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(connect)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['in_use'], stats['idle']), (2, 2, 0))
+        self.assertEqual((stats['waits'], stats['timeouts']), (1, 1))
+        self.assertGreater(stats['wait_time'], 0)
+
+    def test_waiting_checkout_gets_the_returned_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        held = pool.getconn(connect)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.getconn(connect)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.putconn(held)
+        waiter.join()
+        self.assertEqual(got, [held])
+        self.assertEqual(pool.stats()['waits'], 1)
+        self.assertEqual(pool.stats()['timeouts'], 0)
+
+    def test_failed_connect_releases_its_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+
+        def refuse():
+            raise sqlite3.OperationalError("refused")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.getconn(refuse)
+        self.assertEqual(pool.stats()['size'], 0)
+        pool.getconn(connect)
+
+    def test_idle_connection_failing_the_check_is_replaced(self):
+        pool = ConnectionPool(check=ping, check_after=0)
+        stale = pool.getconn(connect)
+        pool.putconn(stale)
+        stale.close()
+        fresh = pool.getconn(connect)
+        self.assertIsNot(fresh, stale)
+        ping(fresh)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['connections_created'], stats['connections_discarded']), (1, 2, 1))
+
+    def test_recently_returned_connection_is_not_checked(self):
+        checked = []
+        pool = ConnectionPool(check=checked.append, check_after=60)
+        pool.putconn(pool.getconn(connect))
+        pool.getconn(connect)
+        self.assertEqual(checked, [])
+
+    def test_connection_past_max_lifetime_is_replaced(self):
+        pool = ConnectionPool(max_lifetime=0)
+        old = pool.getconn(connect)
+        pool.putconn(old)
+        self.assertIsNot(pool.getconn(connect), old)
+        self.assertEqual(pool.stats()['connections_discarded'], 1)
+
+    def test_connection_failing_reset_is_discarded(self):
+        def reset(connection):
+            raise sqlite3.OperationalError("broken")
+
+        pool = ConnectionPool(reset=reset)
+        pool.putconn(pool.getconn(connect))
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['idle'], stats['connections_discarded']), (0, 0, 1))
+
+    def test_close_closes_idle_connections(self):
+        pool = ConnectionPool()
+        connection = pool.getconn(connect)
+        pool.putconn(connection)
+        pool.close()
+        self.assertEqual(pool.stats()['size'], 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            ping(connection)
+
+
+class PooledBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        self.alias = f'pooled-{id(self)}'
+        self.connections = ConnectionHandler({'default': {}, self.alias: {
+            'ENGINE': 'blog.db.backends.sqlite3_pool',
+            'NAME': self.path,
+            'POOL': {'max_size': 2, 'timeout': 1},
+        }})
+        self.connection = self.connections[self.alias]
+
+    def tearDown(self):
+        self.connection.close()
+        self.connection.pool.close()
+        os.remove(self.path)
+
+    def test_closing_returns_the_connection_to_the_pool(self):
+        self.connection.ensure_connection()
+        raw = self.connection.connection
+        self.connection.close()
+        self.assertEqual(self.connection.pool.stats()['idle'], 1)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        self.assertIs(self.connection.connection, raw)
+        self.assertEqual(self.connection.pool.stats()['connections_created'], 1)
+        self.assertIn(self.alias, pool_stats())
+
+    def test_open_transaction_is_rolled_back_on_return(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE entry (id integer)')
+        self.connection.set_autocommit(False)
+        with self.connection.cursor() as cursor:
+            cursor.execute('INSERT INTO entry VALUES (1)')
+        self.connection.close()
+
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM entry')
+            self.assertEqual(cursor.fetchone(), (0,))
+
+    def test_reused_connection_is_back_in_autocommit(self):
+        self.connection.set_autocommit(False)
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = self.connection.connection
+        self.connection.close()
+
+        self.connection.ensure_connection()
+        self.assertIs(self.connection.connection, raw)
+        self.assertTrue(self.connection.get_autocommit())
+        self.assertFalse(raw.in_transaction)
+
+    def test_exhausted_pool_raises_operational_error(self):
+        self.connection.pool.timeout = 0.05
+        held = [self.connection.pool.getconn(connect) for _ in range(2)]
+        with self.assertRaises(OperationalError):
+            self.connection.ensure_connection()
+        for connection in held:
+            self.connection.pool.putconn(connection)
+
+    def test_pool_is_per_alias(self):
+        self.assertIs(self.connection.pool, get_pool(self.alias))
+        self.assertIsNot(self.connection.pool, get_pool('other'))
+
+
+class DatabasePoolStatsAPIViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:db-pool")
+
+    def test_requires_admin(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {create_token(UserFactory()).access_token}')
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_admin_gets_stats(self):
+        admin = UserFactory(is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {create_token(admin).access_token}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pid'], os.getpid())
+        self.assertIn('default', response.data['conn_max_age'])
+        self.assertEqual(response.data['pools'], pool_stats())
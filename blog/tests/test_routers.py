@@ -0,0 +1,134 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from blog.db.routers import PRIMARY_PIN_COOKIE, PRIMARY_PIN_SALT, ReplicaRouter
+from posts.models import Post
+from posts.tests.factories import CategoryFactory, PostFactory, TagFactory
+from posts.tests.test_views import create_token
+from profiles.tests.factories import UserFactory
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], CACHES=LOCMEM_CACHES)
+class ReplicaRoutingTestCase(TestCase):
+    """The ``replica`` test database never receives the primary's rows: whatever a read finds tells where it went."""
+
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category, cls.tag = CategoryFactory(), TagFactory()
+        cls.user = UserFactory()
+        # Replicated as far as authentication is concerned.
+        get_user_model().objects.using('replica').bulk_create([cls.user])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = reverse("api:posts:posts-list")
+        self.authorization = f"Bearer {create_token(self.user).access_token}"
+
+    def create_post(self):
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        return self.client.post(self.list_url, data={
+            "title": "Fresh", "content": "Just written", "categories": [self.category.pk], "tags": [self.tag.pk]})
+
+    def test_safe_requests_read_from_replica(self):
+        PostFactory()
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'], [])
+        self.assertTrue(replica.captured_queries)
+
+    def test_writes_and_their_validation_go_to_primary(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.create_post()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica.captured_queries, [])
+        self.assertTrue(Post.objects.using('default').filter(pk=response.data['id']).exists())
+
+    def test_writer_reads_own_writes(self):
+        post_id = self.create_post().data['id']
+        response = self.client.get(self.list_url)
+        self.assertEqual([post['id'] for post in response.data['results']], [post_id])
+
+    def test_pin_reaches_other_workers(self):
+        self.create_post()
+        # Another worker has its own cache, which knows nothing of the write.
+        cache.clear()
+        self.assertEqual(len(self.client.get(self.list_url).data['results']), 1)
+
+    def test_pin_only_applies_to_its_user(self):
+        self.create_post()
+        other = UserFactory()
+        get_user_model().objects.using('replica').bulk_create([other])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(other).access_token}")
+        self.assertEqual(self.client.get(self.list_url).data['results'], [])
+
+    def test_forged_pin_is_ignored(self):
+        PostFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        self.client.cookies[PRIMARY_PIN_COOKIE] = str(self.user.pk)
+        self.assertEqual(self.client.get(self.list_url).data['results'], [])
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_shared_cache_pins_clients_without_cookies(self):
+        self.create_post()
+        del self.client.cookies[PRIMARY_PIN_COOKIE]
+        self.assertEqual(len(self.client.get(self.list_url).data['results']), 1)
+
+    def test_other_readers_are_not_pinned(self):
+        self.create_post()
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.list_url).data['results'], [])
+
+    def test_writer_returns_to_replica_after_sticky_window(self):
+        self.create_post()
+        del self.client.cookies[PRIMARY_PIN_COOKIE]
+        self.assertEqual(self.client.get(self.list_url).data['results'], [])
+
+    def test_failed_write_does_not_pin(self):
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        response = self.client.post(self.list_url, data={"content": "No title"})
+        self.assertEqual(response.status_code, 422)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_registered_user_is_pinned(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            response = self.client.post(reverse("api:auth:register"), data={
+                "first_name": "New", "last_name": "Comer", "username": "newcomer", "email": "newcomer@example.com",
+                "password1": "secret", "password2": "secret", "bio": "Bio",
+                "profile_picture": SimpleUploadedFile("picture.png", b"picture", content_type="image/png")})
+        self.assertEqual(response.status_code, 201, response.data)
+        user = get_user_model().objects.using('default').get(username='newcomer')
+        signer = signing.get_cookie_signer(salt=PRIMARY_PIN_COOKIE + PRIMARY_PIN_SALT)
+        self.assertEqual(signer.unsign(response.cookies[PRIMARY_PIN_COOKIE].value), str(user.pk))
+
+    async def test_async_reads_follow_the_pin(self):
+        await self.async_client.post(self.list_url, data={
+            "title": "Fresh", "content": "Just written", "categories": [self.category.pk], "tags": [self.tag.pk]},
+            content_type='application/json', headers={'Authorization': self.authorization})
+        url = reverse("api:async:posts-list")
+        anonymous = await self.async_client.get(url)
+        writer = await self.async_client.get(url, headers={'Authorization': self.authorization})
+        self.assertEqual(anonymous.json()['results'], [])
+        self.assertEqual(len(writer.json()['results']), 1)
+
+    def test_reads_outside_requests_go_to_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_goes_to_primary(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertEqual(router.db_for_write(Post), 'default')
@@ -0,0 +1,66 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from blog.testing import QueryRecorder, ScalingQueriesTestCase, plan_step
+from posts.models import Post
+
+
+class PostsQueriesTestCase(ScalingQueriesTestCase):
+    def seed(self, n):
+        pass
+
+
+class PlanStepTestCase(SimpleTestCase):
+    def test_it_ignores_the_wording_of_the_sqlite_version(self):
+        for new, old in [
+            ('SCAN posts_post', 'SCAN TABLE posts_post'),
+            ('SEARCH p USING INTEGER PRIMARY KEY (rowid=?)', 'SEARCH TABLE p USING INTEGER PRIMARY KEY (rowid=?)'),
+            ('SEARCH p USING INDEX p_idx (a=? AND b>?) LEFT-JOIN', 'SEARCH TABLE p AS T1 USING INDEX p_idx (a=?)'),
+            ('SCAN posts_post_fts VIRTUAL TABLE INDEX 0:M2', 'SCAN TABLE posts_post_fts VIRTUAL TABLE INDEX 1:'),
+            ('SCAN subquery', 'SCAN SUBQUERY 1'),
+            ('SCAN (subquery-1)', 'SCAN SUBQUERY 2'),
+        ]:
+            with self.subTest(new):
+                self.assertEqual(plan_step(new), plan_step(old))
+
+    def test_it_keeps_the_index_and_sort_choices(self):
+        self.assertEqual(
+            plan_step('SEARCH p USING COVERING INDEX p_idx (a=?)'), 'SEARCH p USING COVERING INDEX p_idx')
+        self.assertNotEqual(plan_step('SEARCH p USING INDEX i (a=?)'), plan_step('SEARCH p USING INDEX j (a=?)'))
+        self.assertNotEqual(plan_step('SCAN p'), plan_step('SCAN p USING INDEX p_idx'))
+        self.assertEqual(plan_step('USE TEMP B-TREE FOR ORDER BY'), 'USE TEMP B-TREE FOR ORDER BY')
+
+    def test_it_drops_the_other_steps(self):
+        for detail in ['CORRELATED SCALAR SUBQUERY 1', 'LIST SUBQUERY 2', 'CO-ROUTINE subquery',
+                       'BLOOM FILTER ON p (a=?)', 'MATERIALIZE 1', 'SCAN CONSTANT ROW', 'COMPOUND QUERY']:
+            with self.subTest(detail):
+                self.assertIsNone(plan_step(detail))
+
+
+class AssertQueryPlansTestCase(TestCase):
+    def setUp(self):
+        plans_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(plans_dir.cleanup)
+        self.path = Path(plans_dir.name) / 'posts_list.txt'
+        self.case = PostsQueriesTestCase()
+        self.case.plans_dir = plans_dir.name
+        self.recorder = QueryRecorder()
+        with connection.execute_wrapper(self.recorder):
+            list(Post.objects.all())
+
+    @mock.patch.dict('os.environ', {'UPDATE_QUERY_PLANS': ''})
+    def test_a_missing_snapshot_fails(self):
+        with self.assertRaisesMessage(AssertionError, 'No query plan snapshot for posts_list'):
+            self.case.assertQueryPlans('posts_list', self.recorder)
+        self.assertFalse(self.path.exists())
+
+    def test_update_query_plans_writes_the_snapshot(self):
+        with mock.patch.dict('os.environ', {'UPDATE_QUERY_PLANS': '1'}):
+            self.case.assertQueryPlans('posts_list', self.recorder)
+        self.assertIn('posts_post', self.path.read_text())
+        with mock.patch.dict('os.environ', {'UPDATE_QUERY_PLANS': ''}):
+            self.case.assertQueryPlans('posts_list', self.recorder)
@@ -1,18 +1,23 @@
+import re
+
 from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.utils.translation import gettext as _
 
+from blog.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
-    path('api/', include("blog.urls.urls_api", namespace="api"))
+    path('api/', include("blog.urls.urls_api", namespace="api")),
+
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
 ]
 
 if settings.DEBUG:
     from django.conf.urls.static import static
 
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 admin.site.index_title = _("Plus One Blog Task")
@@ -3,6 +3,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from blog.views import DatabasePoolStatsAPIView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Plus One Blog Task API Documentation",
@@ -26,6 +28,12 @@ urlpatterns = [
     path('comments/', include('posts.urls.urls_api_comments', namespace='comments')),
     path('auth/', include('authn.urls.urls_api_auth', namespace='auth')),
 
+    # Async (ASGI) read-only endpoints
+    path('async/', include('posts.urls.urls_async', namespace='async')),
+
+    # Health
+    path('health/db-pool/', DatabasePoolStatsAPIView.as_view(), name='db-pool'),
+
     # Swagger Documentation
     path('swagger-json/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
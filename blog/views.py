@@ -0,0 +1,28 @@
+import os
+
+from django.db import connections
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blog.db.pool import pool_stats
+
+
+class DatabasePoolStatsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Database Connection Pool Statistics",
+        operation_description="Size, checkouts, waits and timeouts of the connection pools of the worker "
+                              "process answering, by database alias. Empty unless a pooled backend is configured."
+    )
+    def get(self, request):
+        """
+        Return the connection pool statistics of this worker process.
+        """
+        return Response({
+            'pid': os.getpid(),
+            'conn_max_age': {alias: connections[alias].settings_dict['CONN_MAX_AGE'] for alias in connections},
+            'pools': pool_stats(),
+        })
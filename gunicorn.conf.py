@@ -0,0 +1,119 @@
+"""
+Gunicorn server profile, configured from environment variables.
+
+    gunicorn --config gunicorn.conf.py
+
+GUNICORN_WORKER_CLASS   ``gthread`` (default), ``sync`` or ``uvicorn``; ``uvicorn``
+                        serves ``blog.asgi`` instead of ``blog.wsgi``.
+GUNICORN_WORKERS        Worker processes, ``2 * CPUs + 1`` by default.
+GUNICORN_THREADS        Threads per ``gthread`` worker, 4 by default.
+GUNICORN_PRELOAD        Import Django in the master before forking so workers share
+                        its memory pages, on by default.
+GUNICORN_MAX_REQUESTS   Restart a worker after this many requests (plus up to
+                        ``GUNICORN_MAX_REQUESTS_JITTER``), 2000 by default; 0 disables.
+GUNICORN_MAX_WORKER_MEMORY_MB
+                        Gracefully restart a worker whose private (unshared) memory
+                        grows past this size, checked every ``GUNICORN_MEMORY_CHECK_INTERVAL``
+                        seconds, 256 by default; 0 disables.
+
+See the README for the load test behind these defaults.
+"""
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+WORKER_CLASSES = {
+    'sync': ('sync', 'blog.wsgi:application'),
+    'gthread': ('gthread', 'blog.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'blog.asgi:application'),
+}
+
+_worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if _worker_class not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {_worker_class!r}")
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class, wsgi_app = WORKER_CLASSES[_worker_class]
+workers = env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = env_int('GUNICORN_THREADS', 4) if _worker_class == 'gthread' else 1
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+max_worker_memory = env_int('GUNICORN_MAX_WORKER_MEMORY_MB', 256) * 1024 * 1024
+memory_check_interval = env_int('GUNICORN_MEMORY_CHECK_INTERVAL', 10)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def private_memory():
+    """
+    Memory this process does not share with the master, in bytes. Pages
+    inherited through ``preload_app`` only count once the worker writes to them.
+    Falls back to the peak resident size where ``/proc`` is unavailable.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            return sum(int(line.split()[1]) * 1024 for line in smaps
+                       if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def watch_memory(worker):
+    # SIGTERM is a graceful shutdown for every worker class: in-flight requests
+    # finish and the master forks a fresh worker.
+    while True:
+        time.sleep(memory_check_interval)
+        used = private_memory()
+        if used > max_worker_memory:
+            worker.log.info("Worker %s uses %d MiB, over the %d MiB limit; restarting",
+                            worker.pid, used // 2 ** 20, max_worker_memory // 2 ** 20)
+            os.kill(worker.pid, signal.SIGTERM)
+            return
+
+
+def when_ready(server):
+    if preload_app:
+        # Import the URLconf and with it every view, serializer and filter in
+        # the master too, then move all of it out of the garbage collector's
+        # reach so collections in the workers do not touch (and copy) the pages.
+        from django.urls import get_resolver
+
+        get_resolver().url_patterns
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # With preload_app the master imported Django; never share its database or
+    # cache connections with the workers.
+    if preload_app:
+        from django.core.cache import caches
+        from django.db import connections
+
+        connections.close_all()
+        caches.close_all()
+
+
+def post_worker_init(worker):
+    if max_worker_memory:
+        threading.Thread(target=watch_memory, args=(worker,), name='memory-watch', daemon=True).start()
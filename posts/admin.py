@@ -14,7 +14,7 @@ class PostAdmin(admin.ModelAdmin):
             'fields': [('categories', 'tags')],
         }),
     ]
-    list_display = ('id', 'title', 'author', 'created_at')
+    list_display = ('id', 'title', 'author', 'comment_count', 'created_at')
     list_display_links = ['title']
     list_filter = ('categories', 'tags')
     search_fields = ('title', 'content',)
@@ -22,13 +22,13 @@ class PostAdmin(admin.ModelAdmin):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ["id", "name", "slug"]
+    list_display = ["id", "name", "slug", "post_count"]
     fields = (("name", "slug"),)
     list_display_links = ['name']
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ["id", "name", "slug"]
+    list_display = ["id", "name", "slug", "post_count"]
     fields = (("name", "slug"),)
     list_display_links = ['name']
@@ -0,0 +1,193 @@
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import status
+
+from authn.authentication import invalidate_cached_user
+from profiles.models import Profile
+from .cache import bump_content_version
+from .counters import increment
+from .models import Category, Post, Tag
+from .serializers import PostSerializer
+
+RELATIONS = (('categories', Category), ('tags', Tag))
+
+
+class PostBatch:
+    """
+    Create and update many posts of the requesting user with a number of
+    queries that does not grow with the batch: one for the posts to update
+    and their owners, one per relation for every referenced category and tag,
+    then bulk inserts, updates and deletes of the posts, their through rows
+    and the counters, and one read of the results.
+
+    ``operations`` are ``{'op': 'create' | 'update', 'id': ..., 'data': ...}``
+    with ``data`` as ``PostSerializer`` takes it. ``run()`` returns a result
+    per operation, in order: ``{'status': 201 | 200, 'data': post}`` or
+    ``{'status': 400 | 403 | 404 | 422, 'errors': ...}``, 400 being for updates
+    of a post another operation updates as well. With ``atomic`` nothing is
+    written unless every operation is valid, and the valid ones report
+    ``424``; otherwise the valid ones are written and the rest reported.
+
+    Rows are written in bulk, so no ``post_save`` or ``m2m_changed`` is sent
+    for them; what their receivers maintain (the author's and taxonomies'
+    post counts, the cached user and the response cache version) is updated
+    here once per batch.
+    """
+
+    def __init__(self, request, operations, atomic=True, queryset=None):
+        self.request = request
+        self.profile = request.user.profile
+        self.operations = operations
+        self.atomic = atomic
+        self.queryset = Post.objects.all() if queryset is None else queryset
+        self.results = [None] * len(operations)
+
+    def run(self):
+        valid = self.validate()
+        if self.atomic and len(valid) < len(self.operations):
+            for index, serializer in valid:
+                self.results[index] = {'status': status.HTTP_424_FAILED_DEPENDENCY,
+                                       'errors': {'detail': _("Not applied because another operation failed.")}}
+            return self.results
+
+        if valid:
+            with transaction.atomic():
+                self.write([serializer for index, serializer in valid])
+            posts = self.queryset.in_bulk([serializer.instance.pk for index, serializer in valid])
+            for index, serializer in valid:
+                self.results[index] = {
+                    'status': status.HTTP_200_OK if self.operations[index]['op'] == 'update'
+                    else status.HTTP_201_CREATED,
+                    'data': PostSerializer.represent(posts[serializer.instance.pk]),
+                }
+        return self.results
+
+    def fail(self, index, code, errors):
+        self.results[index] = {'status': code, 'errors': errors}
+
+    def validate(self):
+        """``(index, serializer)`` of every valid operation; the others get their result."""
+        updates = Counter(operation['id'] for operation in self.operations if operation['op'] == 'update')
+        targets = Post.objects.only('id', 'author_id', 'title', 'content').in_bulk(updates)
+        context = {'request': self.request, 'related_objects': self.load_related()}
+
+        valid = []
+        for index, operation in enumerate(self.operations):
+            instance = None
+            if operation['op'] == 'update':
+                if updates[operation['id']] > 1:
+                    # Both would edit one instance: neither's data would be written as sent.
+                    self.fail(index, status.HTTP_400_BAD_REQUEST,
+                              {'id': [_("Another operation of the batch updates this post.")]})
+                    continue
+                instance = targets.get(operation['id'])
+                if instance is None:
+                    self.fail(index, status.HTTP_404_NOT_FOUND, {'detail': _("Not found.")})
+                    continue
+                if instance.author_id != self.profile.pk:
+                    self.fail(index, status.HTTP_403_FORBIDDEN,
+                              {'detail': _("You do not have permission to edit this post")})
+                    continue
+            serializer = PostSerializer(instance, data=operation['data'], context=context)
+            if not serializer.is_valid():
+                self.fail(index, status.HTTP_422_UNPROCESSABLE_ENTITY, serializer.errors)
+                continue
+            valid.append((index, serializer))
+        return valid
+
+    def load_related(self):
+        """Every category and tag any operation refers to, by model and primary key."""
+        related = {}
+        for name, model in RELATIONS:
+            pks = set()
+            for operation in self.operations:
+                values = operation['data'].get(name)
+                if isinstance(values, list):
+                    for value in values:
+                        try:
+                            pks.add(model._meta.pk.to_python(value))
+                        except (TypeError, ValidationError):
+                            pass
+            related[model] = {obj.pk: obj for obj in model.objects.filter(pk__in=pks)} if pks else {}
+        return related
+
+    def write(self, serializers):
+        now = timezone.now()
+        created, updated, links = [], [], defaultdict(list)
+        for serializer in serializers:
+            data = dict(serializer.validated_data)
+            related = {name: data.pop(name, None) for name, model in RELATIONS}
+            post, is_new = serializer.instance, serializer.instance is None
+            if is_new:
+                post = serializer.instance = Post(author=self.profile, **data)
+                created.append(post)
+            else:
+                changed = [key for key, value in data.items() if getattr(post, key) != value]
+                for key in changed:
+                    setattr(post, key, data[key])
+                updated.append((post, changed))
+            for name, model in RELATIONS:
+                # As in PostSerializer.update, an empty list leaves an existing post's links alone.
+                if related[name] or is_new:
+                    links[name].append((post, related[name] or []))
+
+        Post.objects.bulk_create(created)
+        relinked = set()
+        for name, model in RELATIONS:
+            relinked |= self.write_links(name, model, links[name], {post.pk for post, changed in updated})
+
+        by_fields = defaultdict(list)
+        for post, changed in updated:
+            if changed or post.pk in relinked:
+                post.updated_at = now
+                by_fields[(*changed, 'updated_at')].append(post)
+        for fields, posts in by_fields.items():
+            Post.objects.bulk_update(posts, fields)
+
+        if created:
+            increment(Profile.objects.filter(pk=self.profile.pk), 'post_count', len(created))
+            invalidate_cached_user(self.profile.user_id)
+        if created or by_fields:
+            bump_content_version()
+
+    def write_links(self, name, model, links, updated_pks):
+        """
+        Bring the through rows of ``name`` in line with ``links`` with one
+        delete and one insert, and return the updated posts whose links changed.
+        """
+        through = getattr(Post, name).through
+        target = f'{model._meta.model_name}_id'
+        wanted = {(post.pk, obj.pk) for post, objects in links for obj in objects}
+        replaced = {post.pk for post, objects in links} & updated_pks
+
+        stale, present = [], set()
+        if replaced:
+            for pk, post_id, target_id in through.objects.filter(post_id__in=replaced).values_list(
+                    'pk', 'post_id', target):
+                if (post_id, target_id) in wanted:
+                    present.add((post_id, target_id))
+                else:
+                    stale.append((pk, post_id, target_id))
+        added = wanted - present
+
+        if stale:
+            through.objects.filter(pk__in=[pk for pk, post_id, target_id in stale]).delete()
+        if added:
+            through.objects.bulk_create([through(**{'post_id': post_id, target: target_id})
+                                         for post_id, target_id in added], ignore_conflicts=True)
+
+        deltas = Counter(target_id for post_id, target_id in added)
+        deltas.subtract(target_id for pk, post_id, target_id in stale)
+        by_delta = defaultdict(list)
+        for target_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(target_id)
+        for delta, pks in by_delta.items():
+            increment(model.objects.filter(pk__in=pks), 'post_count', delta)
+
+        return {post_id for pk, post_id, target_id in stale} | ({post_id for post_id, target_id in added}
+                                                                & updated_pks)
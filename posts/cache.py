@@ -0,0 +1,95 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContentVersion
+
+CONTENT_VERSION_ID = 1
+
+
+def get_content_version():
+    """
+    The ``ContentVersion`` row. Reads take it before anything else they are
+    built from, and writes bump it once they are committed, so a response
+    built from old rows never carries the new version.
+    """
+    content = ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).first()
+    return content or ContentVersion(pk=CONTENT_VERSION_ID, modified=timezone.now())
+
+
+async def aget_content_version():
+    content = await ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).afirst()
+    return content or ContentVersion(pk=CONTENT_VERSION_ID, modified=timezone.now())
+
+
+def _bump_content_version():
+    changes = {'version': F('version') + 1, 'modified': timezone.now()}
+    if not ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).update(**changes):
+        ContentVersion.objects.get_or_create(pk=CONTENT_VERSION_ID, defaults={'version': 1})
+
+
+def bump_content_version():
+    # Once per transaction (or savepoint), however many rows it writes: a cascade sends a signal per row.
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    if not any(function is _bump_content_version and savepoints == savepoint_ids
+               for savepoints, function, robust in connection.run_on_commit):
+        transaction.on_commit(_bump_content_version)
+
+
+def response_cache_key(request, name, version):
+    """
+    Cache key for an anonymous read, built from the absolute URL with its query
+    parameters normalized and the content ``version``. ``None`` means the
+    request must not be served from the cache.
+    """
+    if request.user.is_authenticated:
+        return None
+    return _response_cache_key(request, name, version)
+
+
+async def aresponse_cache_key(request, name, version):
+    """
+    Async ``response_cache_key`` for plain Django requests. Async views do not
+    run the JWT authentication, so any ``Authorization`` header opts out too.
+    """
+    if 'authorization' in request.headers or (await request.auser()).is_authenticated:
+        return None
+    return _response_cache_key(request, name, version)
+
+
+def _response_cache_key(request, name, version):
+    # ``GET`` rather than ``query_params`` so plain Django requests work as well.
+    params = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    url = f'{request.build_absolute_uri(request.path)}?{params}'
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f'posts:response:{name}:{version}:{digest}'
+
+
+def get_cached_response(key):
+    """
+    Return the ``(data, etag, last_modified)`` entry stored for ``key``, or ``None``.
+    """
+    if key is None:
+        return None
+    return cache.get(key)
+
+
+async def aget_cached_response(key):
+    if key is None:
+        return None
+    return await cache.aget(key)
+
+
+def set_cached_response(key, data, etag=None, last_modified=None):
+    if key is not None:
+        cache.set(key, (data, etag, last_modified), settings.POSTS_CACHE_TIMEOUT)
+
+
+async def aset_cached_response(key, data, etag=None, last_modified=None):
+    if key is not None:
+        await cache.aset(key, (data, etag, last_modified), settings.POSTS_CACHE_TIMEOUT)
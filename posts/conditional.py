@@ -0,0 +1,105 @@
+import hashlib
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import (aget_cached_response, aget_content_version, aresponse_cache_key, aset_cached_response,
+                    get_cached_response, get_content_version, response_cache_key, set_cached_response)
+
+
+def _etag(request, *parts):
+    params = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    renderer = getattr(request, 'accepted_renderer', None)
+    raw = repr((request.path, params, renderer and renderer.format, *parts))
+    return f'W/"{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def make_etag(request, content, *watermark):
+    """
+    Weak ETag for a read response, derived from cheap watermarks of the rows
+    it is built from (the fields of the rows of the page it serves, or small
+    aggregates), the normalized query parameters, the negotiated format and
+    the ``content`` version (which covers related rows such as categories,
+    tags and authors).
+    """
+    return _etag(request, content.version, watermark)
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """
+    Return a 304 response when the request's validators still match, otherwise ``None``.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_response(request, get_validators, render, cache_name=None):
+    """
+    Answer a read with a 304 when the client's validators match, or with the
+    rendered data and fresh validators otherwise.
+
+    The content version is read first, and ``get_validators(content)`` returns
+    ``(etag, last_modified)`` from it and cheap watermarks. It runs before
+    ``render()``, so a 304 never serializes anything. With ``cache_name`` (and
+    ``POSTS_RESPONSE_CACHE`` on) the data and its validators are kept in the
+    response cache under the version, and a hit reads nothing else.
+    """
+    content = get_content_version()
+    use_cache = cache_name and settings.POSTS_RESPONSE_CACHE
+    cache_key = response_cache_key(request, cache_name, content.version) if use_cache else None
+    cached = get_cached_response(cache_key)
+    if cached is None:
+        data = None
+        etag, last_modified = get_validators(content)
+    else:
+        data, etag, last_modified = cached
+
+    not_modified = get_not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if data is None:
+        data = render()
+        set_cached_response(cache_key, data, etag, last_modified)
+    return set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
+
+
+async def aconditional_response(request, get_validators, render, cache_name=None):
+    """
+    ``conditional_response`` for async views: ``get_validators`` and ``render``
+    are coroutine functions, the cache is used through its async methods so
+    a networked one never blocks the event loop, and the data is returned as
+    a ``JsonResponse``.
+    """
+    content = await aget_content_version()
+    use_cache = cache_name and settings.POSTS_RESPONSE_CACHE
+    cache_key = await aresponse_cache_key(request, cache_name, content.version) if use_cache else None
+    cached = await aget_cached_response(cache_key)
+    if cached is None:
+        data = None
+        etag, last_modified = await get_validators(content)
+    else:
+        data, etag, last_modified = cached
+
+    not_modified = get_not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if data is None:
+        data = await render()
+        await aset_cached_response(cache_key, data, etag, last_modified)
+    return set_validators(JsonResponse(data, safe=False), etag, last_modified)
@@ -0,0 +1,16 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+def increment(queryset, field, delta=1):
+    """
+    Atomically add ``delta`` to ``field`` on every row of ``queryset`` with a
+    single ``UPDATE ... SET field = field + delta``; never drops below zero.
+    """
+    if delta >= 0:
+        return queryset.update(**{field: F(field) + delta})
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def decrement(queryset, field, delta=1):
+    return increment(queryset, field, -delta)
@@ -1,24 +1,28 @@
-import operator
-from functools import reduce
-
 import django_filters
-from django.db.models import Q
 from django.utils.translation import gettext
 
 from .models import Post, Comment
+from .search import search as full_text_search
+
+
+class StableOrderingFilter(django_filters.OrderingFilter):
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value:
+            qs = qs.order_by(*qs.query.order_by, 'pk')
+        return qs
 
 
 class PostFilterSet(django_filters.FilterSet):
     q = django_filters.CharFilter(method="search", label=gettext("Search"))
+    ordering = StableOrderingFilter(fields=('created_at', 'updated_at', 'comment_count'), label=gettext("Ordering"))
 
     class Meta:
         model = Post
         fields = ('q', 'categories', 'tags')
 
     def search(self, queryset, name, value):
-        columns = ["title", "content"]
-        q = [Q(**{f"{column}__icontains": value}) for column in columns]
-        return queryset.filter(reduce(operator.or_, q))
+        return full_text_search(queryset, value)
 
 
 class CommentFilterSet(django_filters.FilterSet):
@@ -29,4 +33,4 @@ class CommentFilterSet(django_filters.FilterSet):
         fields = ('q', 'post', 'author')
 
     def search(self, queryset, name, value):
-        return queryset.filter(content__icontains=value)
+        return full_text_search(queryset, value)
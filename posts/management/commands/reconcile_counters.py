@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Category, Comment, Post, Tag
+from profiles.models import Profile
+
+
+def count_of(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('*'))
+    return Coalesce(Subquery(counts.values('total')), 0)
+
+
+COUNTERS = (
+    (Post, 'comment_count', lambda: count_of(Comment.objects, 'post')),
+    (Category, 'post_count', lambda: count_of(Post.categories.through.objects, 'category')),
+    (Tag, 'post_count', lambda: count_of(Post.tags.through.objects, 'tag')),
+    (Profile, 'post_count', lambda: count_of(Post.objects, 'author')),
+)
+
+
+class Command(BaseCommand):
+    help = "Recount denormalized comment/post counters in primary key batches and fix the drifted rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0, help="Seconds to pause between batches")
+
+    def handle(self, *args, batch_size, sleep, **options):
+        for model, field, actual_count in COUNTERS:
+            checked = fixed = 0
+            last_pk = 0
+            while True:
+                pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                checked += len(pks)
+
+                drifted = list(model.objects.filter(pk__in=pks).annotate(actual=actual_count())
+                               .exclude(**{field: F('actual')}).values_list('pk', flat=True))
+                if drifted:
+                    # Recount inside the UPDATE so concurrent changes since the check are included.
+                    fixed += model.objects.filter(pk__in=drifted).update(**{field: actual_count()})
+                if sleep:
+                    time.sleep(sleep)
+
+            self.stdout.write(f"{model._meta.label}.{field}: checked {checked}, fixed {fixed}")
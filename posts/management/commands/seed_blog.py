@@ -0,0 +1,250 @@
+import csv
+import io
+import itertools
+import json
+import random
+import time
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import JSONField, Max
+from django.utils.text import slugify
+
+from posts.cache import bump_content_version
+from posts.models import Category, Comment, Post, Tag
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+WORDS = (
+    'garden', 'python', 'coffee', 'travel', 'music', 'design', 'database', 'river', 'mountain', 'recipe',
+    'history', 'science', 'football', 'camera', 'winter', 'summer', 'market', 'startup', 'library', 'cinema',
+    'bicycle', 'kitchen', 'ocean', 'forest', 'planet', 'engine', 'school', 'health', 'budget', 'weekend',
+    'notes', 'review', 'guide', 'story', 'update', 'release', 'project', 'idea', 'question', 'answer',
+    'the', 'a', 'and', 'of', 'to', 'in', 'is', 'for', 'on', 'with', 'how', 'why', 'what', 'new', 'best',
+    'simple', 'quick', 'better', 'first', 'last', 'small', 'large', 'old', 'modern', 'practical', 'honest',
+)
+
+# Fixed origin for generated timestamps, so a seed always yields the same rows.
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class SkewedChoice:
+    """
+    Picks indexes in ``range(size)`` with Zipf-like weights ``1 / rank ** skew``
+    (``skew=0`` is uniform). Ranks are shuffled so the popular items are spread
+    over the id range instead of being the first rows.
+    """
+
+    def __init__(self, rng, size, skew):
+        self.rng = rng
+        self.order = list(range(size))
+        rng.shuffle(self.order)
+        self.cum_weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+    def __call__(self):
+        index = bisect(self.cum_weights, self.rng.random() * self.cum_weights[-1])
+        return self.order[min(index, len(self.order) - 1)]
+
+    def sample(self, k):
+        picked = set()
+        while len(picked) < min(k, len(self.order)):
+            picked.add(self())
+        return sorted(picked)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``bulk_create`` keep the generated ``auto_now``/``auto_now_add`` values."""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def copy_value(field, value):
+    """``value`` of ``field`` as COPY reads it from a csv row, ``\\N`` standing for NULL."""
+    if value is None:
+        return r'\N'
+    if isinstance(field, JSONField):
+        # get_db_prep_save wraps it in a driver adapter, whose str() isn't JSON.
+        return json.dumps(field.get_prep_value(value), cls=field.encoder)
+    value = field.get_db_prep_save(value, connection)
+    return r'\N' if value is None else value
+
+
+class Command(BaseCommand):
+    help = ("Generate a deterministic dataset of users, posts, categories, tags and comments "
+            "with bulk inserts (COPY on PostgreSQL)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--categories-per-post', type=int, default=2, help="Maximum categories linked to a post")
+        parser.add_argument('--tags-per-post', type=int, default=4, help="Maximum tags linked to a post")
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help="Zipf exponent for picking authors, taxonomy and commented posts; 0 is uniform")
+        parser.add_argument('--days', type=int, default=365, help="Time span the posts are spread over")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--password', default='password', help="Password set on every generated user")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-copy', action='store_false', dest='copy',
+                            help="Use bulk_create on PostgreSQL too instead of COPY")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and (options['posts'] or options['comments']):
+            raise CommandError("--users must be at least 1 to author posts and comments")
+        if options['posts'] < 1 and options['comments']:
+            raise CommandError("--posts must be at least 1 to attach comments to")
+
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.use_copy = options['copy'] and connection.vendor == 'postgresql'
+        self.span = timedelta(days=options['days'])
+
+        started = time.monotonic()
+        with transaction.atomic(), explicit_timestamps(Post, Comment):
+            self.seed()
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [UserModel, Profile, Category, Tag, Post,
+                                                                           Comment]):
+                    cursor.execute(sql)
+        bump_content_version()
+        self.stdout.write(f"Seeded in {time.monotonic() - started:.1f}s")
+
+    def rng(self, stream):
+        return random.Random(f"{self.options['seed']}:{stream}")
+
+    def first_pk(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def seed(self):
+        users, posts = self.options['users'], self.options['posts']
+        user_pk, profile_pk = self.first_pk(UserModel), self.first_pk(Profile)
+        category_pk, tag_pk = self.first_pk(Category), self.first_pk(Tag)
+        post_pk, comment_pk = self.first_pk(Post), self.first_pk(Comment)
+
+        # Counting pass: replay the structure streams to know every counter up front.
+        author_posts = [0] * users
+        category_posts, tag_posts = [0] * self.options['categories'], [0] * self.options['tags']
+        for author, categories, tags in self.post_structure():
+            author_posts[author] += 1
+            for index in categories:
+                category_posts[index] += 1
+            for index in tags:
+                tag_posts[index] += 1
+        post_comments = [0] * posts
+        for post, author in self.comment_structure():
+            post_comments[post] += 1
+
+        password = make_password(self.options['password'], salt=f"seed{self.options['seed']}")
+        self.load(UserModel, (
+            UserModel(pk=user_pk + index, username=f"user{user_pk + index}", email=f"user{user_pk + index}@example.com",
+                      first_name="User", last_name=str(user_pk + index), password=password,
+                      date_joined=EPOCH - timedelta(days=1))
+            for index in range(users)))
+        text = self.rng('profiles:text')
+        self.load(Profile, (
+            Profile(pk=profile_pk + index, user_id=user_pk + index, bio=self.sentence(text, 12),
+                    post_count=author_posts[index])
+            for index in range(users)))
+        self.load(Category, (
+            Category(pk=category_pk + index, name=f"Category {index}", slug=slugify(f"category-{category_pk + index}"),
+                     post_count=count)
+            for index, count in enumerate(category_posts)))
+        self.load(Tag, (
+            Tag(pk=tag_pk + index, name=f"Tag {index}", slug=slugify(f"tag-{tag_pk + index}"), post_count=count)
+            for index, count in enumerate(tag_posts)))
+
+        text = self.rng('posts:text')
+        self.load(Post, (
+            Post(pk=post_pk + index, author_id=profile_pk + author, title=self.sentence(text, 6).title(),
+                 content=self.sentence(text, 80), comment_count=post_comments[index],
+                 created_at=self.posted_at(index), updated_at=self.posted_at(index))
+            for index, (author, categories, tags) in enumerate(self.post_structure())))
+        self.load(Post.categories.through, (
+            Post.categories.through(post_id=post_pk + index, category_id=category_pk + category)
+            for index, (author, categories, tags) in enumerate(self.post_structure()) for category in categories))
+        self.load(Post.tags.through, (
+            Post.tags.through(post_id=post_pk + index, tag_id=tag_pk + tag)
+            for index, (author, categories, tags) in enumerate(self.post_structure()) for tag in tags))
+
+        text, delay = self.rng('comments:text'), self.rng('comments:delay')
+        self.load(Comment, (
+            Comment(pk=comment_pk + index, post_id=post_pk + post, author_id=profile_pk + author,
+                    content=self.sentence(text, 25),
+                    created_at=self.posted_at(post) + timedelta(hours=delay.random() * 72))
+            for index, (post, author) in enumerate(self.comment_structure())))
+
+    def post_structure(self):
+        """Yield ``(author, categories, tags)`` indexes per post; the same for every call."""
+        rng = self.rng('posts')
+        authors = SkewedChoice(rng, self.options['users'], self.options['skew'])
+        categories = SkewedChoice(rng, self.options['categories'], self.options['skew'])
+        tags = SkewedChoice(rng, self.options['tags'], self.options['skew'])
+        for _ in range(self.options['posts']):
+            yield (authors(),
+                   categories.sample(rng.randint(min(1, self.options['categories_per_post']),
+                                                 self.options['categories_per_post'])),
+                   tags.sample(rng.randint(0, self.options['tags_per_post'])))
+
+    def comment_structure(self):
+        """Yield ``(post, author)`` indexes per comment; the same for every call."""
+        rng = self.rng('comments')
+        posts = SkewedChoice(rng, self.options['posts'], self.options['skew'])
+        authors = SkewedChoice(rng, self.options['users'], self.options['skew'])
+        for _ in range(self.options['comments']):
+            yield posts(), authors()
+
+    def posted_at(self, index):
+        return EPOCH + self.span * index / max(self.options['posts'], 1)
+
+    @staticmethod
+    def sentence(rng, words):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(words // 2, words))).capitalize()
+
+    def load(self, model, objects):
+        started, total = time.monotonic(), 0
+        objects = iter(objects)
+        while batch := list(itertools.islice(objects, self.batch_size)):
+            if self.use_copy:
+                self.copy(model, batch)
+            else:
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            total += len(batch)
+        self.stdout.write(f"{model._meta.label}: {total} rows in {time.monotonic() - started:.1f}s")
+
+    def copy(self, model, batch):
+        # Through rows are generated without ids; let the sequence number those.
+        fields = [field for field in model._meta.concrete_fields if not (field.primary_key and batch[0].pk is None)]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in batch:
+            writer.writerow([copy_value(field, getattr(obj, field.attname)) for field in fields])
+        buffer.seek(0)
+
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        table = connection.ops.quote_name(model._meta.db_table)
+        sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                cursor.cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
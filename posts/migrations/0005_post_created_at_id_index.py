@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_alter_comment_author_alter_comment_post_and_more'),
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='posts_post_created_id_idx'),
+        ),
+    ]
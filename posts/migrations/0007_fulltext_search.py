@@ -0,0 +1,54 @@
+from django.db import migrations
+
+POSTGRES_COLUMNS = {
+    'posts_post': "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+                  "setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')",
+    'posts_comment': "to_tsvector('english'::regconfig, coalesce(content, ''))",
+}
+
+FTS5_COLUMNS = {
+    'posts_post': ('title', 'content'),
+    'posts_comment': ('content',),
+}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for table, expression in POSTGRES_COLUMNS.items():
+            schema_editor.execute(
+                f'ALTER TABLE "{table}" ADD COLUMN "search_vector" tsvector GENERATED ALWAYS AS ({expression}) STORED')
+            schema_editor.execute(f'CREATE INDEX "{table}_search_idx" ON "{table}" USING GIN ("search_vector")')
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        for table, columns in FTS5_COLUMNS.items():
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE "{table}_fts" USING fts5({", ".join(columns)}, '
+                f'content=\'{table}\', content_rowid=\'id\', tokenize=\'porter unicode61\')')
+            schema_editor.execute(f'INSERT INTO "{table}_fts"("{table}_fts") VALUES (\'rebuild\')')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    for table in POSTGRES_COLUMNS:
+        if connection.vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_search_idx"')
+            schema_editor.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS "search_vector"')
+        elif connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS "{table}_fts_{suffix}"')
+            schema_editor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_comment_post_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
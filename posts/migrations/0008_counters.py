@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('*'))
+    return Coalesce(Subquery(counts.values('total')), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Category = apps.get_model('posts', 'Category')
+    Tag = apps.get_model('posts', 'Tag')
+    Profile = apps.get_model('profiles', 'Profile')
+
+    Post.objects.update(comment_count=count_of(Comment.objects, 'post'))
+    Category.objects.update(post_count=count_of(Post.categories.through.objects, 'category'))
+    Tag.objects.update(post_count=count_of(Post.tags.through.objects, 'tag'))
+    Profile.objects.update(post_count=count_of(Post.objects, 'author'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_fulltext_search'),
+        ('profiles', '0002_profile_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Post Count'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comment Count'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Post Count'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['comment_count', 'id'], name='posts_post_comments_id_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
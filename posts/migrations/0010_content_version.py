@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_content_version(apps, schema_editor):
+    apps.get_model('posts', 'ContentVersion').objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_comment_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Modified')),
+            ],
+            options={
+                'verbose_name': 'Content Version',
+                'verbose_name_plural': 'Content Versions',
+            },
+        ),
+        migrations.RunPython(create_content_version, migrations.RunPython.noop),
+    ]
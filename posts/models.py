@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 UserModel = get_user_model()
@@ -13,6 +14,7 @@ class Category(models.Model):
 
     name = models.CharField(_("Name"), max_length=255)
     slug = models.SlugField(_("Slug"))
+    post_count = models.PositiveIntegerField(_("Post Count"), default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -26,6 +28,7 @@ class Tag(models.Model):
 
     name = models.CharField(_("Name"), max_length=255)
     slug = models.SlugField(_("Slug"))
+    post_count = models.PositiveIntegerField(_("Post Count"), default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -36,6 +39,10 @@ class Post(models.Model):
         verbose_name = _("Post")
         verbose_name_plural = _("Posts")
         ordering = ('created_at',)
+        indexes = [
+            models.Index(fields=('created_at', 'id'), name='posts_post_created_id_idx'),
+            models.Index(fields=('comment_count', 'id'), name='posts_post_comments_id_idx'),
+        ]
 
     title = models.CharField(_("Title"), max_length=255)
     content = models.TextField(_("Content"))
@@ -43,6 +50,7 @@ class Post(models.Model):
                                verbose_name=_("Author"))
     categories = models.ManyToManyField(Category, related_name="posts", verbose_name=_("Categories"))
     tags = models.ManyToManyField(Tag, related_name="posts", verbose_name=_("Tags"))
+    comment_count = models.PositiveIntegerField(_("Comment Count"), default=0, editable=False)
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -55,6 +63,10 @@ class Comment(models.Model):
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
         ordering = ('created_at',)
+        indexes = [
+            models.Index(fields=('post', 'created_at', 'id'), name='posts_comment_post_created_idx'),
+            models.Index(fields=('created_at', 'id'), name='posts_comment_created_id_idx'),
+        ]
 
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments', verbose_name=_("Post"))
     author = models.ForeignKey("profiles.Profile",
@@ -64,3 +76,20 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.content
+
+
+class ContentVersion(models.Model):
+    """
+    A single row counting the writes to anything post and comment reads show,
+    and when the count last moved. Read validators and response cache keys
+    are built on it, so every worker agrees on them (see posts/cache.py).
+    """
+    class Meta:
+        verbose_name = _("Content Version")
+        verbose_name_plural = _("Content Versions")
+
+    version = models.PositiveBigIntegerField(_("Version"), default=0)
+    modified = models.DateTimeField(_("Modified"), default=timezone.now)
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,195 @@
+import json
+import operator
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Page:
+    """
+    The page of ``get_queryset()`` a request asks for, fetched on first use.
+
+    A conditional read builds its validators from the rows of the page it
+    serves and renders the same objects, so both cost the one bounded page
+    query instead of an aggregate over every matching row.
+    """
+
+    def __init__(self, paginator, get_queryset, request):
+        self.paginator = paginator
+        self.get_queryset = get_queryset
+        self.request = request
+        self._objects = None
+
+    @property
+    def objects(self):
+        if self._objects is None:
+            self._objects = self.paginator.paginate_queryset(self.get_queryset(), self.request)
+        return self._objects
+
+    async def aobjects(self):
+        if self._objects is None:
+            self._objects = await self.paginator.apaginate_queryset(self.get_queryset(), self.request)
+        return self._objects
+
+    def watermark(self, *fields):
+        """
+        The position of the page and ``fields`` of each of its rows. Async
+        views await ``aobjects()`` first.
+        """
+        rows = [tuple(getattr(obj, field) for field in fields) for obj in self.objects]
+        return (getattr(self.paginator, 'count', None), self.paginator.get_previous_link(),
+                self.paginator.get_next_link(), rows)
+
+
+class Paginator(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
+    # Columns read from the paged objects besides the serialized ones (see blog.fieldsets).
+    columns = ()
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, with the queries run through the async ORM."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count == 0 or self.offset > self.count:
+            return []
+        page = queryset[self.offset:self.offset + self.limit]
+        return [obj async for obj in page.aiterator(chunk_size=self.limit)]
+
+
+class KeysetPaginator(BasePagination):
+    """
+    Cursor pagination over a unique, ascending ordering such as ``(created_at, id)``.
+
+    Pages are fetched with a ``WHERE (created_at, id) > (...)`` range instead of an
+    ``OFFSET``, and no ``COUNT(*)`` is issued, so every page costs the same.
+    """
+    ordering = ('created_at', 'id')
+    columns = ordering
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 20
+    max_limit = 100
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page, position, reverse = self.get_page(queryset, request)
+        return self.set_positions(list(page), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, with the page fetched through the async ORM."""
+        page, position, reverse = self.get_page(queryset, request)
+        return self.set_positions([obj async for obj in page.aiterator(chunk_size=self.limit + 1)], position, reverse)
+
+    def get_page(self, queryset, request):
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        if position is not None:
+            queryset = queryset.filter(self._position_filter(position, reverse))
+        ordering = ['-' + field if reverse else field for field in self.ordering]
+        return queryset.order_by(*ordering)[:self.limit + 1], position, reverse
+
+    def set_positions(self, results, position, reverse):
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            first = self._get_position(results[0])
+            last = self._get_position(results[-1])
+            if reverse:
+                self.next_position = last
+                self.previous_position = first if has_more else None
+            else:
+                self.next_position = last if has_more else None
+                self.previous_position = first if position is not None else None
+        elif position is not None:
+            # Walked past either end; allow stepping back to where we came from.
+            if reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(request.query_params[self.limit_query_param], strict=True, cutoff=self.max_limit)
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('ascii')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            self.base_url = remove_query_param(self.base_url, self.cursor_query_param)
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _position_filter(self, position, reverse):
+        lookup = 'lt' if reverse else 'gt'
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            equal = {name: value for name, value in zip(self.ordering[:index], position[:index])}
+            clauses.append(Q(**equal, **{f'{field}__{lookup}': position[index]}))
+        return reduce(operator.or_, clauses)
+
+    def _get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field)
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
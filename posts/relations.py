@@ -0,0 +1,43 @@
+from django.db import router
+from django.db.models import signals
+
+
+def set_related(instance, field_name, objects, created=False):
+    """
+    Make ``objects`` the only rows linked to ``instance`` through the
+    many-to-many ``field_name``, like ``manager.set()`` but with one bulk
+    ``DELETE`` and one bulk ``INSERT`` on the through table for the difference
+    and no other queries of its own. The current links come from the prefetch
+    cache when there is one and are not read at all for a ``created``
+    instance. ``m2m_changed`` is sent as ``set()`` sends it. Afterwards the
+    prefetch cache holds ``objects``, so reading the relation costs no query.
+    Returns whether any link changed.
+    """
+    manager = getattr(instance, field_name)
+    current = set() if created else {obj.pk for obj in manager.all()}
+    wanted = {obj.pk for obj in objects}
+    removed, added = current - wanted, wanted - current
+
+    through = manager.through
+    source, target = manager.source_field_name, manager.target_field_name
+    db = router.db_for_write(through, instance=instance)
+    signal_kwargs = {'sender': through, 'instance': instance, 'reverse': False, 'model': manager.model, 'using': db}
+    if removed:
+        signals.m2m_changed.send(action='pre_remove', pk_set=removed, **signal_kwargs)
+        through._default_manager.using(db).filter(**{source: instance.pk, f'{target}__in': removed}).delete()
+        signals.m2m_changed.send(action='post_remove', pk_set=removed, **signal_kwargs)
+    if added:
+        signals.m2m_changed.send(action='pre_add', pk_set=added, **signal_kwargs)
+        # A concurrent write may have linked some already.
+        through._default_manager.using(db).bulk_create(
+            [through(**{f'{source}_id': instance.pk, f'{target}_id': pk}) for pk in added], ignore_conflicts=True)
+        signals.m2m_changed.send(action='post_add', pk_set=added, **signal_kwargs)
+
+    cache = getattr(instance, '_prefetched_objects_cache', None)
+    if cache is None:
+        cache = instance._prefetched_objects_cache = {}
+    cache.pop(manager.prefetch_cache_name, None)
+    queryset = manager.get_queryset()
+    queryset._result_cache, queryset._prefetch_done = list(objects), True
+    cache[manager.prefetch_cache_name] = queryset
+    return bool(removed or added)
@@ -0,0 +1,147 @@
+import operator
+import re
+from functools import reduce
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post
+
+SEARCH_CONFIG = 'english'
+
+# Indexed columns per model with their relative weight, most important first.
+SEARCH_FIELDS = {
+    Post: (('title', 10.0), ('content', 1.0)),
+    Comment: (('content', 1.0),),
+}
+
+
+class LikeSearchBackend:
+    @staticmethod
+    def condition(model, value):
+        return reduce(operator.or_, (Q(**{f"{column}__icontains": value}) for column, weight in SEARCH_FIELDS[model]))
+
+    def search(self, queryset, value):
+        return queryset.filter(self.condition(queryset.model, value))
+
+
+def search_terms(value):
+    """The words of ``value``, leaving out any query syntax it contains."""
+    return re.findall(r'\w+', value)
+
+
+class PostgresSearchBackend:
+    """
+    Matches against the generated ``search_vector`` tsvector column, which
+    Postgres keeps current on every insert and update and indexes with GIN.
+    Like FTS5, every term matches as a prefix of a word. Stop words are not
+    indexed, so a query made of them only (an empty tsquery) falls back to
+    ``LikeSearchBackend`` instead of matching nothing.
+    """
+
+    @staticmethod
+    def tsquery(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, queryset, value):
+        terms = search_terms(value)
+        if not terms:
+            return LikeSearchBackend().search(queryset, value)
+
+        table = queryset.model._meta.db_table
+        query, params = 'to_tsquery(%s::regconfig, %s)', (SEARCH_CONFIG, self.tsquery(terms))
+        matches = RawSQL(f'"{table}"."search_vector" @@ {query}', params, output_field=BooleanField())
+        # A constant the planner folds, so the LIKE branch costs nothing unless it applies.
+        stop_words = RawSQL(f'numnode({query}) = 0', params, output_field=BooleanField())
+        condition = Q(matches) | Q(stop_words) & LikeSearchBackend.condition(queryset.model, value)
+        rank = RawSQL(f'ts_rank("{table}"."search_vector", {query})', params, output_field=FloatField())
+        return ranked(queryset.filter(condition).annotate(search_rank=rank))
+
+
+class Fts5SearchBackend:
+    """
+    Matches against an external-content FTS5 table (``<table>_fts``) that
+    triggers keep in sync with the model table, ranked with ``bm25``.
+    """
+
+    def search(self, queryset, value):
+        terms = search_terms(value)
+        if not terms:
+            return LikeSearchBackend().search(queryset, value)
+
+        table = queryset.model._meta.db_table
+        fts_table = f'{table}_fts'
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for column, weight in SEARCH_FIELDS[queryset.model])
+        matches = RawSQL(f'SELECT rowid FROM "{fts_table}" WHERE "{fts_table}" MATCH %s', (match,))
+        rank = RawSQL(
+            f'SELECT -bm25("{fts_table}", {weights}) FROM "{fts_table}" '
+            f'WHERE "{fts_table}" MATCH %s AND rowid = "{table}"."id"',
+            (match,), output_field=FloatField())
+        return ranked(queryset.filter(pk__in=matches).annotate(search_rank=rank))
+
+
+def ranked(queryset):
+    return queryset.order_by('-search_rank', *queryset.model._meta.ordering, 'pk')
+
+
+_fts5_tables = {}
+
+
+def has_fts5_table(connection, model):
+    key = (connection.alias, connection.settings_dict['NAME'], model)
+    if key not in _fts5_tables:
+        _fts5_tables[key] = f'{model._meta.db_table}_fts' in connection.introspection.table_names()
+    return _fts5_tables[key]
+
+
+def get_backend(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite' and has_fts5_table(connection, queryset.model):
+        return Fts5SearchBackend()
+    return LikeSearchBackend()
+
+
+def search(queryset, value):
+    """
+    Full-text filter ``queryset`` by ``value``, ordered by relevance (the
+    ``search_rank`` annotation) when the database has a search index.
+    """
+    return get_backend(queryset).search(queryset, value)
+
+
+def install_fts5_triggers(connection):
+    """
+    (Re)create the triggers syncing each FTS5 table with its model table.
+
+    SQLite drops a table's triggers whenever Django rebuilds the table during
+    a migration, so this runs after every ``migrate``.
+    """
+    with connection.cursor() as cursor:
+        for model, fields in SEARCH_FIELDS.items():
+            table = model._meta.db_table
+            fts_table = f'{table}_fts'
+            if fts_table not in connection.introspection.table_names(cursor):
+                continue
+
+            columns = ', '.join(column for column, weight in fields)
+            new_values = ', '.join(f'new.{column}' for column, weight in fields)
+            old_values = ', '.join(f'old.{column}' for column, weight in fields)
+            insert = f'INSERT INTO "{fts_table}"(rowid, {columns}) VALUES (new.id, {new_values});'
+            delete = (f'INSERT INTO "{fts_table}"("{fts_table}", rowid, {columns}) '
+                      f'VALUES (\'delete\', old.id, {old_values});')
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS "{fts_table}_ai" AFTER INSERT ON "{table}" '
+                           f'BEGIN {insert} END')
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS "{fts_table}_ad" AFTER DELETE ON "{table}" '
+                           f'BEGIN {delete} END')
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS "{fts_table}_au" AFTER UPDATE OF {columns} ON "{table}" '
+                           f'BEGIN {delete} {insert} END')
+
+
+def install_search_triggers(using, **kwargs):
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        install_fts5_triggers(connection)
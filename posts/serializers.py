@@ -1,7 +1,12 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
+from blog.serializers import BulkPrimaryKeyRelatedField, FlatRepresentationMixin, FlatSerializer
 from profiles.serializers import AuthorField
 from .models import Post, Category, Tag, Comment
+from .relations import set_related
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -10,12 +15,9 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class CategoryField(serializers.RelatedField):
+class CategoryField(BulkPrimaryKeyRelatedField):
     def to_representation(self, value):
-        return CategorySerializer(value).data
-
-    def to_internal_value(self, data):
-        return data
+        return FlatSerializer.for_class(CategorySerializer).to_representation(value)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -24,54 +26,76 @@ class TagSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class TagField(serializers.RelatedField):
+class TagField(BulkPrimaryKeyRelatedField):
     def to_representation(self, value):
-        return TagSerializer(value).data
-
-    def to_internal_value(self, data):
-        return data
+        return FlatSerializer.for_class(TagSerializer).to_representation(value)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(FlatRepresentationMixin, serializers.ModelSerializer):
     categories = CategoryField(queryset=Category.objects.all(), many=True)
     tags = TagField(queryset=Tag.objects.all(), many=True)
     author = AuthorField(read_only=True)
 
     class Meta:
         model = Post
-        fields = ('id', 'title', 'content', 'author', 'categories', 'tags', 'created_at', 'updated_at')
-        read_only_fields = ('author', 'created_at', 'updated_at')
+        fields = ('id', 'title', 'content', 'author', 'categories', 'tags', 'comment_count', 'created_at', 'updated_at')
+        read_only_fields = ('author', 'comment_count', 'created_at', 'updated_at')
+
+    m2m_fields = ('categories', 'tags')
+    # Relations ?expand= can return as nested objects rather than IDs (blog.fieldsets).
+    expandable_fields = ('author', 'categories', 'tags')
 
     def create(self, validated_data):
-        categories = validated_data.pop('categories')
-        tags = validated_data.pop('tags')
+        related = {name: validated_data.pop(name) for name in self.m2m_fields}
         validated_data['author'] = self.context['request'].user.profile
 
-        instance = super().create(validated_data)
-
-        instance.tags.set(tags)
-        instance.categories.set(categories)
+        with transaction.atomic():
+            instance = Post.objects.create(**validated_data)
+            for name, objects in related.items():
+                set_related(instance, name, objects, created=True)
 
         return instance
 
     def update(self, instance, validated_data):
-        categories = validated_data.pop('categories', [])
-        tags = validated_data.pop('tags', [])
-
-        for key, value in validated_data.items():
-            setattr(instance, key, value)
-        instance.save()
+        # An empty list, which is also what a form without the field sends, leaves the relation as it is.
+        related = {name: objects for name in self.m2m_fields if (objects := validated_data.pop(name, None))}
 
-        if categories:
-            instance.categories.set(categories)
+        changed = [key for key, value in validated_data.items() if getattr(instance, key) != value]
+        for key in changed:
+            setattr(instance, key, validated_data[key])
 
-        if tags:
-            instance.tags.set(tags)
+        with transaction.atomic():
+            # Linking or unlinking counts as a change: updated_at feeds the post's ETag.
+            related_changed = [name for name, objects in related.items() if set_related(instance, name, objects)]
+            if changed or related_changed:
+                instance.save(update_fields=[*changed, 'updated_at'])
 
         return instance
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class PostBatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=('create', 'update'))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField()
+
+    def validate(self, attrs):
+        if attrs['op'] == 'update' and 'id' not in attrs:
+            raise serializers.ValidationError({'id': _("This field is required to update a post.")})
+        return attrs
+
+
+class PostBatchSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(choices=('atomic', 'best_effort'), default='atomic')
+    operations = PostBatchOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, operations):
+        if len(operations) > settings.POST_BATCH_MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                _("At most %(count)d operations per batch.") % {'count': settings.POST_BATCH_MAX_OPERATIONS})
+        return operations
+
+
+class CommentSerializer(FlatRepresentationMixin, serializers.ModelSerializer):
     author = AuthorField(read_only=True)
 
     class Meta:
@@ -79,6 +103,8 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'post', 'content', 'author', 'created_at')
         read_only_fields = ('id', 'author', 'created_at')
 
+    expandable_fields = ('author',)
+
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user.profile
         return super().create(validated_data)
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from authn.authentication import invalidate_cached_user
+from profiles.models import Profile
+from .cache import bump_content_version
+from .counters import decrement, increment
+from .models import Category, Comment, Post, Tag
+
+UserModel = get_user_model()
+
+
+@receiver(post_save, sender=Post, dispatch_uid='posts_post_saved')
+@receiver(post_delete, sender=Post, dispatch_uid='posts_post_deleted')
+@receiver(post_save, sender=Comment, dispatch_uid='posts_comment_saved')
+@receiver(post_delete, sender=Comment, dispatch_uid='posts_comment_deleted')
+@receiver(post_save, sender=Category, dispatch_uid='posts_category_saved')
+@receiver(post_delete, sender=Category, dispatch_uid='posts_category_deleted')
+@receiver(post_save, sender=Tag, dispatch_uid='posts_tag_saved')
+@receiver(post_delete, sender=Tag, dispatch_uid='posts_tag_deleted')
+@receiver(post_save, sender=Profile, dispatch_uid='posts_profile_saved')
+@receiver(post_save, sender=UserModel, dispatch_uid='posts_user_saved')
+def invalidate_cached_responses(sender, **kwargs):
+    bump_content_version()
+
+
+@receiver(m2m_changed, sender=Post.categories.through, dispatch_uid='posts_post_categories_changed')
+@receiver(m2m_changed, sender=Post.tags.through, dispatch_uid='posts_post_tags_changed')
+def invalidate_cached_responses_on_m2m_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_content_version()
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='posts_comment_count_on_save')
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        increment(Post.objects.filter(pk=instance.post_id), 'comment_count')
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid='posts_comment_count_on_delete')
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    if deleted_with(origin, Post):
+        # The post goes in the same cascade; its count goes with it.
+        return
+    decrement(Post.objects.filter(pk=instance.post_id), 'comment_count')
+
+
+@receiver(post_save, sender=Post, dispatch_uid='posts_author_post_count_on_save')
+def increment_author_post_count(sender, instance, created, **kwargs):
+    if created:
+        increment(Profile.objects.filter(pk=instance.author_id), 'post_count')
+        # The author's cached profile carries the old count.
+        invalidate_cached_user(instance.author.user_id)
+
+
+@receiver(pre_delete, sender=Post, dispatch_uid='posts_post_counts_on_delete')
+def decrement_post_counts(sender, instance, **kwargs):
+    # The category/tag through rows are cascade-deleted without m2m_changed,
+    # so release them while they can still be read.
+    decrement(Profile.objects.filter(pk=instance.author_id), 'post_count')
+    if Post.author.is_cached(instance):
+        user_id = instance.author.user_id
+    else:
+        user_id = Profile.objects.filter(pk=instance.author_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_cached_user(user_id)
+    for field, model in (('categories', Category), ('tags', Tag)):
+        ids = list(getattr(instance, field).through.objects.filter(post_id=instance.pk)
+                   .values_list(f'{model._meta.model_name}_id', flat=True))
+        decrement(model.objects.filter(pk__in=ids), 'post_count')
+
+
+@receiver(m2m_changed, sender=Post.categories.through, dispatch_uid='posts_category_post_count')
+@receiver(m2m_changed, sender=Post.tags.through, dispatch_uid='posts_tag_post_count')
+def update_taxonomy_post_count(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() reports every requested id and clear() reports none, so record
+        # the rows that are actually linked before they go.
+        linked = sender.objects.filter(**{sender_field(sender, instance): instance.pk})
+        if pk_set is not None:
+            linked = linked.filter(**{f'{sender_field(sender, model)}__in': pk_set})
+        instance._removed_m2m_pks = set(linked.values_list(f'{sender_field(sender, model)}_id', flat=True))
+        return
+    if action == 'post_add':
+        changed, delta = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        changed, delta = instance.__dict__.pop('_removed_m2m_pks', set()), -1
+    else:
+        return
+    if not changed:
+        return
+
+    if reverse:
+        increment(type(instance).objects.filter(pk=instance.pk), 'post_count', delta * len(changed))
+    else:
+        increment(model.objects.filter(pk__in=changed), 'post_count', delta)
+
+
+def deleted_with(origin, model):
+    """Whether the delete that started a cascade (its ``origin``) is of ``model`` rows."""
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+def sender_field(through, model):
+    return next(field.name for field in through._meta.get_fields()
+                if field.is_relation and field.related_model is model._meta.concrete_model)
@@ -0,0 +1,146 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from posts.cache import CONTENT_VERSION_ID, get_content_version
+from posts.models import ContentVersion
+from posts.tests.factories import CategoryFactory, CommentFactory, PostFactory, TagFactory
+from posts.tests.test_views import create_token
+from profiles.tests.factories import UserFactory
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PostResponseCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = CategoryFactory()
+        cls.tag = TagFactory()
+        cls.post = PostFactory(categories=[cls.category], tags=[cls.tag])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = reverse("api:posts:posts-list")
+        self.detail_url = reverse("api:posts:posts-detail", args=[self.post.pk])
+
+    def test_anonymous_list_is_served_from_cache(self):
+        self.client.get(self.list_url)
+        with self.assertNumQueries(1):  # The content version.
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['id'], self.post.pk)
+
+    def test_anonymous_retrieve_is_served_from_cache(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):  # The content version.
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['id'], self.post.pk)
+
+    def test_query_parameter_order_does_not_matter(self):
+        self.client.get(f'{self.list_url}?limit=5&offset=0')
+        with self.assertNumQueries(1):  # The content version.
+            self.client.get(f'{self.list_url}?offset=0&limit=5')
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.get(self.detail_url)
+        user = UserFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(user).access_token}")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.detail_url)
+        self.assertGreater(len(queries), 0)
+
+    def test_post_update_invalidates_cached_responses(self):
+        self.client.get(self.detail_url)
+        self.post.title = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        self.assertEqual(self.client.get(self.detail_url).data['title'], "Changed")
+
+    def test_post_delete_invalidates_cached_responses(self):
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory(author=self.post.author).delete()
+            self.post.delete()
+        self.assertEqual(self.client.get(self.list_url).data['count'], 0)
+
+    def test_taxonomy_changes_invalidate_cached_responses(self):
+        self.client.get(self.detail_url)
+        self.category.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        self.assertEqual(self.client.get(self.detail_url).data['categories'][0]['name'], "Renamed")
+
+    def test_m2m_changes_invalidate_cached_responses(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.clear()
+        self.assertListEqual(self.client.get(self.detail_url).data['tags'], [])
+
+    def test_comment_changes_bump_the_content_version(self):
+        content = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentFactory(post=self.post, author=self.post.author)
+        self.assertGreater(get_content_version().version, content.version)
+        self.assertGreater(get_content_version().modified, content.modified)
+
+    def test_the_version_moves_only_once_the_write_commits(self):
+        content = get_content_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            CommentFactory(post=self.post, author=self.post.author)
+            self.assertEqual(get_content_version().version, content.version)
+        self.assertTrue(callbacks)
+
+    def test_author_changes_invalidate_cached_responses(self):
+        self.client.get(self.detail_url)
+        user = self.post.author.user
+        user.first_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.client.get(self.detail_url).data['author']['user']['first_name'], "Renamed")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PerProcessCacheTestCase(TestCase):
+    """The content version lives in the database, so a per-process cache follows every worker's writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = PostFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.detail_url = reverse("api:posts:posts-detail", args=[self.post.pk])
+
+    def write_in_another_worker(self):
+        # Its signals bump the version in the database; this process's cache never hears of it.
+        User.objects.filter(pk=self.post.author.user_id).update(first_name="Renamed")
+        ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).update(version=F('version') + 1)
+
+    def test_cached_responses_follow_other_workers_writes(self):
+        self.client.get(self.detail_url)
+        self.write_in_another_worker()
+        self.assertEqual(self.client.get(self.detail_url).data['author']['user']['first_name'], "Renamed")
+
+    def test_etags_follow_other_workers_writes(self):
+        for url in (self.detail_url, reverse("api:async:posts-detail", args=[self.post.pk])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        response = self.client.get(self.detail_url)
+        self.write_in_another_worker()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    @override_settings(POSTS_RESPONSE_CACHE=False)
+    def test_the_response_cache_can_be_turned_off(self):
+        response = self.client.get(self.detail_url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.detail_url)
+        self.assertGreater(len(queries), 1)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
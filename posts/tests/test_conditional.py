@@ -0,0 +1,158 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from posts.serializers import CommentSerializer, PostSerializer
+from posts.tests.factories import CategoryFactory, CommentFactory, PostFactory, TagFactory
+from posts.tests.test_views import create_token
+from profiles.tests.factories import UserFactory
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalGetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.post = PostFactory(author=cls.user.profile, categories=[CategoryFactory()], tags=[TagFactory()])
+        cls.comment = CommentFactory(post=cls.post, author=cls.user.profile)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(self.user).access_token}")
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+class PostConditionalGetTestCase(ConditionalGetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse("api:posts:posts-list")
+        self.detail_url = reverse("api:posts:posts-detail", args=[self.post.pk])
+
+    def test_retrieve_sends_validators(self):
+        response = self.client.get(self.detail_url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_retrieve_returns_304_without_serializing(self):
+        response = self.client.get(self.detail_url)
+        with mock.patch.object(PostSerializer, 'represent', side_effect=AssertionError):
+            revalidated = self.revalidate(self.detail_url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_retrieve_honours_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        revalidated = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_returns_200_after_an_update(self):
+        response = self.client.get(self.detail_url)
+        self.post.title = "Changed"
+        self.post.save()
+        revalidated = self.revalidate(self.detail_url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_list_returns_304_without_serializing(self):
+        response = self.client.get(self.list_url)
+        with mock.patch.object(PostSerializer, 'represent', side_effect=AssertionError):
+            revalidated = self.revalidate(self.list_url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_depends_on_query_parameters(self):
+        response = self.client.get(self.list_url)
+        revalidated = self.revalidate(f'{self.list_url}?limit=1', response)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+
+    def test_list_returns_200_after_a_new_post(self):
+        response = self.client.get(self.list_url)
+        PostFactory(author=self.user.profile)
+        self.assertEqual(self.revalidate(self.list_url, response).status_code, status.HTTP_200_OK)
+
+    def test_list_validators_only_read_the_page(self):
+        for query in ('', '?pagination=cursor'):
+            with self.subTest(query=query), CaptureQueriesContext(connection) as queries:
+                self.client.get(f'{self.list_url}{query}')
+            self.assertFalse(any('MAX(' in query['sql'] or 'SUM(' in query['sql'] for query in queries))
+
+    def test_list_returns_200_after_a_deleted_post_on_the_page(self):
+        response = self.client.get(f'{self.list_url}?pagination=cursor')
+        PostFactory(author=self.user.profile)
+        self.post.delete()
+        revalidated = self.revalidate(f'{self.list_url}?pagination=cursor', response)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+
+    def test_last_modified_moves_on_related_changes(self):
+        response = self.client.get(self.list_url)
+        user = self.user
+        user.first_name = "Renamed"
+        # A second later, so the change is visible at the resolution of HTTP dates.
+        later = timezone.now() + timedelta(seconds=1)
+        with mock.patch('posts.cache.timezone.now', return_value=later), \
+                self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+
+    def test_anonymous_cached_response_revalidates(self):
+        client = APIClient()
+        response = client.get(self.list_url)
+        with self.assertNumQueries(1):  # The content version.
+            revalidated = client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class CommentConditionalGetTestCase(ConditionalGetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("api:comments:comments-list")
+
+    def test_list_returns_304_without_serializing(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+        with mock.patch.object(CommentSerializer, 'represent', side_effect=AssertionError):
+            revalidated = self.revalidate(self.url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_returns_200_after_a_new_comment(self):
+        response = self.client.get(self.url)
+        CommentFactory(post=self.post, author=self.user.profile)
+        self.assertEqual(self.revalidate(self.url, response).status_code, status.HTTP_200_OK)
+
+    def test_list_returns_200_after_a_deleted_comment(self):
+        response = self.client.get(self.url)
+        self.comment.delete()
+        self.assertEqual(self.revalidate(self.url, response).status_code, status.HTTP_200_OK)
+
+
+class TaxonomyConditionalGetTestCase(ConditionalGetTestCase):
+    def test_categories_return_304_when_unchanged(self):
+        url = reverse("api:categories:listing")
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_tags_return_200_after_a_rename(self):
+        url = reverse("api:tags:listing")
+        response = self.client.get(url)
+        tag = self.post.tags.get()
+        tag.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertEqual(revalidated.data[0]['name'], "Renamed")
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Category, Post, Tag
+from posts.tests.factories import CategoryFactory, CommentFactory, PostFactory, TagFactory
+from posts.tests.test_views import create_token
+from profiles.models import Profile
+from profiles.tests.factories import UserFactory
+
+
+class CounterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = UserFactory().profile
+        cls.categories = CategoryFactory.create_batch(3)
+        cls.tags = TagFactory.create_batch(3)
+
+    def post_counts(self, objects):
+        return [type(obj).objects.get(pk=obj.pk).post_count for obj in objects]
+
+
+class CommentCountTestCase(CounterTestCase):
+    def test_it_counts_created_and_deleted_comments(self):
+        post = PostFactory(author=self.author)
+        comments = CommentFactory.create_batch(3, post=post, author=self.author)
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 3)
+        comments[0].delete()
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 2)
+
+    def test_deleting_a_post_does_not_touch_it_per_comment(self):
+        def delete_post_with_comments(n):
+            post = PostFactory(author=self.author)
+            CommentFactory.create_batch(n, post=post, author=self.author)
+            post = Post.objects.get(pk=post.pk)
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries, \
+                    self.captureOnCommitCallbacks() as callbacks:
+                post.delete()
+            return len(queries), len(callbacks)
+
+        self.assertEqual(delete_post_with_comments(1), delete_post_with_comments(5))
+        self.assertEqual(Profile.objects.get(pk=self.author.pk).post_count, 0)
+
+
+class PostCountTestCase(CounterTestCase):
+    def test_it_counts_author_posts(self):
+        posts = PostFactory.create_batch(2, author=self.author)
+        self.assertEqual(Profile.objects.get(pk=self.author.pk).post_count, 2)
+        posts[0].delete()
+        self.assertEqual(Profile.objects.get(pk=self.author.pk).post_count, 1)
+
+    def test_it_counts_m2m_add_and_remove(self):
+        post = PostFactory(author=self.author, categories=self.categories[:2], tags=self.tags)
+        self.assertListEqual(self.post_counts(self.categories), [1, 1, 0])
+        post.categories.remove(self.categories[0], self.categories[2])
+        self.assertListEqual(self.post_counts(self.categories), [0, 1, 0])
+        post.tags.set(self.tags[1:])
+        self.assertListEqual(self.post_counts(self.tags), [0, 1, 1])
+
+    def test_it_counts_clear_and_reverse_changes(self):
+        post = PostFactory(author=self.author, tags=self.tags)
+        post.tags.clear()
+        self.assertListEqual(self.post_counts(self.tags), [0, 0, 0])
+        self.tags[0].posts.add(post, PostFactory(author=self.author))
+        self.assertListEqual(self.post_counts(self.tags), [2, 0, 0])
+        self.tags[0].posts.clear()
+        self.assertListEqual(self.post_counts(self.tags), [0, 0, 0])
+
+    def test_it_releases_taxonomy_counts_when_a_post_is_deleted(self):
+        post = PostFactory(author=self.author, categories=self.categories, tags=self.tags)
+        post.delete()
+        self.assertListEqual(self.post_counts(self.categories + self.tags), [0] * 6)
+
+    def test_it_counts_serializer_writes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(self.author.user).access_token}")
+        data = {"title": "Title", "content": "Content", "categories": [self.categories[0].pk],
+                "tags": [tag.pk for tag in self.tags]}
+        response = client.post(reverse("api:posts:posts-list"), data=data)
+        self.assertListEqual(self.post_counts(self.categories + self.tags), [1, 0, 0, 1, 1, 1])
+
+        data["categories"] = [self.categories[1].pk]
+        client.put(reverse("api:posts:posts-detail", args=[response.data['id']]), data=data)
+        self.assertListEqual(self.post_counts(self.categories), [0, 1, 0])
+
+
+class CounterOrderingTestCase(CounterTestCase):
+    def test_posts_can_be_ordered_by_comment_count(self):
+        quiet, busy, medium = PostFactory.create_batch(3, author=self.author)
+        CommentFactory.create_batch(3, post=busy, author=self.author)
+        CommentFactory.create_batch(1, post=medium, author=self.author)
+        response = APIClient().get(f'{reverse("api:posts:posts-list")}?ordering=-comment_count')
+        self.assertListEqual([post['id'] for post in response.data['results']], [busy.pk, medium.pk, quiet.pk])
+        self.assertListEqual([post['comment_count'] for post in response.data['results']], [3, 1, 0])
+
+    def test_tags_can_be_ordered_by_post_count(self):
+        PostFactory(author=self.author, tags=self.tags[1:])
+        PostFactory(author=self.author, tags=self.tags[2:])
+        response = APIClient().get(f'{reverse("api:tags:listing")}?ordering=-post_count')
+        self.assertListEqual([tag['id'] for tag in response.data], [tag.pk for tag in reversed(self.tags)])
+
+
+class ReconcileCountersCommandTestCase(CounterTestCase):
+    def test_it_fixes_drifted_counters(self):
+        post = PostFactory(author=self.author, categories=self.categories[:1], tags=self.tags[:1])
+        CommentFactory.create_batch(2, post=post, author=self.author)
+        Post.objects.update(comment_count=7)
+        Category.objects.update(post_count=0)
+        Tag.objects.update(post_count=5)
+        Profile.objects.update(post_count=0)
+
+        stdout = StringIO()
+        call_command('reconcile_counters', batch_size=2, stdout=stdout)
+
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 2)
+        self.assertListEqual(self.post_counts(self.categories + self.tags), [1, 0, 0, 1, 0, 0])
+        self.assertEqual(Profile.objects.get(pk=self.author.pk).post_count, 1)
+        self.assertIn("posts.Tag.post_count: checked 3, fixed 3", stdout.getvalue())
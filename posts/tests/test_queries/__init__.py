@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from rest_framework.test import APIClient
+
+from blog.testing import ScalingQueriesTestCase
+from posts.tests.factories import CategoryFactory, CommentFactory, PostFactory, TagFactory
+from posts.tests.test_views import create_token
+from profiles.tests.factories import UserFactory
+
+
+class BlogQueriesTestCase(ScalingQueriesTestCase):
+    """
+    Seeds posts with two categories, two tags and two comments each, all
+    written by ``self.owner`` so write endpoints have targets to act on.
+    """
+    plans_dir = Path(__file__).parent / 'plans'
+
+    def setUp(self):
+        self.owner = UserFactory()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(self.owner).access_token}")
+        self.categories = CategoryFactory.create_batch(2)
+        self.tags = TagFactory.create_batch(2)
+        self.owned_posts = []
+        self.owned_comments = []
+
+    def seed(self, n):
+        for _ in range(n):
+            post = PostFactory(author=self.owner.profile, categories=self.categories, tags=self.tags)
+            self.owned_posts.append(post)
+            self.owned_comments.extend(CommentFactory.create_batch(2, post=post, author=self.owner.profile))
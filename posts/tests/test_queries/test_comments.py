@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from . import BlogQueriesTestCase
+
+
+class CommentQueriesTestCase(BlogQueriesTestCase):
+    def test_list(self):
+        self.assertScalableQueries('comments_list', lambda: self.client.get(reverse("api:comments:comments-list")))
+
+    def test_list_with_filters(self):
+        url = f'{reverse("api:comments:comments-list")}?author={self.owner.profile.pk}&q=a'
+        self.assertScalableQueries('comments_list_filtered', lambda: self.client.get(url))
+
+    def test_list_with_sparse_fields(self):
+        url = f'{reverse("api:comments:comments-list")}?omit=content&expand='
+        self.assertScalableQueries('comments_list_sparse', lambda: self.client.get(url))
+
+    def test_create(self):
+        def request():
+            data = {"post": self.owned_posts[0].pk, "content": "Content"}
+            return self.client.post(reverse("api:comments:comments-list"), data=data)
+
+        self.assertScalableQueries('comments_create', request, status=status.HTTP_201_CREATED)
+
+    def test_destroy(self):
+        def request():
+            return self.client.delete(reverse("api:comments:comments-detail", args=[self.owned_comments.pop().pk]))
+
+        self.assertScalableQueries('comments_destroy', request, status=status.HTTP_204_NO_CONTENT)
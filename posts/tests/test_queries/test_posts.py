@@ -0,0 +1,65 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from . import BlogQueriesTestCase
+
+
+class PostQueriesTestCase(BlogQueriesTestCase):
+    def test_list(self):
+        self.assertScalableQueries('posts_list', lambda: self.client.get(reverse("api:posts:posts-list")))
+
+    def test_list_with_filters(self):
+        url = (f'{reverse("api:posts:posts-list")}?categories={self.categories[0].pk}'
+               f'&tags={self.tags[0].pk}&ordering=-comment_count')
+        self.assertScalableQueries('posts_list_filtered', lambda: self.client.get(url))
+
+    def test_list_with_search(self):
+        url = f'{reverse("api:posts:posts-list")}?q=post'
+        self.assertScalableQueries('posts_list_search', lambda: self.client.get(url))
+
+    def test_list_with_cursor(self):
+        url = f'{reverse("api:posts:posts-list")}?pagination=cursor'
+        self.assertScalableQueries('posts_list_cursor', lambda: self.client.get(url))
+
+    def test_list_with_sparse_fields(self):
+        url = f'{reverse("api:posts:posts-list")}?fields=id,title,author,tags&expand='
+        self.assertScalableQueries('posts_list_sparse', lambda: self.client.get(url))
+
+    def test_retrieve(self):
+        self.assertScalableQueries(
+            'posts_retrieve',
+            lambda: self.client.get(reverse("api:posts:posts-detail", args=[self.owned_posts[0].pk])))
+
+    def test_comments(self):
+        self.assertScalableQueries(
+            'posts_comments',
+            lambda: self.client.get(reverse("api:posts:posts-comments", args=[self.owned_posts[0].pk])))
+
+    def test_create(self):
+        def request():
+            data = {"title": "Title", "content": "Content", "categories": [category.pk for category in self.categories],
+                    "tags": [tag.pk for tag in self.tags]}
+            return self.client.post(reverse("api:posts:posts-list"), data=data)
+
+        self.assertScalableQueries('posts_create', request, status=status.HTTP_201_CREATED)
+
+    def test_update(self):
+        def request():
+            data = {"title": "Title", "content": "Content", "categories": [self.categories[0].pk],
+                    "tags": [self.tags[1].pk]}
+            return self.client.put(reverse("api:posts:posts-detail", args=[self.owned_posts[0].pk]), data=data)
+
+        self.assertScalableQueries('posts_update', request)
+
+    def test_partial_update(self):
+        def request():
+            return self.client.patch(reverse("api:posts:posts-detail", args=[self.owned_posts[0].pk]),
+                                     data={"title": "Title", "tags": [self.tags[1].pk]}, format='json')
+
+        self.assertScalableQueries('posts_partial_update', request)
+
+    def test_destroy(self):
+        def request():
+            return self.client.delete(reverse("api:posts:posts-detail", args=[self.owned_posts.pop().pk]))
+
+        self.assertScalableQueries('posts_destroy', request, status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,19 @@
+from rest_framework.reverse import reverse
+
+from posts.tests.factories import CategoryFactory, TagFactory
+from . import BlogQueriesTestCase
+
+
+class TaxonomyQueriesTestCase(BlogQueriesTestCase):
+    def seed(self, n):
+        super().seed(n)
+        CategoryFactory.create_batch(n)
+        TagFactory.create_batch(n)
+
+    def test_categories_list(self):
+        url = f'{reverse("api:categories:listing")}?search=category&ordering=-post_count'
+        self.assertScalableQueries('categories_list', lambda: self.client.get(url))
+
+    def test_tags_list(self):
+        url = f'{reverse("api:tags:listing")}?search=tag&ordering=-post_count'
+        self.assertScalableQueries('tags_list', lambda: self.client.get(url))
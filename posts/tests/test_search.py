@@ -0,0 +1,95 @@
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Post, Comment
+from posts.search import (
+    Fts5SearchBackend, LikeSearchBackend, PostgresSearchBackend, get_backend, has_fts5_table, search, search_terms,
+)
+from posts.tests.factories import PostFactory, CommentFactory
+from profiles.tests.factories import UserFactory
+
+
+class SearchBackendTestCase(TestCase):
+    def test_it_uses_a_full_text_backend(self):
+        backend = get_backend(Post.objects.all())
+        expected = PostgresSearchBackend if connection.vendor == 'postgresql' else Fts5SearchBackend
+        self.assertIsInstance(backend, expected)
+
+
+class PostgresSearchBackendTestCase(SimpleTestCase):
+    def test_terms_match_as_prefixes(self):
+        self.assertEqual(PostgresSearchBackend.tsquery(search_terms('garden soil')), 'garden:* & soil:*')
+
+    def test_query_syntax_is_dropped(self):
+        self.assertEqual(PostgresSearchBackend.tsquery(search_terms("pasta\" -(' | !x:*")), 'pasta:* & x:*')
+
+    def test_a_query_of_stop_words_falls_back_to_like(self):
+        postgres = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.postgresql'}})['default']
+        queryset = PostgresSearchBackend().search(Post.objects.all(), "in the")
+        sql, params = queryset.query.get_compiler(connection=postgres).as_sql()
+        self.assertIn('numnode(to_tsquery(%s::regconfig, %s)) = 0) AND (UPPER("posts_post"."title"::text) LIKE', sql)
+        self.assertIn('%in the%', params)
+
+
+class PostSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = UserFactory().profile
+        cls.content_match = PostFactory(author=cls.author, title="Weekly notes", content="Gardening in the spring")
+        cls.title_match = PostFactory(author=cls.author, title="Gardening basics", content="Soil and water")
+        PostFactory(author=cls.author, title="Cooking", content="Pasta recipes")
+
+    def test_it_ranks_title_matches_first(self):
+        results = list(search(Post.objects.all(), "gardening"))
+        self.assertListEqual(results, [self.title_match, self.content_match])
+
+    def test_it_matches_word_prefixes_and_stems(self):
+        self.assertListEqual(list(search(Post.objects.all(), "garden")), [self.title_match, self.content_match])
+
+    def test_it_requires_every_term(self):
+        self.assertListEqual(list(search(Post.objects.all(), "gardening soil")), [self.title_match])
+
+    def test_it_ignores_query_syntax_in_user_input(self):
+        self.assertListEqual(list(search(Post.objects.all(), 'pasta" -("')), [Post.objects.get(title="Cooking")])
+
+    def test_a_query_of_stop_words_matches_on_every_backend(self):
+        backends = [LikeSearchBackend()]
+        if connection.vendor == 'postgresql':
+            backends.append(PostgresSearchBackend())
+        if connection.vendor == 'sqlite' and has_fts5_table(connection, Post):
+            backends.append(Fts5SearchBackend())
+        for backend in backends:
+            with self.subTest(backend=type(backend).__name__):
+                self.assertListEqual(list(backend.search(Post.objects.all(), "in the")), [self.content_match])
+
+    def test_index_follows_updates(self):
+        self.title_match.title = "Beekeeping basics"
+        self.title_match.save()
+        self.assertListEqual(list(search(Post.objects.all(), "beekeeping")), [self.title_match])
+        self.assertNotIn(self.title_match, search(Post.objects.all(), "gardening"))
+
+    def test_index_follows_deletes(self):
+        self.content_match.delete()
+        self.assertListEqual(list(search(Post.objects.all(), "gardening")), [self.title_match])
+
+    def test_q_parameter_uses_the_index(self):
+        response = APIClient().get(f'{reverse("api:posts:posts-list")}?q=gardening')
+        self.assertListEqual([post['id'] for post in response.data['results']],
+                             [self.title_match.pk, self.content_match.pk])
+
+
+class CommentSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.comment = CommentFactory(content="Lovely tulips this year")
+        CommentFactory(content="Nice post")
+
+    def test_it_finds_comments_by_content(self):
+        self.assertListEqual(list(search(Comment.objects.all(), "tulip")), [self.comment])
+
+    def test_index_follows_new_comments(self):
+        comment = CommentFactory(post=self.comment.post, author=self.comment.author, content="More tulips please")
+        self.assertSetEqual(set(search(Comment.objects.all(), "tulips")), {self.comment, comment})
@@ -0,0 +1,102 @@
+import csv
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+
+from posts.management.commands.seed_blog import Command
+from posts.models import Category, Comment, Post, Tag
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+
+def seed_blog(**options):
+    options = {'users': 5, 'posts': 30, 'comments': 80, 'categories': 4, 'tags': 6, 'batch_size': 7, **options}
+    call_command('seed_blog', stdout=StringIO(), **options)
+
+
+def snapshot():
+    return {
+        'users': list(UserModel.objects.order_by('pk').values_list('pk', 'username')),
+        'posts': list(Post.objects.order_by('pk').values_list('pk', 'author', 'title', 'created_at', 'comment_count')),
+        'categories': list(Post.categories.through.objects.order_by('post', 'category').values_list('post', 'category')),
+        'tags': list(Post.tags.through.objects.order_by('post', 'tag').values_list('post', 'tag')),
+        'comments': list(Comment.objects.order_by('pk').values_list('pk', 'post', 'author', 'content', 'created_at')),
+    }
+
+
+class SeedBlogCommandTestCase(TestCase):
+    def test_it_creates_the_requested_rows(self):
+        seed_blog()
+        self.assertEqual(UserModel.objects.count(), 5)
+        self.assertEqual(Profile.objects.count(), 5)
+        self.assertEqual(Category.objects.count(), 4)
+        self.assertEqual(Tag.objects.count(), 6)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 80)
+        self.assertTrue(Post.categories.through.objects.exists())
+        self.assertTrue(UserModel.objects.first().check_password('password'))
+
+    def test_it_keeps_counters_consistent(self):
+        seed_blog(skew=1.5)
+        stdout = StringIO()
+        call_command('reconcile_counters', stdout=stdout)
+        self.assertEqual(stdout.getvalue().count("fixed 0"), 4)
+
+    def test_it_spreads_post_timestamps(self):
+        seed_blog(days=30)
+        created = list(Post.objects.order_by('pk').values_list('created_at', flat=True))
+        self.assertListEqual(created, sorted(created))
+        self.assertGreater((created[-1] - created[0]).days, 25)
+        self.assertFalse(Comment.objects.filter(created_at__lt=F('post__created_at')).exists())
+
+    def test_it_is_deterministic_for_a_seed(self):
+        seed_blog(seed=7)
+        first = snapshot()
+        for model in (Comment, Post, Category, Tag, UserModel):
+            model.objects.all().delete()
+
+        seed_blog(seed=7)
+        self.assertDictEqual(snapshot(), first)
+
+        UserModel.objects.all().delete()
+        seed_blog(seed=8)
+        self.assertNotEqual(snapshot()['comments'], first['comments'])
+
+    def test_it_appends_after_existing_rows(self):
+        seed_blog()
+        seed_blog()
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(UserModel.objects.values('username').distinct().count(), 10)
+
+
+class CopyTestCase(TestCase):
+    def copy(self, model, batch):
+        """The csv rows ``Command.copy`` hands to a psycopg2 cursor."""
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.cursor.copy_expert.side_effect = lambda sql, buffer: rows.extend(csv.reader(buffer))
+        rows = []
+        # Like psycopg2's Json adapter, which quotes the JSON it wraps.
+        adapter = mock.Mock(side_effect=lambda value, encoder: f"'{json.dumps(value)}'")
+        with mock.patch.object(connection, 'cursor', return_value=cursor), \
+                mock.patch.object(connection.ops, 'adapt_json_value', adapter):
+            Command().copy(model, batch)
+        return rows
+
+    def test_json_and_null_columns_are_written_as_postgres_reads_them(self):
+        user = UserModel.objects.create(username='copied')
+        profile = Profile(id=100, user=user, bio=None, picture_variants={'small': 'profiles/ab/ab.webp'})
+
+        [row] = self.copy(Profile, [profile])
+
+        values = dict(zip((field.attname for field in Profile._meta.concrete_fields), row))
+        self.assertEqual(json.loads(values['picture_variants']), {'small': 'profiles/ab/ab.webp'})
+        self.assertEqual(values['bio'], r'\N')
+        self.assertEqual(values['user_id'], str(user.pk))
@@ -75,3 +75,6 @@ class CommentSerializerIntegrationTestCase(TestCase):
     def test_serializer_data_contains_the_correct_keys(self):
         keys = ['id', 'post', 'content', 'author', 'created_at']
         self.assertListEqual(list(self.serializer.data.keys()), keys)
+
+    def test_represent_matches_serializer_data(self):
+        self.assertEqual(CommentSerializer.represent(self.comment), self.serializer.data)
@@ -1,6 +1,9 @@
 import inspect
+from unittest import mock
 
+from django.db import connection
 from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from rest_framework import serializers
 
 from posts.serializers import PostSerializer, CategoryField, TagField
@@ -19,12 +22,12 @@ class PostSerializerStructureTestCase(TestCase):
 
     def test_it_has_meta_attribute_fields(self):
         self.assertTupleEqual(PostSerializer.Meta.fields, (
-            'id', 'title', 'content', 'author', 'categories', 'tags', 'created_at', 'updated_at'
+            'id', 'title', 'content', 'author', 'categories', 'tags', 'comment_count', 'created_at', 'updated_at'
         ))
 
     def test_it_has_meta_attribute_read_only_fields(self):
         self.assertTupleEqual(PostSerializer.Meta.read_only_fields, (
-            'author', 'created_at', 'updated_at'
+            'author', 'comment_count', 'created_at', 'updated_at'
         ))
 
     def test_categories_is_instance_of_CategoryField(self):
@@ -127,11 +130,138 @@ class PostSerializerUpdateTestCase(TestCase):
         self.assertEquals(instance.content, self.data['content'])
 
 
+class PostSerializerWriteTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = CategoryFactory.create_batch(3)
+        cls.tags = TagFactory.create_batch(3)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = UserFactory()
+        self.post = PostFactory(author=self.request.user.profile, categories=self.categories[:2], tags=self.tags[:2])
+        self.data = {"title": self.post.title, "content": self.post.content,
+                     "categories": [category.id for category in self.categories[:2]],
+                     "tags": [tag.id for tag in self.tags[:2]]}
+
+    def serializer(self, data, instance=None):
+        return PostSerializer(instance, data=data, context={"request": self.request})
+
+    def prefetched_post(self):
+        return Post.objects.prefetch_related('categories', 'tags').get(pk=self.post.pk)
+
+    def test_it_checks_all_ids_of_a_relation_with_one_query(self):
+        data = {**self.data, "categories": [category.id for category in self.categories] * 2}
+        serializer = self.serializer(data)
+
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid())
+        self.assertListEqual(serializer.validated_data['categories'], self.categories)
+
+    def test_it_rejects_unknown_ids(self):
+        serializer = self.serializer({**self.data, "tags": [self.tags[0].id, 0]})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['tags'], ['Invalid pk "0" - object does not exist.'])
+
+    def test_it_rejects_ids_of_the_wrong_type(self):
+        for value in ('one', True, {'id': 1}):
+            with self.subTest(value=value):
+                serializer = self.serializer({**self.data, "categories": [value]})
+                self.assertFalse(serializer.is_valid())
+                self.assertEqual(serializer.errors['categories'][0].code, 'incorrect_type')
+
+    def test_update_with_an_empty_list_keeps_the_relation(self):
+        serializer = self.serializer({**self.data, "categories": []}, self.prefetched_post())
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(self.post.categories.count(), 2)
+
+    def test_create_keeps_taxonomy_counts(self):
+        serializer = self.serializer(self.data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertListEqual([Category.objects.get(pk=category.pk).post_count for category in self.categories],
+                             [2, 2, 0])
+
+    def test_create_renders_without_reading_the_relations_again(self):
+        serializer = self.serializer(self.data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        with self.assertNumQueries(0):
+            self.assertListEqual([tag['id'] for tag in serializer.data['tags']], self.data['tags'])
+
+    def test_create_is_rolled_back_if_linking_fails(self):
+        serializer = self.serializer(self.data)
+        self.assertTrue(serializer.is_valid())
+
+        with mock.patch('posts.serializers.set_related', side_effect=[True, RuntimeError]):
+            with self.assertRaises(RuntimeError):
+                serializer.save()
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_update_applies_only_the_difference(self):
+        data = {**self.data, "categories": [self.categories[1].id, self.categories[2].id]}
+        serializer = self.serializer(data, self.prefetched_post())
+        self.assertTrue(serializer.is_valid())
+
+        with CaptureQueriesContext(connection) as queries:
+            instance = serializer.save()
+
+        through = [query['sql'] for query in queries if 'posts_post_categories' in query['sql']]
+        self.assertTrue(any(sql.startswith('DELETE') for sql in through))
+        self.assertTrue(any(sql.startswith('INSERT') for sql in through))
+        self.assertFalse(any('posts_post_tags' in query['sql'] for query in queries))
+        self.assertListEqual(list(instance.categories.values_list('id', flat=True)), data['categories'])
+        self.assertListEqual([Category.objects.get(pk=category.pk).post_count for category in self.categories],
+                             [0, 1, 1])
+
+    def test_update_saves_only_changed_columns(self):
+        serializer = self.serializer({**self.data, "title": "New title"}, self.prefetched_post())
+        self.assertTrue(serializer.is_valid())
+
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "posts_post"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"content"', updates[0])
+
+    def test_update_without_changes_writes_nothing(self):
+        serializer = self.serializer(self.data, self.prefetched_post())
+        self.assertTrue(serializer.is_valid())
+
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+
+        self.assertListEqual([query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']], [])
+
+    def test_relinking_counts_as_a_change(self):
+        updated_at = self.post.updated_at
+        serializer = self.serializer({**self.data, "tags": [self.tags[2].id]}, self.prefetched_post())
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertGreater(Post.objects.get(pk=self.post.pk).updated_at, updated_at)
+
+
 class PostSerializerIntegrationTestCase(TestCase):
     def setUp(self):
-        self.post = PostFactory()
+        self.post = PostFactory(categories=CategoryFactory.create_batch(2), tags=TagFactory.create_batch(3))
         self.serializer = PostSerializer(self.post)
 
     def test_serializer_data_contains_the_correct_keys(self):
-        keys = ['id', 'title', 'content', 'author', 'categories', 'tags', 'created_at', 'updated_at']
+        keys = ['id', 'title', 'content', 'author', 'categories', 'tags', 'comment_count', 'created_at', 'updated_at']
         self.assertListEqual(list(self.serializer.data.keys()), keys)
+
+    def test_represent_matches_serializer_data(self):
+        self.assertEqual(PostSerializer.represent(self.post), self.serializer.data)
+
+    def test_represent_many_matches_serializer_data(self):
+        posts = [self.post, PostFactory()]
+        self.assertEqual(PostSerializer.represent(posts, many=True), PostSerializer(posts, many=True).data)
@@ -25,14 +25,15 @@ class TagSerializerIntegrationTestCase(TestCase):
         self.serializer = TagSerializer(self.tag)
 
     def test_serializer_data_contains_the_correct_keys(self):
-        keys = ['id', 'name', 'slug']
+        keys = ['id', 'name', 'slug', 'post_count']
         self.assertListEqual(list(self.serializer.data.keys()), keys)
 
     def test_serializer_data_contains_correct_values(self):
         self.assertDictEqual(self.serializer.data, {
             "id": self.tag.pk,
             "name": "Tag",
-            "slug": "tag-slug"
+            "slug": "tag-slug",
+            "post_count": 0
         })
 
 
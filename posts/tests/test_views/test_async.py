@@ -0,0 +1,127 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from posts.tests.factories import CategoryFactory, CommentFactory, PostFactory, TagFactory
+from profiles.tests.factories import UserFactory
+
+
+class AsyncReadViewsTestCase(TestCase):
+    """The async endpoints answer exactly like their DRF counterparts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = UserFactory().profile
+        categories = CategoryFactory.create_batch(2)
+        tags = TagFactory.create_batch(3)
+        cls.posts = PostFactory.create_batch(3, author=author, categories=categories, tags=tags[:2])
+        PostFactory(author=author, title="Gardening", tags=tags[2:])
+        CommentFactory.create_batch(3, post=cls.posts[0], author=author)
+        CommentFactory(post=cls.posts[1], author=author)
+
+    def assertSameResponse(self, sync_url, async_url):
+        expected = self.client.get(sync_url, HTTP_ACCEPT='application/json')
+        response = self.client.get(async_url)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content.decode().replace('/api/async/', '/api/')), expected.json())
+        return response
+
+    def test_posts_list(self):
+        for query in ('', '?limit=2&offset=1', '?pagination=cursor&limit=2', '?q=gardening',
+                      '?ordering=-comment_count', f'?tags={self.posts[0].tags.first().pk}',
+                      '?fields=id,title,tags&expand=', '?omit=content&expand=author', '?fields=nope'):
+            with self.subTest(query=query):
+                self.assertSameResponse(f'{reverse("api:posts:posts-list")}{query}',
+                                        f'{reverse("api:async:posts-list")}{query}')
+
+    def test_posts_list_follows_cursor_links(self):
+        first = self.client.get(f'{reverse("api:async:posts-list")}?pagination=cursor&limit=2').json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertNotIn(second['results'][0]['id'], [post['id'] for post in first['results']])
+
+    def test_posts_retrieve(self):
+        for query in ('', '?fields=title,author&expand='):
+            with self.subTest(query=query):
+                self.assertSameResponse(f'{reverse("api:posts:posts-detail", args=[self.posts[0].pk])}{query}',
+                                        f'{reverse("api:async:posts-detail", args=[self.posts[0].pk])}{query}')
+
+    def test_posts_retrieve_not_found(self):
+        response = self.assertSameResponse(reverse("api:posts:posts-detail", args=[1000]),
+                                           reverse("api:async:posts-detail", args=[1000]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_comments(self):
+        self.assertSameResponse(f'{reverse("api:posts:posts-comments", args=[self.posts[0].pk])}?limit=2',
+                                f'{reverse("api:async:posts-comments", args=[self.posts[0].pk])}?limit=2')
+        self.assertSameResponse(reverse("api:posts:posts-comments", args=[1000]),
+                                reverse("api:async:posts-comments", args=[1000]))
+
+    def test_comments_list(self):
+        for query in ('', f'?post={self.posts[1].pk}', '?cursor=invalid', '?fields=id,author&expand='):
+            with self.subTest(query=query):
+                self.assertSameResponse(f'{reverse("api:comments:comments-list")}{query}',
+                                        f'{reverse("api:async:comments-list")}{query}')
+
+    def test_taxonomy_lists(self):
+        for sync_name, async_name in (("api:categories:listing", "api:async:categories-listing"),
+                                      ("api:tags:listing", "api:async:tags-listing")):
+            with self.subTest(view=async_name):
+                self.assertSameResponse(f'{reverse(sync_name)}?ordering=-post_count',
+                                        f'{reverse(async_name)}?ordering=-post_count')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_it_answers_not_modified(self):
+        url = reverse("api:async:posts-detail", args=[self.posts[0].pk])
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_it_is_read_only(self):
+        self.assertEqual(self.client.post(reverse("api:async:posts-list"), {}).status_code, 405)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AsyncResponseCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = PostFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("api:async:posts-detail", args=[self.post.pk])
+
+    def test_anonymous_retrieve_is_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):  # The content version.
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['id'], self.post.pk)
+
+    def test_the_cache_is_never_called_on_the_event_loop(self):
+        def off_the_loop(method):
+            def call(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(f'blocking cache.{method.__name__}() on the event loop')
+            return call
+
+        with mock.patch.multiple(cache, **{name: off_the_loop(getattr(cache, name)) for name in ('get', 'set', 'add')}):
+            for url in (self.url, reverse("api:async:posts-list"), reverse("api:async:comments-list"),
+                        reverse("api:async:posts-comments", args=[self.post.pk])):
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_requests_with_credentials_bypass_the_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, HTTP_AUTHORIZATION="Bearer token")
+        self.assertGreater(len(queries), 0)
@@ -1,6 +1,8 @@
 import inspect
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -23,7 +25,7 @@ class CommentViewSetStructureTestCase(TestCase):
     def test_queryset_is_correct_Comment_queryset(self):
         self.assertQuerysetEqual(
             CommentViewSet.queryset,
-            Comment.objects.prefetch_related('author', 'author__user'))
+            Comment.objects.select_related('author__user'))
 
     def test_it_has_list_attribute(self):
         self.assertTrue(hasattr(CommentViewSet, 'list'))
@@ -72,27 +74,101 @@ class CommentViewSetListTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEquals(response.status_code, status.HTTP_200_OK)
 
+    def test_it_returns_paginated_response(self):
+        response = self.client.get(f'{self.url}?limit=4')
+        self.assertEquals(len(response.data['results']), 4)
+        self.assertNotIn('count', response.data)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_next_links_walk_all_comments(self):
+        url, ids = f'{self.url}?limit=3', []
+        while url:
+            response = self.client.get(url)
+            ids.extend(comment['id'] for comment in response.data['results'])
+            url = response.data['next']
+        self.assertListEqual(ids, list(Comment.objects.order_by('created_at', 'id').values_list('id', flat=True)))
+
     def test_it_return_no_data_with_unavailable_search_is_not_found(self):
         response = self.client.get(f'{self.url}?q=dummy-text')
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_it_returns_search_result_correctly(self):
         comment = CommentFactory(content="CommentContent")
         response = self.client.get(f'{self.url}?q=CommentContent')
-        self.assertEquals(comment.pk, response.data[0]['id'])
+        self.assertEquals(comment.pk, response.data['results'][0]['id'])
 
     def test_it_filters_by_author(self):
         response = self.client.get(f'{self.url}?author=2')
         expected_comments = list(Comment.objects.filter(author=2).values_list('id', flat=True))
-        response_comments = [comment['id'] for comment in response.data]
+        response_comments = [comment['id'] for comment in response.data['results']]
         self.assertListEqual(expected_comments, response_comments)
 
     def test_it_filters_by_post(self):
         response = self.client.get(f'{self.url}?post=2')
         expected_comments = list(Comment.objects.filter(post=2).values_list('id', flat=True))
-        response_comments = [comment['id'] for comment in response.data]
+        response_comments = [comment['id'] for comment in response.data['results']]
+        self.assertListEqual(expected_comments, response_comments)
+
+
+class CommentViewSetFieldsetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.comments = CommentFactory.create_batch(3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:comments:comments-list")
+
+    def test_it_returns_only_the_requested_fields(self):
+        response = self.client.get(f'{self.url}?fields=id,content')
+        self.assertListEqual(response.data['results'],
+                             [{'id': comment.pk, 'content': comment.content} for comment in self.comments])
+
+    def test_it_returns_the_author_as_id_unless_expanded(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?omit=content&expand=')
+        self.assertListEqual([comment['author'] for comment in response.data['results']],
+                             [comment.author_id for comment in self.comments])
+        self.assertFalse(any('profiles_profile' in query['sql'] for query in queries.captured_queries))
+
+    def test_it_returns_400_for_unknown_fields(self):
+        response = self.client.get(f'{self.url}?omit=title&expand=post')
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertSetEqual(set(response.data), {'omit', 'expand'})
+
+    def test_it_applies_to_post_comments(self):
+        comment = self.comments[0]
+        response = self.client.get(f'{reverse("api:posts:posts-comments", args=[comment.post_id])}?fields=id,post')
+        self.assertListEqual(response.data['results'], [{'id': comment.pk, 'post': comment.post_id}])
+
+
+class PostCommentsListTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = PostFactory()
+        CommentFactory.create_batch(5, post=cls.post, author=cls.post.author)
+        CommentFactory.create_batch(3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:posts:posts-comments", args=[self.post.pk])
+
+    def test_it_returns_404_if_post_does_not_exist(self):
+        response = self.client.get(reverse("api:posts:posts-comments", args=[1000]))
+        self.assertEquals(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_it_returns_only_the_post_comments(self):
+        response = self.client.get(self.url)
+        expected_comments = list(Comment.objects.filter(post=self.post).values_list('id', flat=True))
+        response_comments = [comment['id'] for comment in response.data['results']]
         self.assertListEqual(expected_comments, response_comments)
 
+    def test_it_paginates_by_cursor(self):
+        first = self.client.get(f'{self.url}?limit=2')
+        second = self.client.get(first.data['next'])
+        self.assertEquals(len(second.data['results']), 2)
+        self.assertNotEqual(first.data['results'][0]['id'], second.data['results'][0]['id'])
+
 
 class PostViewSetCreateTestCase(TestCase):
     @classmethod
@@ -1,6 +1,8 @@
 import inspect
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -24,7 +26,7 @@ class PostViewSetStructureTestCase(TestCase):
     def test_queryset_is_correct_Post_queryset(self):
         self.assertQuerysetEqual(
             PostViewSet.queryset,
-            Post.objects.prefetch_related('author', 'author__user', 'categories', 'tags'))
+            Post.objects.select_related('author__user').prefetch_related('categories', 'tags'))
 
     def test_it_has_list_attribute(self):
         self.assertTrue(hasattr(PostViewSet, 'list'))
@@ -70,6 +72,11 @@ class PostViewSetStructureTestCase(TestCase):
         actual_signature = inspect.getfullargspec(PostViewSet.update)[0]
         self.assertEquals(actual_signature, expected_signature)
 
+    def test_partial_update_signature(self):
+        expected_signature = ['self', 'request', 'pk']
+        actual_signature = inspect.getfullargspec(PostViewSet.partial_update)[0]
+        self.assertEquals(actual_signature, expected_signature)
+
     def test_it_has_destroy_attribute(self):
         self.assertTrue(hasattr(PostViewSet, 'destroy'))
 
@@ -135,6 +142,65 @@ class PostViewSetListTestCase(TestCase):
         response_posts = [post['id'] for post in response.data['results']]
         self.assertListEqual(expected_posts, response_posts)
 
+    def test_it_caps_the_limit(self):
+        PostFactory.create_batch(60, author=UserFactory().profile)
+        response = self.client.get(f"{self.url}?limit=1000")
+        self.assertEquals(len(response.data['results']), 100)
+
+
+class PostViewSetCursorListTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = TagFactory()
+        author = UserFactory().profile
+        PostFactory.create_batch(25, author=author)
+        PostFactory.create_batch(5, tags=[cls.tag], author=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:posts:posts-list")
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEquals(response.status_code, status.HTTP_200_OK)
+            ids.extend(post['id'] for post in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_it_returns_cursor_links_without_count(self):
+        response = self.client.get(f"{self.url}?pagination=cursor")
+        self.assertNotIn('count', response.data)
+        self.assertEquals(len(response.data['results']), 20)
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_it_walks_all_posts_in_created_at_id_order(self):
+        expected_ids = list(Post.objects.order_by('created_at', 'id').values_list('id', flat=True))
+        self.assertListEqual(self.walk(f"{self.url}?pagination=cursor&limit=7"), expected_ids)
+
+    def test_previous_link_returns_the_previous_page(self):
+        first = self.client.get(f"{self.url}?pagination=cursor&limit=10")
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+        self.assertListEqual(
+            [post['id'] for post in previous.data['results']],
+            [post['id'] for post in first.data['results']])
+
+    def test_it_works_with_filters(self):
+        expected_ids = list(Post.objects.filter(tags=self.tag).values_list('id', flat=True))
+        self.assertListEqual(self.walk(f"{self.url}?pagination=cursor&limit=2&tags={self.tag.pk}"), expected_ids)
+
+    def test_it_caps_the_limit(self):
+        PostFactory.create_batch(80, author=UserFactory().profile)
+        response = self.client.get(f"{self.url}?pagination=cursor&limit=1000")
+        self.assertEquals(len(response.data['results']), 100)
+
+    def test_it_returns_404_for_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?pagination=cursor&cursor=invalid")
+        self.assertEquals(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class PostViewSetCreateTestCase(TestCase):
     @classmethod
@@ -166,6 +232,15 @@ class PostViewSetCreateTestCase(TestCase):
         response = self.client.post(self.url, data=invalid_data)
         self.assertEquals(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+    def test_it_returns_422_with_unknown_categories_or_tags(self):
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        for field in ('categories', 'tags'):
+            with self.subTest(field=field):
+                response = self.client.post(self.url, data={**self.data, field: [self.data[field][0], 0]})
+                self.assertEquals(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+                self.assertEqual(response.data[field], ['Invalid pk "0" - object does not exist.'])
+        self.assertFalse(Post.objects.exists())
+
     def test_it_returns_201_with_valid_data(self):
         self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
         response = self.client.post(self.url, data=self.data)
@@ -185,6 +260,68 @@ class PostViewSetCreateTestCase(TestCase):
         self.assertEquals(response.data['author']['id'], self.user.profile.id)
 
 
+class PostViewSetFieldsetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = CategoryFactory.create_batch(2)
+        cls.tags = TagFactory.create_batch(2)
+        cls.posts = PostFactory.create_batch(3, tags=cls.tags, categories=cls.categories)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:posts:posts-list")
+
+    def test_it_returns_only_the_requested_fields(self):
+        response = self.client.get(f'{self.url}?fields=id,title')
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.data['results'], [{'id': post.pk, 'title': post.title} for post in self.posts])
+
+    def test_it_leaves_out_omitted_fields(self):
+        response = self.client.get(f'{self.url}?omit=content,author')
+        self.assertListEqual(list(response.data['results'][0]),
+                             ['id', 'title', 'categories', 'tags', 'comment_count', 'created_at', 'updated_at'])
+
+    def test_it_returns_unexpanded_relations_as_ids(self):
+        response = self.client.get(f'{self.url}?fields=author,categories,tags&expand=author')
+        post = response.data['results'][0]
+        self.assertEquals(post['author']['id'], self.posts[0].author_id)
+        self.assertListEqual(post['categories'], [category.pk for category in self.categories])
+        self.assertListEqual(post['tags'], [tag.pk for tag in self.tags])
+
+    def test_it_expands_every_relation_by_default(self):
+        response = self.client.get(f'{self.url}?fields=id,author,tags')
+        expected = PostSerializer(Post.objects.get(pk=self.posts[0].pk)).data
+        self.assertDictEqual(response.data['results'][0],
+                             {'id': expected['id'], 'author': expected['author'], 'tags': expected['tags']})
+
+    def test_it_does_not_load_unrequested_columns_and_relations(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{self.url}?fields=id,title,tags&expand=')
+        page = queries.captured_queries[-2]['sql']
+        self.assertNotIn('"content"', page)
+        self.assertNotIn('profiles_profile', page)
+        self.assertFalse(any('posts_category' in query['sql'] for query in queries.captured_queries))
+        self.assertNotIn('"posts_tag"."name"', queries.captured_queries[-1]['sql'])
+
+    def test_it_returns_400_for_unknown_fields(self):
+        response = self.client.get(f'{self.url}?fields=id,password&expand=title')
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', str(response.data['fields']))
+        self.assertIn('title', str(response.data['expand']))
+
+    def test_it_pages_by_cursor_with_sparse_fields(self):
+        first = self.client.get(f'{self.url}?pagination=cursor&limit=2&fields=title')
+        second = self.client.get(first.data['next'])
+        self.assertListEqual(first.data['results'] + second.data['results'],
+                             [{'title': post.title} for post in self.posts])
+
+    def test_it_applies_to_retrieve(self):
+        response = self.client.get(
+            f'{reverse("api:posts:posts-detail", args=[self.posts[0].pk])}?fields=title,categories&expand=')
+        self.assertDictEqual(response.data, {'title': self.posts[0].title,
+                                             'categories': [category.pk for category in self.categories]})
+
+
 class PostViewSetRetrieveTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -210,7 +347,7 @@ class PostViewSetRetrieveTestCase(TestCase):
 
     def test_it_returns_correct_serializer_data(self):
         response = self.client.get(self.url)
-        post_serialized = PostSerializer(self.post).data
+        post_serialized = PostSerializer(Post.objects.get(pk=self.post.pk)).data
         self.assertDictEqual(response.data, post_serialized)
 
 
@@ -272,6 +409,75 @@ class PostViewSetUpdateTestCase(TestCase):
         self.assertListEqual([tag['id'] for tag in response.data['tags']], self.data['tags'])
 
 
+class PostViewSetPartialUpdateTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = CategoryFactory.create_batch(3)
+        cls.tags = TagFactory.create_batch(2)
+        cls.user = UserFactory()
+        cls.post = PostFactory(tags=cls.tags, categories=cls.categories[:2], author=cls.user.profile)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:posts:posts-detail", args=[self.post.pk])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(create_token(self.user).access_token)}")
+
+    def patch(self, data, url=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url or self.url, data=data, format='json')
+        return response, [query['sql'] for query in queries]
+
+    def test_it_returns_401_if_user_is_not_authenticated(self):
+        self.client.credentials()
+        response = self.client.patch(self.url, data={"title": "Title"})
+        self.assertEquals(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_it_changes_only_the_fields_sent(self):
+        response, queries = self.patch({"title": "New title"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], "New title")
+        self.assertEqual(response.data['content'], self.post.content)
+        self.assertListEqual([cat['id'] for cat in response.data['categories']], [cat.id for cat in self.categories[:2]])
+        updates = [sql for sql in queries if sql.startswith('UPDATE "posts_post"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"content"', updates[0])
+        self.assertFalse([sql for sql in queries if sql.startswith(('INSERT', 'DELETE'))])
+
+    def test_it_writes_nothing_without_changes(self):
+        response, queries = self.patch({"title": self.post.title, "tags": [tag.id for tag in self.tags]})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([sql for sql in queries if sql.startswith(('UPDATE', 'INSERT', 'DELETE'))])
+
+    def test_it_replaces_relations_that_are_sent_and_differ(self):
+        response, queries = self.patch({"categories": [self.categories[2].id]})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual([cat['id'] for cat in response.data['categories']], [self.categories[2].id])
+        self.assertListEqual([tag['id'] for tag in response.data['tags']], [tag.id for tag in self.tags])
+        self.assertFalse([sql for sql in queries if sql.startswith(('INSERT', 'DELETE')) and 'posts_post_tags' in sql])
+        self.assertEqual(Post.objects.get(pk=self.post.pk).title, self.post.title)
+
+    def test_it_returns_422_with_invalid_data(self):
+        response, queries = self.patch({"title": ""})
+        self.assertEquals(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_it_returns_403_without_loading_the_post(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(create_token(UserFactory()).access_token)}")
+
+        response, queries = self.patch({"title": "New title"})
+
+        self.assertEquals(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse([sql for sql in queries if 'posts_post_categories' in sql or 'posts_post_tags' in sql])
+        self.assertNotEqual(Post.objects.get(pk=self.post.pk).title, "New title")
+
+    def test_it_returns_404_if_post_does_not_exist(self):
+        response, queries = self.patch({"title": "New title"}, url=reverse("api:posts:posts-detail", args=[1000]))
+        self.assertEquals(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class PostViewSetDestroyTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
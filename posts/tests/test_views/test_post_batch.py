@@ -0,0 +1,141 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from profiles.models import Profile
+from profiles.tests.factories import UserFactory
+from . import create_token
+from ..factories import CategoryFactory, PostFactory, TagFactory
+from ...models import Category, Post, Tag
+
+
+class PostViewSetBatchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = CategoryFactory.create_batch(3)
+        cls.tags = TagFactory.create_batch(3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:posts:posts-batch")
+        self.user = UserFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_token(self.user).access_token}")
+        self.post = PostFactory(author=self.user.profile, categories=self.categories[:2], tags=self.tags[:1])
+
+    def create(self, title='Batch post', categories=None, tags=None):
+        return {'op': 'create', 'data': {
+            'title': title, 'content': 'Content',
+            'categories': [category.pk for category in categories or self.categories[:1]],
+            'tags': [tag.pk for tag in tags or self.tags[:1]]}}
+
+    def update(self, post, **data):
+        return {'op': 'update', 'id': post.pk, 'data': {
+            'title': post.title, 'content': post.content, 'categories': [], 'tags': [], **data}}
+
+    def batch(self, *operations, mode='atomic'):
+        return self.client.post(self.url, {'mode': mode, 'operations': list(operations)}, format='json')
+
+    def post_counts(self, objects):
+        return [type(obj).objects.get(pk=obj.pk).post_count for obj in objects]
+
+    def test_it_returns_401_if_user_is_not_authenticated(self):
+        self.client.credentials()
+        self.assertEqual(self.batch(self.create()).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_it_creates_and_updates_posts(self):
+        response = self.batch(self.create('First'), self.update(self.post, title='Changed'), self.create('Second'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertListEqual([result['status'] for result in results], [201, 200, 201])
+        self.assertListEqual([result['data']['title'] for result in results], ['First', 'Changed', 'Second'])
+        self.assertListEqual([category['id'] for category in results[0]['data']['categories']],
+                             [self.categories[0].pk])
+        self.assertEqual(Post.objects.get(pk=self.post.pk).title, 'Changed')
+        self.assertEqual(Post.objects.filter(author=self.user.profile).count(), 3)
+
+    def test_it_replaces_only_the_links_that_differ(self):
+        response = self.batch(self.update(self.post, categories=[self.categories[1].pk, self.categories[2].pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(list(self.post.categories.values_list('pk', flat=True)),
+                             [self.categories[1].pk, self.categories[2].pk])
+        self.assertListEqual(list(self.post.tags.values_list('pk', flat=True)), [self.tags[0].pk])
+        self.assertGreater(Post.objects.get(pk=self.post.pk).updated_at, self.post.updated_at)
+
+    def test_it_keeps_the_counters(self):
+        self.batch(self.create(categories=self.categories, tags=self.tags[1:]), self.create(),
+                   self.update(self.post, categories=[self.categories[2].pk]))
+
+        self.assertListEqual(self.post_counts(self.categories), [2, 1, 2])
+        self.assertListEqual(self.post_counts(self.tags), [2, 1, 1])
+        self.assertEqual(Profile.objects.get(pk=self.user.profile.pk).post_count, 3)
+        stdout = StringIO()
+        call_command('reconcile_counters', stdout=stdout)
+        self.assertTrue(all(line.endswith('fixed 0') for line in stdout.getvalue().splitlines()), stdout.getvalue())
+
+    def test_it_reports_every_failure(self):
+        other = PostFactory()
+        response = self.batch(self.create(), self.update(other), {'op': 'update', 'id': 0, 'data': {}},
+                              {'op': 'create', 'data': {'title': 'No content', 'categories': [0]}},
+                              mode='best_effort')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertListEqual([result['status'] for result in results], [201, 403, 404, 422])
+        self.assertIn('content', results[3]['errors'])
+        self.assertEqual(results[3]['errors']['categories'], ['Invalid pk "0" - object does not exist.'])
+        self.assertEqual(Post.objects.filter(author=self.user.profile).count(), 2)
+
+    def test_it_rejects_updating_a_post_twice(self):
+        response = self.batch(self.update(self.post, title='First', tags=[self.tags[1].pk]), self.create(),
+                              self.update(self.post, title='Second', tags=[self.tags[2].pk]), mode='best_effort')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertListEqual([result['status'] for result in results], [400, 201, 400])
+        self.assertIn('id', results[0]['errors'])
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.title, self.post.title)
+        self.assertListEqual(list(post.tags.all()), self.tags[:1])
+
+    def test_atomic_mode_writes_nothing_if_any_operation_fails(self):
+        response = self.batch(self.create(), self.update(self.post, title='Changed'), self.update(PostFactory()))
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertListEqual([result['status'] for result in response.data['results']], [424, 424, 403])
+        self.assertEqual(Post.objects.filter(author=self.user.profile).count(), 1)
+        self.assertNotEqual(Post.objects.get(pk=self.post.pk).title, 'Changed')
+
+    def test_it_rejects_malformed_batches(self):
+        for body in ({'operations': []}, {'operations': [{'op': 'delete', 'data': {}}]},
+                     {'operations': [{'op': 'update', 'data': {}}]}, {'mode': 'some', 'operations': [self.create()]}):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body, format='json')
+                self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    @override_settings(POST_BATCH_MAX_OPERATIONS=2)
+    def test_it_limits_the_batch_size(self):
+        response = self.batch(self.create(), self.create(), self.create())
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn('operations', response.data)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        def run(count):
+            posts = PostFactory.create_batch(count, author=self.user.profile, categories=self.categories[:1])
+            operations = [self.create(f'Post {index}', categories=self.categories[1:], tags=self.tags[1:])
+                          for index in range(count)]
+            operations += [self.update(post, title='Changed', categories=[self.categories[2].pk]) for post in posts]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.batch(*operations)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            return len(queries)
+
+        self.assertEqual(run(2), run(20))
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from posts.views.view_async import (AsyncCategoriesListView, AsyncCommentListView, AsyncPostCommentsView,
+                                    AsyncPostDetailView, AsyncPostListView, AsyncTagsListView)
+
+app_name = 'async'
+
+urlpatterns = [
+    path('categories/', AsyncCategoriesListView.as_view(), name='categories-listing'),
+    path('tags/', AsyncTagsListView.as_view(), name='tags-listing'),
+    path('posts/', AsyncPostListView.as_view(), name='posts-list'),
+    path('posts/<int:pk>/', AsyncPostDetailView.as_view(), name='posts-detail'),
+    path('posts/<int:pk>/comments/', AsyncPostCommentsView.as_view(), name='posts-comments'),
+    path('comments/', AsyncCommentListView.as_view(), name='comments-list'),
+]
@@ -7,13 +7,18 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from blog.fieldsets import FIELDSET_PARAMETERS, Fieldset
+from posts.conditional import conditional_response, make_etag
 from posts.filters import CommentFilterSet
 from posts.models import Comment
+from posts.pagination import KeysetPaginator, Page
 from posts.serializers import CommentSerializer
 
 
 class CommentViewSet(ViewSet):
-    queryset = Comment.objects.prefetch_related('author', 'author__user')
+    queryset = Comment.objects.select_related('author__user')
+    # What the ETag of a page of comments is built from, besides the content version.
+    watermark_fields = ('id',)
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of all comments",
@@ -36,13 +41,37 @@ class CommentViewSet(ViewSet):
                 description="Filter comments by post IDs (comma-separated)",
                 type=openapi.TYPE_STRING,
             ),
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                description="Limit the comments results (max 100)",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                name='cursor',
+                in_=openapi.IN_QUERY,
+                description="Opaque cursor taken from the `next`/`previous` links",
+                type=openapi.TYPE_STRING,
+            ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={200: CommentSerializer(many=True)},
     )
     def list(self, request):
-        queryset = CommentFilterSet(request.GET, self.queryset).qs
-        serializer = CommentSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        filterset = CommentFilterSet(request.GET, self.queryset)
+        fieldset = Fieldset.from_request(CommentSerializer, request)
+
+        paginator = KeysetPaginator()
+        page = Page(paginator, lambda: fieldset.apply(filterset.qs, keep=paginator.columns), request)
+
+        def get_validators(content):
+            return make_etag(request, content, *page.watermark(*self.watermark_fields)), content.modified
+
+        def render():
+            return paginator.get_paginated_response(
+                CommentSerializer.represent(page.objects, many=True, fieldset=fieldset)).data
+
+        return conditional_response(request, get_validators, render)
 
     @swagger_auto_schema(
         operation_description="Create a new comment",
@@ -77,7 +106,7 @@ class CommentViewSet(ViewSet):
 
         instance = get_object_or_404(self.queryset, pk=pk)
         
-        if instance.author != request.user.profile:
+        if instance.author_id != request.user.profile.pk:
             raise PermissionDenied(_("You do not have permission to delete this comment"))
 
         instance.delete()
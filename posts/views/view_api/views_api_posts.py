@@ -1,24 +1,33 @@
+from django.http import Http404
 from django.utils.translation import gettext as _
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from posts.filters import PostFilterSet
+from blog.fieldsets import FIELDSET_PARAMETERS, Fieldset
+from posts.batch import PostBatch
+from posts.conditional import conditional_response, make_etag
+from posts.filters import CommentFilterSet, PostFilterSet
 from posts.models import Post
-from posts.serializers import PostSerializer
-
-
-class Paginator(LimitOffsetPagination):
-    default_limit = 20
+from posts.pagination import KeysetPaginator, Page, Paginator
+from posts.serializers import CommentSerializer, PostBatchSerializer, PostSerializer
+from .views_api_comments import CommentViewSet
 
 
 class PostViewSet(ViewSet):
-    queryset = Post.objects.prefetch_related('author', 'author__user', 'categories', 'tags')
+    queryset = Post.objects.select_related('author__user').prefetch_related('categories', 'tags')
+    # What the ETag of a page of posts is built from, besides the content version.
+    watermark_fields = ('id', 'updated_at', 'comment_count')
+
+    def get_paginator(self, request):
+        if request.query_params.get('pagination') == 'cursor':
+            return KeysetPaginator()
+        return Paginator()
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of all posts",
@@ -44,7 +53,7 @@ class PostViewSet(ViewSet):
             openapi.Parameter(
                 name='limit',
                 in_=openapi.IN_QUERY,
-                description="Limit the posts results",
+                description="Limit the posts results (max 100)",
                 type=openapi.TYPE_INTEGER,
             ),
             openapi.Parameter(
@@ -53,14 +62,44 @@ class PostViewSet(ViewSet):
                 description="The starting offset of results",
                 type=openapi.TYPE_INTEGER,
             ),
+            openapi.Parameter(
+                name='ordering',
+                in_=openapi.IN_QUERY,
+                description="Order offset pages by `created_at`, `updated_at` or `comment_count` (prefix `-` to reverse)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name='pagination',
+                in_=openapi.IN_QUERY,
+                description="Set to `cursor` to page by cursor instead of offset (no count is returned)",
+                type=openapi.TYPE_STRING,
+                enum=['offset', 'cursor'],
+            ),
+            openapi.Parameter(
+                name='cursor',
+                in_=openapi.IN_QUERY,
+                description="Opaque cursor taken from the `next`/`previous` links in cursor mode",
+                type=openapi.TYPE_STRING,
+            ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={200: PostSerializer(many=True)})
     def list(self, request):
-        queryset = PostFilterSet(request.GET, self.queryset).qs
-        paginator = Paginator()
-        objects = paginator.paginate_queryset(queryset, request)
-        serializer = PostSerializer(objects, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        filterset = PostFilterSet(request.GET, self.queryset)
+        fieldset = Fieldset.from_request(PostSerializer, request)
+
+        paginator = self.get_paginator(request)
+        columns = (*paginator.columns, *self.watermark_fields)
+        page = Page(paginator, lambda: fieldset.apply(filterset.qs, keep=columns), request)
+
+        def get_validators(content):
+            return make_etag(request, content, *page.watermark(*self.watermark_fields)), content.modified
+
+        def render():
+            return paginator.get_paginated_response(
+                PostSerializer.represent(page.objects, many=True, fieldset=fieldset)).data
+
+        return conditional_response(request, get_validators, render, cache_name='posts:list')
 
     @swagger_auto_schema(
         operation_description="Create a new post",
@@ -79,13 +118,81 @@ class PostViewSet(ViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+    @swagger_auto_schema(
+        operation_description="Create and update many posts in one request. Every operation gets a result with its "
+                              "own status, in order. In `atomic` mode (the default) nothing is written unless all "
+                              "operations are valid; in `best_effort` mode the valid ones are written.",
+        request_body=PostBatchSerializer,
+        responses={
+            200: "Every operation was applied",
+            207: "Some operations failed (best_effort)",
+            401: "Unauthorized",
+            422: "Malformed request, or some operations failed (atomic)",
+        })
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated("User is not authenticated")
+        serializer = PostBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        atomic = serializer.validated_data['mode'] == 'atomic'
+        results = PostBatch(request, serializer.validated_data['operations'], atomic=atomic,
+                            queryset=self.queryset).run()
+        if all(result['status'] < 400 for result in results):
+            response_status = status.HTTP_200_OK
+        elif atomic:
+            response_status = status.HTTP_422_UNPROCESSABLE_ENTITY
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=response_status)
+
     @swagger_auto_schema(
         operation_description="Retrieve a post by its ID",
+        manual_parameters=FIELDSET_PARAMETERS,
         responses={200: PostSerializer, 404: "Not Found"})
     def retrieve(self, request, pk):
-        instance = get_object_or_404(self.queryset, pk=pk)
-        serializer = PostSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fieldset = Fieldset.from_request(PostSerializer, request)
+
+        def get_validators(content):
+            watermark = get_object_or_404(Post.objects.values(*self.watermark_fields), pk=pk)
+            return make_etag(request, content, *watermark.values()), max(watermark['updated_at'], content.modified)
+
+        def render():
+            return PostSerializer.represent(get_object_or_404(fieldset.apply(self.queryset), pk=pk), fieldset=fieldset)
+
+        return conditional_response(request, get_validators, render, cache_name='posts:retrieve')
+
+    def get_owned_post(self, request, pk, message, queryset=None):
+        """
+        The post from ``queryset`` (by default with its author, categories and
+        tags) if it belongs to the requesting user. The ownership is part of
+        the lookup, so a post of someone else costs one query for the owner's
+        ``author_id`` condition and one ``EXISTS`` telling 403 from 404, and
+        none of the prefetches.
+        """
+        if queryset is None:
+            queryset = self.queryset
+        try:
+            return queryset.get(pk=pk, author_id=request.user.profile.pk)
+        except Post.DoesNotExist:
+            pass
+        if Post.objects.filter(pk=pk).exists():
+            raise PermissionDenied(message)
+        raise Http404
+
+    def update_post(self, request, pk, partial):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated("User is not authenticated")
+
+        instance = self.get_owned_post(request, pk, _("You do not have permission to edit this post"))
+
+        serializer = PostSerializer(instance, data=request.data, partial=partial, context={"request": request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
     @swagger_auto_schema(
         operation_description="Update a post by its ID",
@@ -98,19 +205,21 @@ class PostViewSet(ViewSet):
             422: "Unprocessable Entity",
         })
     def update(self, request, pk):
-        if not request.user.is_authenticated:
-            raise NotAuthenticated("User is not authenticated")
-
-        instance = get_object_or_404(self.queryset, pk=pk)
-
-        if instance.author != request.user.profile:
-            raise PermissionDenied(_("You do not have permission to edit this post"))
+        return self.update_post(request, pk, partial=False)
 
-        serializer = PostSerializer(instance, data=request.data, context={"request": request})
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    @swagger_auto_schema(
+        operation_description="Update some fields of a post by its ID. Only the columns that change are written, "
+                              "and categories and tags only when they are sent and differ.",
+        request_body=PostSerializer,
+        responses={
+            200: PostSerializer,
+            401: "Unauthorized",
+            403: "Forbidden",
+            404: "Not Found",
+            422: "Unprocessable Entity",
+        })
+    def partial_update(self, request, pk):
+        return self.update_post(request, pk, partial=True)
 
     @swagger_auto_schema(
         operation_description="Delete a post by its ID",
@@ -124,10 +233,50 @@ class PostViewSet(ViewSet):
         if not request.user.is_authenticated:
             raise NotAuthenticated("User is not authenticated")
 
-        instance = get_object_or_404(self.queryset, pk=pk)
-
-        if instance.author != request.user.profile:
-            raise PermissionDenied(_("You do not have permission to delete this post"))
-
+        # Deleting reads nothing but the keys the delete signals use.
+        instance = self.get_owned_post(request, pk, _("You do not have permission to delete this post"),
+                                       Post.objects.select_related('author').only('id', 'author__user_id'))
         instance.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        operation_description="Retrieve a page of a post's comments, oldest first",
+        manual_parameters=[
+            openapi.Parameter(
+                name='q',
+                in_=openapi.IN_QUERY,
+                description="Search term for filtering comments by content",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                description="Limit the comments results (max 100)",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                name='cursor',
+                in_=openapi.IN_QUERY,
+                description="Opaque cursor taken from the `next`/`previous` links",
+                type=openapi.TYPE_STRING,
+            ),
+            *FIELDSET_PARAMETERS,
+        ],
+        responses={200: CommentSerializer(many=True), 404: "Not Found"})
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk):
+        post = get_object_or_404(Post.objects.only('id'), pk=pk)
+        filterset = CommentFilterSet(request.GET, CommentViewSet.queryset.filter(post=post))
+        fieldset = Fieldset.from_request(CommentSerializer, request)
+
+        paginator = KeysetPaginator()
+        page = Page(paginator, lambda: fieldset.apply(filterset.qs, keep=paginator.columns), request)
+
+        def get_validators(content):
+            return make_etag(request, content, *page.watermark(*CommentViewSet.watermark_fields)), content.modified
+
+        def render():
+            return paginator.get_paginated_response(
+                CommentSerializer.represent(page.objects, many=True, fieldset=fieldset)).data
+
+        return conditional_response(request, get_validators, render)
@@ -1,7 +1,9 @@
+from django.db.models import Count, Max, Sum
 from rest_framework import filters
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import AllowAny
 
+from posts.conditional import conditional_response, make_etag
 from posts.models import Tag
 from posts.serializers import TagSerializer
 
@@ -10,5 +12,18 @@ class TagsListAPIView(ListAPIView):
     permission_classes = [AllowAny]
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ('id', 'name', 'slug')
+    ordering_fields = ('id', 'name', 'post_count')
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        def get_validators(content):
+            watermark = queryset.aggregate(count=Count('id'), last_id=Max('id'), posts=Sum('post_count'))
+            return make_etag(request, content, *watermark.values()), None
+
+        def render():
+            return self.get_serializer(queryset, many=True).data
+
+        return conditional_response(request, get_validators, render)
@@ -0,0 +1,13 @@
+__all__ = (
+    'AsyncCategoriesListView',
+    'AsyncTagsListView',
+    'AsyncPostListView',
+    'AsyncPostDetailView',
+    'AsyncPostCommentsView',
+    'AsyncCommentListView',
+)
+
+from .views_async_categories import AsyncCategoriesListView
+from .views_async_comments import AsyncCommentListView
+from .views_async_posts import AsyncPostCommentsView, AsyncPostDetailView, AsyncPostListView
+from .views_async_tags import AsyncTagsListView
@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+
+class AsyncReadView(View):
+    """
+    Base for the async (ASGI) read endpoints. They answer like their DRF
+    counterparts but skip DRF's synchronous request cycle: there is no
+    authentication, throttling or content negotiation, and the response is
+    always JSON.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return JsonResponse({'detail': str(exc)}, status=404)
+        except APIException as exc:
+            # Like DRF's exception handler, validation errors are returned as they are.
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return JsonResponse(data, status=exc.status_code, safe=False)
+
+    @staticmethod
+    def wrap(request):
+        """
+        DRF ``Request`` around ``request`` for the paginators and filter backends,
+        which read ``query_params``; nothing on it triggers authentication.
+        """
+        return Request(request)
+
+    @staticmethod
+    async def filter(filterset):
+        # Validating the model choice filters queries the database synchronously.
+        return await sync_to_async(lambda: filterset.qs)()
@@ -0,0 +1,27 @@
+from blog.fieldsets import Fieldset
+from posts.conditional import aconditional_response, make_etag
+from posts.filters import CommentFilterSet
+from posts.pagination import KeysetPaginator, Page
+from posts.serializers import CommentSerializer
+from posts.views.view_api import CommentViewSet
+from .views_async_base import AsyncReadView
+
+
+class AsyncCommentListView(AsyncReadView):
+    async def get(self, request):
+        drf_request = self.wrap(request)
+        queryset = await self.filter(CommentFilterSet(request.GET, CommentViewSet.queryset))
+        fieldset = Fieldset.from_request(CommentSerializer, request)
+
+        paginator = KeysetPaginator()
+        page = Page(paginator, lambda: fieldset.apply(queryset, keep=paginator.columns), drf_request)
+
+        async def get_validators(content):
+            await page.aobjects()
+            return make_etag(request, content, *page.watermark(*CommentViewSet.watermark_fields)), content.modified
+
+        async def render():
+            return paginator.get_paginated_response(
+                CommentSerializer.represent(await page.aobjects(), many=True, fieldset=fieldset)).data
+
+        return await aconditional_response(request, get_validators, render)
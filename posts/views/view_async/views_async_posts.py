@@ -0,0 +1,67 @@
+from django.shortcuts import aget_object_or_404
+
+from blog.fieldsets import Fieldset
+from posts.conditional import aconditional_response, make_etag
+from posts.filters import CommentFilterSet, PostFilterSet
+from posts.models import Post
+from posts.pagination import KeysetPaginator, Page
+from posts.serializers import CommentSerializer, PostSerializer
+from posts.views.view_api import CommentViewSet, PostViewSet
+from .views_async_base import AsyncReadView
+
+
+class AsyncPostListView(AsyncReadView):
+    async def get(self, request):
+        drf_request = self.wrap(request)
+        queryset = await self.filter(PostFilterSet(request.GET, PostViewSet.queryset))
+        fieldset = Fieldset.from_request(PostSerializer, request)
+
+        paginator = PostViewSet().get_paginator(drf_request)
+        columns = (*paginator.columns, *PostViewSet.watermark_fields)
+        page = Page(paginator, lambda: fieldset.apply(queryset, keep=columns), drf_request)
+
+        async def get_validators(content):
+            await page.aobjects()
+            return make_etag(request, content, *page.watermark(*PostViewSet.watermark_fields)), content.modified
+
+        async def render():
+            return paginator.get_paginated_response(
+                PostSerializer.represent(await page.aobjects(), many=True, fieldset=fieldset)).data
+
+        return await aconditional_response(request, get_validators, render, cache_name='posts:async-list')
+
+
+class AsyncPostDetailView(AsyncReadView):
+    async def get(self, request, pk):
+        fieldset = Fieldset.from_request(PostSerializer, request)
+
+        async def get_validators(content):
+            watermark = await aget_object_or_404(Post.objects.values(*PostViewSet.watermark_fields), pk=pk)
+            return make_etag(request, content, *watermark.values()), max(watermark['updated_at'], content.modified)
+
+        async def render():
+            post = await aget_object_or_404(fieldset.apply(PostViewSet.queryset), pk=pk)
+            return PostSerializer.represent(post, fieldset=fieldset)
+
+        return await aconditional_response(request, get_validators, render, cache_name='posts:async-retrieve')
+
+
+class AsyncPostCommentsView(AsyncReadView):
+    async def get(self, request, pk):
+        post = await aget_object_or_404(Post.objects.only('id'), pk=pk)
+        drf_request = self.wrap(request)
+        queryset = await self.filter(CommentFilterSet(request.GET, CommentViewSet.queryset.filter(post=post)))
+        fieldset = Fieldset.from_request(CommentSerializer, request)
+
+        paginator = KeysetPaginator()
+        page = Page(paginator, lambda: fieldset.apply(queryset, keep=paginator.columns), drf_request)
+
+        async def get_validators(content):
+            await page.aobjects()
+            return make_etag(request, content, *page.watermark(*CommentViewSet.watermark_fields)), content.modified
+
+        async def render():
+            return paginator.get_paginated_response(
+                CommentSerializer.represent(await page.aobjects(), many=True, fieldset=fieldset)).data
+
+        return await aconditional_response(request, get_validators, render)
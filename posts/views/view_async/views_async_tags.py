@@ -0,0 +1,21 @@
+from django.db.models import Count, Max, Sum
+
+from posts.conditional import aconditional_response, make_etag
+from posts.views.view_api import TagsListAPIView
+from .views_async_base import AsyncReadView
+
+
+class AsyncTagsListView(AsyncReadView):
+    async def get(self, request):
+        # Reuse the DRF view's queryset, search/ordering backends and serializer.
+        view = TagsListAPIView(request=self.wrap(request), format_kwarg=None, args=(), kwargs={})
+        queryset = view.filter_queryset(view.get_queryset())
+
+        async def get_validators(content):
+            watermark = await queryset.aaggregate(count=Count('id'), last_id=Max('id'), posts=Sum('post_count'))
+            return make_etag(request, content, *watermark.values()), None
+
+        async def render():
+            return view.get_serializer([obj async for obj in queryset], many=True).data
+
+        return await aconditional_response(request, get_validators, render)
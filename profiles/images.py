@@ -0,0 +1,123 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from profiles.models import Profile
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+
+def is_public_media(path):
+    """Whether the media file at ``path`` is a picture variant or the current picture of a profile."""
+    return path.startswith('profiles/') or Profile.objects.filter(profile_picture=path).exists()
+
+
+def variants_are_current(profile):
+    """Whether ``profile.picture_variants`` were made from its current picture."""
+    return not profile.profile_picture or profile.picture_variants.get('source') == profile.profile_picture.name
+
+
+def render_variant(image, size, format, quality):
+    """``image`` cropped to a ``size`` pixel square and encoded as ``format``."""
+    variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    keep_alpha = format != 'JPEG' and 'A' in variant.getbands()
+    variant = variant.convert('RGBA' if keep_alpha else 'RGB')
+    output = io.BytesIO()
+    variant.save(output, format, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def save_content_addressed(content, extension, storage=default_storage):
+    """
+    Store ``content`` under a name derived from its hash, unless a file of the
+    same content is already there, and return the name. The file behind a name
+    never changes, so its URL can be cached forever.
+    """
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    name = f'profiles/{digest[:2]}/{digest}.{extension}'
+    if not storage.exists(name):
+        saved = storage.save(name, ContentFile(content))
+        if saved != name:
+            # Lost a race with another worker storing the same content.
+            storage.delete(saved)
+    return name
+
+
+def make_variants(file):
+    """Render every ``PROFILE_PICTURE_VARIANTS`` size of the image in ``file``; ``{name: storage name}``."""
+    format, quality = settings.PROFILE_PICTURE_FORMAT, settings.PROFILE_PICTURE_QUALITY
+    with Image.open(file) as image:
+        # Lets JPEG decode at a fraction of its size when even the largest variant is much smaller.
+        largest = max(settings.PROFILE_PICTURE_VARIANTS.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        return {name: save_content_addressed(render_variant(image, size, format, quality), EXTENSIONS[format])
+                for name, size in settings.PROFILE_PICTURE_VARIANTS.items()}
+
+
+def process_profile_picture(profile_id):
+    """
+    Make the variants of a profile's picture and record them on the profile,
+    unless the picture was replaced in the meantime. Pictures that are no
+    image get no variants and are not tried again.
+    """
+    profile = Profile.objects.filter(pk=profile_id).first()
+    if profile is None or variants_are_current(profile):
+        return
+    source = profile.profile_picture.name
+    try:
+        with profile.profile_picture.open('rb') as file:
+            variants = make_variants(file)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        logger.warning("Profile %s picture %s has no variants: %s", profile_id, source, error)
+        variants = {}
+
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().filter(pk=profile_id).first()
+        if profile is not None and profile.profile_picture.name == source:
+            profile.picture_variants = {'source': source, **variants}
+            profile.save(update_fields=['picture_variants'])
+
+
+def _process_in_worker(profile_id):
+    try:
+        process_profile_picture(profile_id)
+    except Exception:
+        logger.exception("Processing the picture of profile %s failed", profile_id)
+    finally:
+        close_old_connections()
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor():
+    """The picture processing threads of this process; a forked worker starts its own."""
+    key = os.getpid()
+    with _executors_lock:
+        if key not in _executors:
+            _executors[key] = ThreadPoolExecutor(settings.PROFILE_PICTURE_WORKERS, thread_name_prefix='pictures')
+        return _executors[key]
+
+
+def schedule_profile_picture(profile_id):
+    """
+    Process the profile's picture once the current transaction commits: on a
+    background thread with ``PROFILE_PICTURE_WORKERS``, inline without.
+    """
+    if settings.PROFILE_PICTURE_WORKERS:
+        transaction.on_commit(lambda: get_executor().submit(_process_in_worker, profile_id))
+    else:
+        transaction.on_commit(lambda: process_profile_picture(profile_id))
@@ -0,0 +1,52 @@
+import csv
+import json
+import time
+from distutils.util import strtobool
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.services import bulk_import_users
+
+
+class Command(BaseCommand):
+    help = ("Bulk import users with pre-hashed passwords and their profiles from a CSV file with a header row "
+            "or a JSON Lines file")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File with username, email, first_name, last_name, password (hashed), "
+                                         "is_active, date_joined and bio columns; only username is required")
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help="Input format, guessed from the file extension by default")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, path, format, batch_size, **options):
+        format = format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        started = time.monotonic()
+
+        def report(result):
+            self.stdout.write(f"Batch {result.batches}: {result.created} created, {result.skipped} skipped, "
+                              f"{time.monotonic() - started:.1f}s")
+
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = map(self.clean, json_lines(file) if format == 'jsonl' else csv.DictReader(file))
+            try:
+                result = bulk_import_users(rows, batch_size=batch_size, on_batch=report)
+            except (KeyError, ValueError) as error:
+                raise CommandError(f"Import stopped, earlier batches were kept: {error}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} users, skipped {result.skipped} existing usernames in "
+            f"{time.monotonic() - started:.1f}s"))
+
+    @staticmethod
+    def clean(row):
+        row = {key: value for key, value in row.items() if value not in (None, '')}
+        if isinstance(row.get('is_active'), str):
+            row['is_active'] = bool(strtobool(row['is_active']))
+        return row
+
+
+def json_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from profiles.images import process_profile_picture, variants_are_current
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = ("Make the resized variants of profile pictures uploaded before they existed, or whose processing was "
+            "lost to a restart")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Redo every picture, after changing the variants")
+
+    def handle(self, *args, all, **options):
+        profiles = Profile.objects.exclude(profile_picture='').exclude(profile_picture=None)
+        processed = 0
+        for profile in profiles.only('pk', 'profile_picture', 'picture_variants').order_by('pk').iterator():
+            if all or not variants_are_current(profile):
+                if all:
+                    Profile.objects.filter(pk=profile.pk).update(picture_variants={})
+                process_profile_picture(profile.pk)
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} profile pictures"))
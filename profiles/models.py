@@ -19,6 +19,10 @@ class Profile(models.Model):
     bio = models.TextField(_("Bio"), default=None, null=True, blank=True)
     profile_picture = models.FileField(_("Profile Picture"), upload_to=get_upload_to, default=None, null=True,
                                        blank=True)
+    # Resized copies of profile_picture by PROFILE_PICTURE_VARIANTS name, and the picture they were made from
+    # under 'source'; filled in by profiles.images after upload.
+    picture_variants = models.JSONField(_("Picture Variants"), default=dict, blank=True, editable=False)
+    post_count = models.PositiveIntegerField(_("Post Count"), default=0, editable=False)
 
     def __str__(self):
         return self.user.get_full_name()
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
+from blog.serializers import FlatSerializer
 from profiles.models import Profile
 
 UserModel = get_user_model()
@@ -12,17 +15,38 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('id', 'first_name', 'last_name', 'username', 'email',)
 
 
+class PictureVariantsField(serializers.Field):
+    """
+    URLs of the resized profile pictures by variant name. Until they are made
+    every variant points at the uploaded picture.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def to_representation(self, profile):
+        if not profile.profile_picture:
+            return None
+        variants = profile.picture_variants
+        if variants.get('source') != profile.profile_picture.name:
+            variants = {}
+        original = profile.profile_picture.url
+        return {name: default_storage.url(variants[name]) if name in variants else original
+                for name in settings.PROFILE_PICTURE_VARIANTS}
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer()
+    profile_picture_variants = PictureVariantsField()
 
     class Meta:
         model = Profile
-        fields = ('id', 'bio', 'profile_picture', 'user')
+        fields = ('id', 'bio', 'profile_picture', 'profile_picture_variants', 'post_count', 'user')
 
 
 class AuthorField(serializers.RelatedField):
     def to_representation(self, value):
-        return ProfileSerializer(value).data
+        return FlatSerializer.for_class(ProfileSerializer).to_representation(value)
 
     def to_internal_value(self, data):
         return data
@@ -0,0 +1,78 @@
+import itertools
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import transaction
+
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined')
+PROFILE_FIELDS = ('bio',)
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    batches: int = 0
+
+
+def bulk_import_users(rows, batch_size=1000, on_batch=None):
+    """
+    Create users and their profiles from ``rows``, dicts with ``username`` and
+    any of ``email``, ``first_name``, ``last_name``, ``is_active``,
+    ``date_joined``, ``bio`` and ``password``.
+
+    ``password`` must already be hashed (any hasher in ``PASSWORD_HASHERS``);
+    rows without one get an unusable password. Usernames that already exist,
+    in the database or earlier in ``rows``, are skipped. Each batch is one
+    transaction with one query for the existing usernames and one insert each
+    for users and profiles, so ``post_save`` (and with it
+    ``create_profile_for_each_user``) does not run; every user still gets
+    exactly one profile. ``on_batch(result)`` is called after every batch.
+    """
+    result = ImportResult()
+    seen = set()
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, batch_size)):
+        users, profiles = [], []
+        with transaction.atomic():
+            existing = set(UserModel.objects.filter(username__in=[row['username'] for row in batch])
+                           .values_list('username', flat=True))
+            for row in batch:
+                if row['username'] in existing or row['username'] in seen:
+                    result.skipped += 1
+                    continue
+                seen.add(row['username'])
+                users.append(build_user(row))
+                profiles.append({field: row[field] for field in PROFILE_FIELDS if row.get(field) is not None})
+
+            UserModel.objects.bulk_create(users)
+            if users and users[0].pk is None:
+                # Backends that cannot return ids from bulk inserts.
+                ids = dict(UserModel.objects.filter(username__in=[user.username for user in users])
+                           .values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            Profile.objects.bulk_create(Profile(user_id=user.pk, **fields) for user, fields in zip(users, profiles))
+
+        result.created += len(users)
+        result.batches += 1
+        if on_batch is not None:
+            on_batch(result)
+    return result
+
+
+def build_user(row):
+    password = row.get('password')
+    if password:
+        try:
+            identify_hasher(password)
+        except ValueError:
+            raise ValueError(f"Password of {row['username']!r} is not a hash made by any of PASSWORD_HASHERS")
+    else:
+        password = make_password(None)
+    return UserModel(password=password, **{field: row[field] for field in USER_FIELDS if row.get(field) is not None})
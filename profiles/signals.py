@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .images import schedule_profile_picture, variants_are_current
+from .models import Profile
+
+
+@receiver(post_save, sender=Profile, dispatch_uid='profiles_picture_saved')
+def process_new_picture(sender, instance, update_fields=None, **kwargs):
+    if (update_fields is None or 'profile_picture' in update_fields) and not variants_are_current(instance):
+        schedule_profile_picture(instance.pk)
@@ -0,0 +1,129 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from profiles.images import process_profile_picture
+from profiles.models import Profile
+from profiles.serializers import ProfileSerializer
+from profiles.tests.factories import UserFactory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name='picture.png', size=(800, 600), color='red'):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROFILE_PICTURE_VARIANTS={'small': 32, 'large': 128},
+                   PROFILE_PICTURE_FORMAT='WEBP')
+class ProfilePictureTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, user, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile.profile_picture = file
+            user.profile.save()
+        user.profile.refresh_from_db()
+        return user.profile
+
+    def test_registration_makes_resized_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post(reverse('api:auth:register'), {
+                'first_name': 'First', 'last_name': 'Last', 'username': 'pictured', 'email': 'pictured@example.com',
+                'password1': 'S3cure-password', 'password2': 'S3cure-password', 'bio': 'Bio',
+                'profile_picture': image_file()})
+        self.assertEqual(response.status_code, 201, response.data)
+
+        profile = Profile.objects.get(user__username='pictured')
+        self.assertEqual(profile.picture_variants['source'], profile.profile_picture.name)
+        for name, size in (('small', 32), ('large', 128)):
+            with Image.open(Path(MEDIA_ROOT, profile.picture_variants[name])) as variant:
+                self.assertEqual((variant.format, variant.size), ('WEBP', (size, size)))
+
+    def test_serializer_exposes_variant_urls(self):
+        profile = self.upload(UserFactory(), image_file())
+
+        urls = ProfileSerializer(profile).data['profile_picture_variants']
+
+        self.assertEqual(urls, {'small': f"/media/{profile.picture_variants['small']}",
+                                'large': f"/media/{profile.picture_variants['large']}"})
+
+    def test_serializer_falls_back_to_the_upload_until_processed(self):
+        user = UserFactory()
+        with self.captureOnCommitCallbacks(execute=False):
+            user.profile.profile_picture = image_file()
+            user.profile.save()
+
+        urls = ProfileSerializer(user.profile).data['profile_picture_variants']
+
+        self.assertEqual(urls, dict.fromkeys(('small', 'large'), user.profile.profile_picture.url))
+        self.assertIsNone(ProfileSerializer(UserFactory().profile).data['profile_picture_variants'])
+
+    def test_identical_pictures_are_stored_once(self):
+        first = self.upload(UserFactory(), image_file('first.png'))
+        second = self.upload(UserFactory(), image_file('second.png'))
+        other = self.upload(UserFactory(), image_file('other.png', color='blue'))
+
+        self.assertEqual(first.picture_variants['small'], second.picture_variants['small'])
+        self.assertNotEqual(first.picture_variants['small'], other.picture_variants['small'])
+        self.assertTrue(first.picture_variants['small'].endswith('.webp'))
+
+    def test_file_that_is_no_image_gets_no_variants(self):
+        with self.assertLogs('profiles.images', 'WARNING'):
+            profile = self.upload(UserFactory(), SimpleUploadedFile('picture.png', b'picture',
+                                                                    content_type='image/png'))
+
+        self.assertEqual(profile.picture_variants, {'source': profile.profile_picture.name})
+
+    def test_picture_replaced_during_processing_is_left_alone(self):
+        user = UserFactory()
+        with self.captureOnCommitCallbacks(execute=False):
+            user.profile.profile_picture = image_file()
+            user.profile.save()
+
+        def replace(file):
+            Profile.objects.filter(pk=user.profile.pk).update(profile_picture='users/replaced.png')
+            return {}
+
+        with mock.patch('profiles.images.make_variants', side_effect=replace):
+            process_profile_picture(user.profile.pk)
+
+        user.profile.refresh_from_db()
+        self.assertEqual(user.profile.picture_variants, {})
+
+    def test_saving_other_fields_does_not_process_again(self):
+        profile = self.upload(UserFactory(), image_file())
+
+        with mock.patch('profiles.signals.schedule_profile_picture') as schedule:
+            profile.bio = 'Changed'
+            profile.save()
+            profile.save(update_fields=['bio'])
+        schedule.assert_not_called()
+
+    def test_command_processes_pictures_without_variants(self):
+        user = UserFactory()
+        with self.captureOnCommitCallbacks(execute=False):
+            user.profile.profile_picture = image_file()
+            user.profile.save()
+        stdout = StringIO()
+
+        call_command('process_profile_pictures', stdout=stdout)
+
+        user.profile.refresh_from_db()
+        self.assertIn('small', user.profile.picture_variants)
+        self.assertIn("Processed 1 profile pictures", stdout.getvalue())
@@ -0,0 +1,95 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from profiles.models import Profile
+from profiles.services import bulk_import_users
+from profiles.tests.factories import UserFactory
+
+User = get_user_model()
+
+
+class BulkImportUsersTestCase(TestCase):
+    def rows(self, count, start=0):
+        return [{'username': f'imported{index}', 'email': f'imported{index}@example.com', 'bio': f'Bio {index}'}
+                for index in range(start, start + count)]
+
+    def test_every_user_gets_one_profile(self):
+        result = bulk_import_users(self.rows(5), batch_size=2)
+
+        self.assertEqual((result.created, result.skipped, result.batches), (5, 0, 3))
+        users = User.objects.filter(username__startswith='imported')
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 5)
+        self.assertEqual(User.objects.get(username='imported3').profile.bio, 'Bio 3')
+
+    def test_skips_existing_and_repeated_usernames(self):
+        UserFactory(username='imported1')
+
+        result = bulk_import_users(self.rows(3) + self.rows(1), batch_size=2)
+
+        self.assertEqual((result.created, result.skipped), (2, 2))
+        self.assertEqual(Profile.objects.filter(user__username__startswith='imported').count(), 3)
+
+    def test_queries_per_batch_do_not_grow_with_its_size(self):
+        with CaptureQueriesContext(connection) as small:
+            bulk_import_users(self.rows(2))
+        with CaptureQueriesContext(connection) as large:
+            bulk_import_users(self.rows(50, start=2))
+
+        self.assertEqual(len(small), len(large))
+
+    def test_keeps_pre_hashed_passwords(self):
+        rows = [{'username': 'hashed', 'password': make_password('secret')}, {'username': 'no-password'}]
+
+        bulk_import_users(rows)
+
+        self.assertTrue(User.objects.get(username='hashed').check_password('secret'))
+        self.assertFalse(User.objects.get(username='no-password').has_usable_password())
+
+    def test_rejects_plain_text_passwords(self):
+        with self.assertRaisesMessage(ValueError, "'plain'"):
+            bulk_import_users([{'username': 'plain', 'password': 'secret'}])
+        self.assertFalse(User.objects.filter(username='plain').exists())
+
+
+class ImportUsersCommandTestCase(TestCase):
+    def import_users(self, name, content, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, name)
+            path.write_text(content)
+            stdout = StringIO()
+            call_command('import_users', str(path), *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_imports_csv(self):
+        output = self.import_users('users.csv', "username,email,is_active,bio\n"
+                                                "first,first@example.com,true,First\n"
+                                                "second,,false,\n", '--batch-size', '1')
+
+        self.assertIn("Batch 2: 2 created, 0 skipped", output)
+        self.assertIn("Imported 2 users", output)
+        second = User.objects.get(username='second')
+        self.assertFalse(second.is_active)
+        self.assertIsNone(second.profile.bio)
+        self.assertEqual(User.objects.get(username='first').profile.bio, 'First')
+
+    def test_imports_json_lines(self):
+        lines = [{'username': 'first', 'password': make_password('secret'), 'bio': 'First'}, {'username': 'second'}]
+
+        self.import_users('users.jsonl', '\n'.join(map(json.dumps, lines)) + '\n')
+
+        self.assertTrue(User.objects.get(username='first').check_password('secret'))
+        self.assertTrue(Profile.objects.filter(user__username='second').exists())
+
+    def test_reports_invalid_rows(self):
+        with self.assertRaisesMessage(CommandError, "not a hash"):
+            self.import_users('users.csv', "username,password\nfirst,secret\n")